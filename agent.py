@@ -1,54 +1,109 @@
+import functools
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
+from autogen_core import FunctionCall
+from autogen_core.models import FunctionExecutionResult
+from autogen_core.tools import FunctionTool
 from autogen_ext.models.openai import OpenAIChatCompletionClient
-from tools.weather_api import get_weather
-from tools.time_tools import get_current_time, convert_timezone
-from tools.utility_tools import calculate, get_random_fact, check_website, about_me, agent_about
-
-weather_agent = AssistantAgent(
-    name="weather_agent",
-    model_client=OpenAIChatCompletionClient(
-        model="qwen3:0.6b",
-        model_info={
-            "function_calling": True,
-            "json_output": True,
-            "vision": False, 
-            "family": "qwen", 
-            "structured_output": False
-        },
-        base_url="http://localhost:11434/v1",
-        api_key="not-needed"
-    ),
-    tools=[get_weather, get_current_time, convert_timezone, calculate, get_random_fact, check_website, about_me, agent_about],  # Direct tool imports
-    system_message="""You are a professional multi-purpose assistant. You MUST use the provided tools to answer user requests. Do not provide generic responses.
-
-IMPORTANT: You have access to these tools and MUST use them:
-- get_weather(city, format): Get real weather data for any city
-- get_current_time(timezone_name): Get current time in any timezone  
-- convert_timezone(time_str, from_tz, to_tz): Convert time between zones
-- calculate(expression): Calculate mathematical expressions
-- check_website(url): Check website accessibility
-- get_random_fact(): Get interesting facts
-- about_me(): Get information about the agent creator (MD Shariful Islam)
-- agent_about(): Get information about this AI agent and its capabilities
-
-RULES:
-1. When users ask for weather information, ALWAYS call get_weather() with the city name
-2. When users ask for time information, ALWAYS call get_current_time() with the timezone
-3. When users ask for calculations, ALWAYS call calculate() with the expression
-4. NEVER provide fake or made-up information - always use the tools
-5. If a user asks about Dhaka time, use timezone "Asia/Dhaka"
-6. If a user asks about Dhaka weather, use city "Dhaka, Bangladesh"
-
-Example correct behavior:
-User: "What's the weather in London?"
-Assistant: [Calls get_weather("London")] then presents the real data
-
-User: "What time is it in Tokyo?"
-Assistant: [Calls get_current_time("Asia/Tokyo")] then presents the real time
-
-Always use tools - never guess or make up information!""",
-)
+from tools.core.config import env_str
+from completion_cache import CachingChatCompletionClient, create_completion_cache
+from conversation_context import RollingSummaryContext
+from tool_selection import ToolSelectingChatCompletionClient, ToolSelector, build_system_prompt
+from tools import tool_manager
+from tools.core.results import Renderings, ToolResult, serialize
+from tools.weather_api import get_weather, get_weather_many, get_forecast
+from tools.time_tools import get_current_time, get_current_times, convert_timezone, convert_timezone_many
+from tools.utility_tools import calculate, get_random_fact, check_website, check_websites, about_me, agent_about
+
+MODEL = env_str("MODEL", "qwen3:0.6b")
+
+# One model client is shared by every agent (and every server session);
+# identical requests are answered from the completion cache
+completion_client = CachingChatCompletionClient(OpenAIChatCompletionClient(
+    model=MODEL,
+    model_info={
+        "function_calling": True,
+        "json_output": True,
+        "vision": False, 
+        "family": "qwen", 
+        "structured_output": False
+    },
+    base_url=env_str("MODEL_BASE_URL", "http://localhost:11434/v1"),
+    api_key=env_str("MODEL_API_KEY", "not-needed")
+), model=MODEL, cache=create_completion_cache())
+
+# Each request carries only the tools relevant to the user's latest message
+# (in front of the cache, so cache keys cover the narrowed request)
+model_client = ToolSelectingChatCompletionClient(completion_client, ToolSelector(tool_manager))
+
+TOOLS = [get_weather, get_weather_many, get_forecast, get_current_time, get_current_times, convert_timezone, convert_timezone_many, calculate, get_random_fact, check_website, check_websites, about_me, agent_about]  # Direct tool imports
+
+
+
+# "json": structured results reach the model as compact JSON; "text": as the rendered text
+RESULT_FORMAT = env_str("RESULT_FORMAT", "json").lower()
+
+# Text for the results the model saw as JSON, shown in the agent's tool call summary
+renderings = Renderings()
+
+
+class StaticSchemaTool(FunctionTool):
+    """
+    FunctionTool whose JSON schema is built once. AutoGen otherwise rebuilds
+    every tool's pydantic schema on each model call, which dominates the CPU
+    cost of a turn when many sessions share the process.
+    """
+
+    @functools.cached_property
+    def schema(self):
+        return FunctionTool.schema.fget(self)
+
+    def return_value_as_string(self, value) -> str:
+        payload = serialize(value, compact=RESULT_FORMAT != "text")
+        if isinstance(value, ToolResult):
+            renderings.remember(payload, value)
+        return payload
+
+
+def render_tool_result(call: FunctionCall, result: FunctionExecutionResult) -> str:
+    """Console text for a tool result (the agent's summary of its tool calls)"""
+    return renderings.lookup(result.content) or result.content
+
+
+# Wrapped once and shared by every agent; the short registry descriptions
+# keep the schemas sent with every request small
+FUNCTION_TOOLS = [
+    StaticSchemaTool(func, description=tool_manager.list_tools()[func.__name__]["description"] or func.__doc__ or "")
+    for func in TOOLS
+]
+
+# Generated from the registered tools; ToolSelectingChatCompletionClient
+# swaps in the prompt for each request's subset
+SYSTEM_MESSAGE = build_system_prompt(tool.name for tool in FUNCTION_TOOLS)
+
+
+def create_weather_agent(name: str = "weather_agent") -> AssistantAgent:
+    """
+    A new agent with its own conversation state, sharing the model client
+    and tools (and so their caches) with every other agent. Its context
+    keeps recent turns verbatim and summarizes older ones.
+    """
+    return AssistantAgent(
+        name=name,
+        model_client=model_client,
+        tools=FUNCTION_TOOLS,
+        system_message=SYSTEM_MESSAGE,
+        model_context=RollingSummaryContext(),
+        tool_call_summary_formatter=render_tool_result,
+    )
+
+
+def create_agent_team(name: str = "weather_agent") -> RoundRobinGroupChat:
+    """A single-agent team for one conversation"""
+    return RoundRobinGroupChat([create_weather_agent(name)], max_turns=1)
+
+
+weather_agent = create_weather_agent()
 
 agent_team = RoundRobinGroupChat([weather_agent], max_turns=1)
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for the weather agent.
+
+Run them from the repository root, e.g. ``python -m benchmarks.bench_http_pool``.
+"""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Per-turn latency and prompt size over a long scripted conversation.
+
+Runs the same --turns-turn conversation (calculations, time lookups and
+small talk, answered by local tools) through an agent with the unbounded
+default context and through one with RollingSummaryContext. The stub model
+calls the tool the message asks for and charges --prefill-ms per prompt
+token before answering, so a growing history shows up as growing latency.
+
+    python -m benchmarks.bench_context --turns 200 --prefill-ms 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.bench_prompt import approximate_tokens
+
+CITIES = ["Tokyo", "London", "New York", "Paris", "Sydney", "Dhaka", "Berlin", "Toronto"]
+_MULTIPLY = re.compile(r"(\d+) \* (\d+)")
+_TIME = re.compile(r"time in (.+)\?")
+
+
+def script(turn: int) -> str:
+    """The user's message on a given turn"""
+    kind = turn % 3
+    if kind == 0:
+        return f"What is {turn} * {turn % 17 + 2}?"
+    if kind == 1:
+        return f"What time is it in {CITIES[turn % len(CITIES)]}?"
+    return f"Thanks! Turn {turn} done, anything else I should know?"
+
+
+def reply(messages: list) -> dict:
+    """The stub model's answer: a tool call for tool-shaped requests, text otherwise"""
+    last = messages[-1]
+    text = last.get("content") or "" if last.get("role") == "user" else ""
+    multiply = _MULTIPLY.search(text)
+    place = _TIME.search(text)
+    if multiply or place:
+        name, arguments = ("calculate", {"expression": multiply.group(0)}) if multiply else \
+            ("get_current_time", {"timezone_name": place.group(1)})
+        return {"role": "assistant", "content": None, "tool_calls": [{
+            "id": f"call_{len(messages)}", "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments)},
+        }]}
+    return {"role": "assistant", "content": "Happy to help. Ask me about weather, time or math any time."}
+
+
+def start_model_server(prefill_ms: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt_tokens = approximate_tokens(request)
+            time.sleep(prompt_tokens * prefill_ms / 1000.0)
+            message = reply(request["messages"])
+            body = json.dumps({
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": "stub",
+                "choices": [{"index": 0, "message": message,
+                             "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 12,
+                          "total_tokens": prompt_tokens + 12},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def conversation(context, turns: int):
+    """(seconds, prompt tokens) per turn"""
+    from autogen_agentchat.agents import AssistantAgent
+
+    from agent import FUNCTION_TOOLS, SYSTEM_MESSAGE, model_client
+
+    agent = AssistantAgent("weather_agent", model_client=model_client, tools=FUNCTION_TOOLS,
+                           system_message=SYSTEM_MESSAGE, model_context=context)
+    results = []
+    for turn in range(turns):
+        before = model_client.stats()["prompt_tokens"]
+        start = time.perf_counter()
+        await agent.run(task=script(turn))
+        results.append((time.perf_counter() - start, model_client.stats()["prompt_tokens"] - before))
+    return results
+
+
+def slope(values) -> float:
+    """Least-squares growth per turn"""
+    n = len(values)
+    mean_x, mean_y = (n - 1) / 2, statistics.mean(values)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values))
+    return covariance / sum((x - mean_x) ** 2 for x in range(n))
+
+
+async def run(args):
+    from autogen_core.model_context import UnboundedChatCompletionContext
+
+    from conversation_context import RollingSummaryContext
+
+    variants = [("unbounded", UnboundedChatCompletionContext()), ("rolling summary", RollingSummaryContext())]
+    window = max(1, args.turns // 10)
+    for label, context in variants:
+        results = await conversation(context, args.turns)
+        print(f"\n{label}")
+        print(f"{'turns':>12}{'latency':>11}{'prompt tokens':>15}")
+        for start in range(0, args.turns, window):
+            chunk = results[start:start + window]
+            latency = statistics.mean(t for t, _ in chunk) * 1000
+            tokens = statistics.mean(p for _, p in chunk)
+            print(f"{start + 1:>5}-{start + len(chunk):<6}{latency:>8.1f} ms{tokens:>15.0f}")
+        latencies = [t * 1000 for t, _ in results]
+        print(f"growth: {slope(latencies):+.3f} ms/turn, "
+              f"{slope([p for _, p in results]):+.1f} prompt tokens/turn; "
+              f"{len(await context.get_messages())} messages held at the end")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--prefill-ms", type=float, default=0.02, help="stub prefill time per prompt token")
+    args = parser.parse_args()
+
+    model = start_model_server(args.prefill_ms)
+    os.environ["WEATHER_AGENT_MODEL"] = "stub"
+    os.environ["WEATHER_AGENT_MODEL_BASE_URL"] = f"http://127.0.0.1:{model.server_address[1]}/v1"
+    os.environ["WEATHER_AGENT_COMPLETION_CACHE"] = "false"
+    try:
+        asyncio.run(run(args))
+    finally:
+        model.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Event-loop lag under mixed load, with blocking and CPU-bound tools run inline or offloaded.
+
+For --duration seconds per mode the loop runs a lag probe (a task that
+sleeps --tick-ms and records how late it wakes up), --io-clients
+network-bound calls (an await of --io-ms), --cpu-clients calling a
+pure-Python CPU-bound tool (about --cpu-ms of work per call) and
+--blocking-clients calling a tool that blocks (time.sleep of --block-ms);
+those clients pause --think-ms between calls, as callers awaiting a
+model do. Both tools are wrapped with offload(): "inline" runs them on the
+event loop, "thread" and "process" in that pool, and "policy" where their
+executor policies would put them (CPU work in processes, blocking in
+threads). Process workers are spawned before the measurement starts.
+
+    python -m benchmarks.bench_executors --duration 5 --cpu-clients 2 --blocking-clients 2
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_server import percentile
+from tools.core.executors import INLINE, PROCESS, THREAD, ExecutorPools, offload
+
+# Mode -> (executor of the CPU-bound tool, executor of the blocking tool)
+MODES = {
+    "inline": (INLINE, INLINE),
+    "thread": (THREAD, THREAD),
+    "process": (PROCESS, PROCESS),
+    "policy": (PROCESS, THREAD),
+}
+
+
+def crunch(iterations: int) -> int:
+    """CPU-bound work that holds the GIL throughout"""
+    total = 0
+    for i in range(iterations):
+        total += i * i % 7
+    return total
+
+
+def block(seconds: float) -> float:
+    """Blocking work, e.g. a synchronous client or file read"""
+    time.sleep(seconds)
+    return seconds
+
+
+def calibrate(cpu_ms: float) -> int:
+    """Iterations of crunch() taking about cpu_ms"""
+    iterations = 10_000
+    while True:
+        start = time.perf_counter()
+        crunch(iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0.05:
+            return max(1, int(iterations * cpu_ms / 1000 / elapsed))
+        iterations *= 2
+
+
+async def run_mode(args, mode: str, pools: ExecutorPools, iterations: int) -> Dict[str, Any]:
+    cpu_executor, block_executor = MODES[mode]
+    cpu_tool = offload(crunch, cpu_executor, pools)
+    block_tool = offload(block, block_executor, pools)
+    if PROCESS in MODES[mode]:
+        await asyncio.gather(*(cpu_tool(1) for _ in range(pools.process_workers)))
+
+    lags: List[float] = []
+    io_ms: List[float] = []
+    calls = {"cpu": 0, "blocking": 0}
+    deadline = time.perf_counter() + args.duration
+
+    async def probe():
+        tick = args.tick_ms / 1000
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            lags.append((time.perf_counter() - start - tick) * 1000)
+
+    async def io_client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(args.io_ms / 1000)
+            io_ms.append((time.perf_counter() - start) * 1000)
+
+    async def cpu_client():
+        while time.perf_counter() < deadline:
+            await cpu_tool(iterations)
+            calls["cpu"] += 1
+            await asyncio.sleep(args.think_ms / 1000)
+
+    async def blocking_client():
+        while time.perf_counter() < deadline:
+            await block_tool(args.block_ms / 1000)
+            calls["blocking"] += 1
+            await asyncio.sleep(args.think_ms / 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe(), *(io_client() for _ in range(args.io_clients)),
+                         *(cpu_client() for _ in range(args.cpu_clients)),
+                         *(blocking_client() for _ in range(args.blocking_clients)))
+    elapsed = time.perf_counter() - started
+    return {
+        "lag_p50": percentile(lags, 50),
+        "lag_p99": percentile(lags, 99),
+        "lag_max": max(lags),
+        "io_p99": percentile(io_ms, 99),
+        "cpu_per_s": calls["cpu"] / elapsed,
+        "blocking_per_s": calls["blocking"] / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--tick-ms", type=float, default=5.0, help="lag probe interval")
+    parser.add_argument("--io-clients", type=int, default=20)
+    parser.add_argument("--io-ms", type=float, default=20.0, help="simulated network wait per I/O call")
+    parser.add_argument("--cpu-clients", type=int, default=2)
+    parser.add_argument("--cpu-ms", type=float, default=50.0, help="CPU work per CPU-bound call")
+    parser.add_argument("--blocking-clients", type=int, default=2)
+    parser.add_argument("--block-ms", type=float, default=50.0)
+    parser.add_argument("--think-ms", type=float, default=20.0, help="pause between a client's tool calls")
+    parser.add_argument("--threads", type=int, default=4, help="thread pool size")
+    parser.add_argument("--processes", type=int, default=2, help="process pool size")
+    args = parser.parse_args()
+
+    iterations = calibrate(args.cpu_ms)
+    pools = ExecutorPools(thread_workers=args.threads, process_workers=args.processes)
+    print(f"{args.duration:.0f} s per mode: {args.io_clients} I/O clients ({args.io_ms:.0f} ms waits), "
+          f"{args.cpu_clients} CPU clients ({args.cpu_ms:.0f} ms calls), "
+          f"{args.blocking_clients} blocking clients ({args.block_ms:.0f} ms calls)")
+    print(f"{'mode':<10}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}{'I/O p99':>10}{'CPU/s':>8}{'block/s':>9}")
+
+    async def run_all():
+        try:
+            for mode in args.modes:
+                result = await run_mode(args, mode, pools, iterations)
+                print(f"{mode:<10}{result['lag_p50']:>7.1f} ms{result['lag_p99']:>7.1f} ms"
+                      f"{result['lag_max']:>7.1f} ms{result['io_p99']:>7.1f} ms"
+                      f"{result['cpu_per_s']:>8.1f}{result['blocking_per_s']:>9.1f}")
+        finally:
+            await pools.aclose()
+
+    asyncio.run(run_all())
+    print(f"I/O p99 includes the {args.io_ms:.0f} ms wait itself")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Memory and compute of a 16-day hourly forecast: NumPy columns vs lists of dicts.
+
+Builds a synthetic Open-Meteo response (384 hours), then measures for both
+representations the memory held per forecast (tracemalloc over --forecasts
+copies, as if that many sessions held one each), parse time and the time
+to compute daily min/max/mean, precipitation totals and the first rainy
+hour of each day.
+
+    python -m benchmarks.bench_forecast --forecasts 1000
+"""
+
+import argparse
+import math
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from tools.core.forecast import parse_forecast, summarize_daily
+
+DAYS = 16
+
+
+def response_body() -> dict:
+    start = datetime(2026, 1, 1)
+    hours = [start + timedelta(hours=h) for h in range(DAYS * 24)]
+    return {
+        "timezone": "Asia/Dhaka",
+        "hourly": {
+            "time": [h.strftime("%Y-%m-%dT%H:%M") for h in hours],
+            "temperature_2m": [round(24 + 6 * math.sin(h / 24 * 2 * math.pi), 1) for h in range(len(hours))],
+            "precipitation": [round((h % 7) / 5, 1) if h % 11 == 0 else 0.0 for h in range(len(hours))],
+            "precipitation_probability": [(h * 13) % 100 for h in range(len(hours))],
+        },
+        "daily": {
+            "time": [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(DAYS)],
+            "weathercode": [(0, 2, 61, 95)[d % 4] for d in range(DAYS)],
+        },
+    }
+
+
+def parse_rows(data: dict) -> list:
+    """The list-of-dicts representation: one dict per hour"""
+    hourly = data["hourly"]
+    return [
+        {"time": datetime.fromisoformat(t), "temperature": temp, "precipitation": rain, "probability": prob}
+        for t, temp, rain, prob in zip(hourly["time"], hourly["temperature_2m"], hourly["precipitation"],
+                                       hourly["precipitation_probability"])
+    ]
+
+
+def summarize_rows(rows: list) -> list:
+    days = {}
+    for row in rows:
+        days.setdefault(row["time"].date(), []).append(row)
+    summary = []
+    for day, hours in days.items():
+        temps = [h["temperature"] for h in hours if h["temperature"] is not None]
+        first_rain = next((h["time"].hour for h in hours if (h["precipitation"] or 0) >= 0.1), -1)
+        summary.append({
+            "day": day, "min": min(temps), "max": max(temps), "mean": sum(temps) / len(temps),
+            "precipitation": sum(h["precipitation"] or 0 for h in hours),
+            "probability": max(h["probability"] for h in hours), "first_rain_hour": first_rain,
+        })
+    return summary
+
+
+def held_bytes(build, count: int) -> float:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    held = [build() for _ in range(count)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return (after - before) / count
+
+
+def per_call_us(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--forecasts", type=int, default=1000, help="forecasts held at once for the memory figure")
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    data = response_body()
+    rows = parse_rows(data)
+    forecast = parse_forecast(data)
+
+    row_summary = summarize_rows(rows)
+    column_summary = summarize_daily(forecast)
+    assert [round(r["max"], 3) for r in row_summary] == [round(float(v), 3) for v in column_summary.temperature_max]
+    assert [r["first_rain_hour"] for r in row_summary] == column_summary.first_rain_hour.tolist()
+
+    results = [
+        ("lists of dicts", held_bytes(lambda: parse_rows(data), args.forecasts),
+         per_call_us(lambda: parse_rows(data), args.repeat), per_call_us(lambda: summarize_rows(rows), args.repeat)),
+        ("numpy columns", held_bytes(lambda: parse_forecast(data), args.forecasts),
+         per_call_us(lambda: parse_forecast(data), args.repeat),
+         per_call_us(lambda: summarize_daily(forecast), args.repeat)),
+    ]
+    print(f"{DAYS}-day hourly forecast ({len(rows)} hours), {args.forecasts} held at once")
+    print(f"{'representation':<16}{'bytes each':>12}{'parse':>12}{'summarize':>12}")
+    for name, size, parse_us, summarize_us in results:
+        print(f"{name:<16}{size:>12,.0f}{parse_us:>9.0f} µs{summarize_us:>9.0f} µs")
+    print(f"column arrays alone: {forecast.nbytes:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Offline gazetteer lookup latency versus the network geocoding path.
+
+Builds an index from a GeoNames dump (or a synthetic one with --places),
+then times index load, exact, "City, Country", prefix and fuzzy lookups.
+The network figure is a single round trip to a local stub server, i.e. a
+lower bound for Nominatim, which also allows only one request per second.
+
+    python -m benchmarks.bench_gazetteer --places 30000
+    python -m benchmarks.bench_gazetteer --source cities15000.txt
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_http_pool import start_stub_server
+from tools.core.gazetteer import Gazetteer, build_index
+from tools.core.http import HttpClientRegistry
+
+COUNTRIES = ["GB", "FR", "DE", "US", "BD", "JP", "BR", "IN", "CA", "AU"]
+
+
+def write_synthetic_dump(path: Path, places: int, seed: int = 7):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for geoname_id in range(places):
+            name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))).title()
+            fields = [""] * 19
+            fields[0] = str(geoname_id)
+            fields[1] = fields[2] = name
+            fields[4] = f"{rng.uniform(-80, 80):.5f}"
+            fields[5] = f"{rng.uniform(-180, 180):.5f}"
+            fields[8] = rng.choice(COUNTRIES)
+            fields[14] = str(rng.randint(15000, 5_000_000))
+            f.write("\t".join(fields) + "\n")
+
+
+def time_per_call(func, queries, repeat: int = 3) -> float:
+    """Best-of-repeat mean seconds per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            func(query)
+        best = min(best, (time.perf_counter() - start) / len(queries))
+    return best
+
+
+def typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(name))
+    return name[:i] + name[i + 1:]
+
+
+async def network_round_trip(url: str, requests: int) -> float:
+    registry = HttpClientRegistry()
+    try:
+        await registry.get_client(url).get(url)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await registry.get_client(url).get(url)
+        return (time.perf_counter() - start) / requests
+    finally:
+        await registry.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", type=Path, help="GeoNames cities dump")
+    parser.add_argument("--places", type=int, default=30000, help="synthetic places when no --source")
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.source
+        if source is None:
+            source = Path(tmp) / "cities.txt"
+            write_synthetic_dump(source, args.places)
+        index_path = Path(tmp) / "gazetteer.bin"
+
+        start = time.perf_counter()
+        n_places, n_keys = build_index(source, index_path)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        gazetteer = Gazetteer(index_path)
+        load_time = time.perf_counter() - start
+
+        rng = random.Random(1)
+        sample = [gazetteer.place(rng.randrange(n_places)) for _ in range(args.queries)]
+        names = [place.name for place in sample]
+        qualified = [f"{place.name}, {place.country_code}" for place in sample]
+        prefixes = [name[:3] for name in names]
+        typos = [typo(name, rng) for name in names if len(name) >= 8][:max(1, args.queries // 4)]
+
+        results = {
+            "exact": time_per_call(gazetteer.lookup, names),
+            "city, country": time_per_call(gazetteer.lookup, qualified),
+            "prefix (3 chars)": time_per_call(gazetteer.prefix, prefixes),
+            "fuzzy (1 typo)": time_per_call(gazetteer.lookup, typos, repeat=1),
+        }
+        fuzzy_hits = sum(
+            1 for query in typos if gazetteer.lookup(query) is not None
+        )
+        gazetteer.close()
+
+        print(f"Index: {n_places} places, {n_keys} keys, {index_path.stat().st_size / 1024:.0f} KiB, "
+              f"built in {build_time:.2f} s, opened in {load_time * 1e6:.0f} µs")
+        for label, seconds in results.items():
+            print(f"  {label:<18} {seconds * 1e6:9.1f} µs / lookup")
+        print(f"  fuzzy resolved {fuzzy_hits}/{len(typos)} misspelled queries")
+
+    server = start_stub_server(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        network = asyncio.run(network_round_trip(url, 200))
+    finally:
+        server.shutdown()
+    print(f"  {'network (local)':<18} {network * 1e6:9.1f} µs / request (before Nominatim's 1 req/s limit)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cold vs pooled HTTP latency against a local stub server.
+
+"cold" opens a new httpx.AsyncClient per request, like the tools used to;
+"pooled" goes through the shared HttpClientRegistry. --handshake-ms adds a
+delay to every new connection to mimic TCP+TLS setup on a real network.
+
+    python -m benchmarks.bench_http_pool --requests 200 --handshake-ms 30
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from tools.core.http import HttpClientRegistry
+
+
+def start_stub_server(handshake_ms: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            # Runs once per accepted connection, not per request
+            time.sleep(handshake_ms / 1000.0)
+            super().setup()
+
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_cold(url: str, requests: int):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            (await client.get(url)).raise_for_status()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def run_pooled(url: str, requests: int):
+    registry = HttpClientRegistry()
+    timings = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            (await registry.get_client(url).get(url)).raise_for_status()
+            timings.append(time.perf_counter() - start)
+    finally:
+        await registry.aclose()
+    return timings
+
+
+def report(label: str, timings):
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<8} mean {statistics.mean(timings) * 1000:7.2f} ms   "
+          f"p50 {statistics.median(timings) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms   "
+          f"total {sum(timings):6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=0.0,
+                        help="artificial delay per new connection")
+    args = parser.parse_args()
+
+    server = start_stub_server(args.handshake_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        cold = asyncio.run(run_cold(url, args.requests))
+        pooled = asyncio.run(run_pooled(url, args.requests))
+    finally:
+        server.shutdown()
+
+    print(f"{args.requests} sequential GETs, handshake delay {args.handshake_ms} ms")
+    report("cold", cold)
+    report("pooled", pooled)
+    print(f"speedup  {statistics.mean(cold) / statistics.mean(pooled):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
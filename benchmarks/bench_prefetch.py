@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+How many weather lookups wait on the network, with and without the prefetcher.
+
+Drives a fresh WeatherCache (the real Open-Meteo loader, pointed at a fake
+upstream with --upstream-ms latency) with open-loop traffic: --rps
+lookups per second for --duration seconds, places drawn from a Zipf
+distribution over --cities, so a few places make up most requests. Time
+is compressed: TTL, grace and the prefetcher's lead, interval and
+half-life are seconds instead of minutes. The run is repeated with the
+prefetcher off and on; a lookup "waits" when it misses the cache. First
+lookups of a place always wait, so "rewaited" counts only the misses on
+places that had been looked up before: those are what prefetching removes;
+"hot waited" is the same for the --top-n most popular places alone.
+
+    python -m benchmarks.bench_prefetch --duration 30 --rps 100 --cities 1000 --zipf 1.1
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from benchmarks.bench_server import percentile
+from benchmarks.fakes import Faults, FakeOpenMeteo
+
+
+async def run_traffic(args, prefetch: bool) -> Dict[str, Any]:
+    from tools.core.http import http_clients
+    from tools.core.open_meteo import fetch_current_weather
+    from tools.core.popularity import PopularityTracker
+    from tools.core.prefetch import Prefetcher
+    from tools.core.weather_cache import WeatherCache
+
+    rng = random.Random(args.seed)
+    places = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(args.cities)]
+    weights = list(itertools.accumulate(1 / (rank ** args.zipf) for rank in range(1, args.cities + 1)))
+
+    cache = WeatherCache(fetch_current_weather, ttl=args.ttl, grace=args.grace, max_entries=args.cities,
+                         popularity=PopularityTracker(half_life=args.half_life))
+    prefetcher = Prefetcher(cache, top_n=args.top_n, lead=args.lead, interval=args.interval, rate=args.rate,
+                            batch_size=args.batch, min_score=args.min_score, enabled=prefetch, seed=args.seed)
+    latencies: List[float] = []
+    seen: Set[Tuple[float, float]] = set()
+    hot = set(places[:args.top_n])
+    repeats = rewaited = hot_lookups = hot_repeats = hot_rewaited = 0
+
+    async def lookup(point):
+        nonlocal repeats, rewaited, hot_lookups, hot_repeats, hot_rewaited
+        repeat = point in seen
+        seen.add(point)
+        remaining = cache.expires_in(cache.cell(*point))
+        missed = remaining is None or remaining <= -cache.grace
+        start = time.perf_counter()
+        try:
+            await cache.get(*point)
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - start)
+        hot_lookups += point in hot
+        if repeat:
+            repeats += 1
+            rewaited += missed
+            if point in hot:
+                hot_repeats += 1
+                hot_rewaited += missed
+
+    await http_clients.start()
+    prefetcher.start()
+    tasks = []
+    try:
+        started = time.perf_counter()
+        for i in range(int(args.duration * args.rps)):
+            delay = started + i / args.rps - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(lookup(rng.choices(places, cum_weights=weights)[0])))
+        await asyncio.gather(*tasks)
+    finally:
+        await prefetcher.aclose()
+        await http_clients.aclose()
+
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "lookups": lookups,
+        "hot_share": hot_lookups / lookups,
+        "hits": stats["hits"] / lookups,
+        "stale": stats["stale_hits"] / lookups,
+        "waited": stats["misses"] / lookups,
+        "rewaited": rewaited / repeats if repeats else 0.0,
+        "hot_rewaited": hot_rewaited / hot_repeats if hot_repeats else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "prefetched": stats["prefetches"],
+        "batches": prefetcher.stats()["batches"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic per run")
+    parser.add_argument("--rps", type=float, default=100.0, help="lookups per second")
+    parser.add_argument("--cities", type=int, default=1000)
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew (higher: fewer hot places)")
+    parser.add_argument("--upstream-ms", type=float, default=150.0, help="fake Open-Meteo latency")
+    parser.add_argument("--ttl", type=float, default=4.0)
+    parser.add_argument("--grace", type=float, default=2.0)
+    parser.add_argument("--top-n", type=int, default=50)
+    parser.add_argument("--lead", type=float, default=1.0, help="refresh this long before an entry goes stale")
+    parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("--rate", type=float, default=20.0, help="prefetch requests per second")
+    parser.add_argument("--batch", type=int, default=10)
+    parser.add_argument("--min-score", type=float, default=2.0)
+    parser.add_argument("--half-life", type=float, default=24.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    upstream = FakeOpenMeteo(Faults(args.upstream_ms, args.upstream_ms / 10), seed=args.seed).start()
+    os.environ["WEATHER_AGENT_OPEN_METEO_URL"] = f"{upstream.url}/v1/forecast"
+    try:
+        print(f"{args.duration:.0f} s at {args.rps:.0f} lookups/s over {args.cities} places (zipf {args.zipf}), "
+              f"TTL {args.ttl} s, upstream {args.upstream_ms:.0f} ms")
+        print(f"{'prefetch':<10}{'fresh':>8}{'stale':>8}{'waited':>8}{'rewaited':>10}{'hot waited':>12}{'p50':>10}{'p95':>10}{'p99':>10}"
+              f"{'upstream':>10}{'prefetched':>12}")
+        for prefetch in (False, True):
+            before = upstream.requests
+            result = asyncio.run(run_traffic(args, prefetch))
+            hot_share = result["hot_share"]
+            print(f"{'on' if prefetch else 'off':<10}{result['hits']:>8.1%}{result['stale']:>8.1%}"
+                  f"{result['waited']:>8.1%}{result['rewaited']:>10.1%}{result['hot_rewaited']:>12.1%}"
+                  f"{result['p50_ms']:>7.1f} ms{result['p95_ms']:>7.1f} ms"
+                  f"{result['p99_ms']:>7.1f} ms{upstream.requests - before:>10}{result['prefetched']:>12}")
+        print(f"the {args.top_n} most popular places got {hot_share:.0%} of the lookups")
+    finally:
+        upstream.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Prompt tokens and time to first token with and without per-query tool subsetting.
+
+For every query in the corpus the first model request of a turn is sent
+twice: as before (all tools with their full docstrings and the old
+hand-written system prompt) and as now (the selected tools with registry
+descriptions and the generated prompt). By default the model is a stub
+OpenAI-compatible server that reports prompt tokens (about one per word or
+symbol of the request) and streams its reply after a prefill delay of
+--prefill-ms per prompt token, like a local model on CPU. --base-url points
+the benchmark at a real endpoint instead (e.g. Ollama), whose own token
+counts and latencies are then reported.
+
+    python -m benchmarks.bench_prompt --prefill-ms 0.5
+    python -m benchmarks.bench_prompt --base-url http://localhost:11434/v1 --model qwen3:0.6b
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUERIES = [
+    "What's the weather in London?",
+    "Is it going to rain in Seattle, should I take an umbrella?",
+    "How hot is it in Dubai and Cairo right now?",
+    "Weather in Dhaka, Bangladesh in fahrenheit",
+    "What time is it in Tokyo?",
+    "Convert 3pm New York time to London time",
+    "What's the time in Sydney, Berlin and Los Angeles?",
+    "What is 15% of 240?",
+    "calculate (12 + 8) * 3 / 4",
+    "Tell me an interesting fact",
+    "Is github.com online?",
+    "Check whether example.com and python.org are reachable",
+    "Who made you?",
+    "Tell me about yourself and your capabilities",
+    "Hi there!",
+    "Is it cold in Oslo and what time is it there?",
+]
+
+# The system prompt every request carried before tool subsetting
+LEGACY_SYSTEM_MESSAGE = """You are a professional multi-purpose assistant. You MUST use the provided tools to answer user requests. Do not provide generic responses.
+
+IMPORTANT: You have access to these tools and MUST use them:
+- get_weather(city, format): Get real weather data for any city
+- get_weather_many(cities, format): Get weather for several cities in one call
+- get_current_time(timezone_name): Get current time in any timezone
+- get_current_times(timezone_names): Get current time in several timezones at once
+- convert_timezone(time_str, from_tz, to_tz): Convert time between zones
+- convert_timezone_many(time_strs, from_tz, to_tzs): Convert times into several zones at once
+- calculate(expression): Calculate mathematical expressions
+- check_website(url): Check website accessibility
+- check_websites(urls): Check many websites at once
+- get_random_fact(): Get interesting facts
+- about_me(): Get information about the agent creator (MD Shariful Islam)
+- agent_about(): Get information about this AI agent and its capabilities
+
+RULES:
+1. When users ask for weather information, ALWAYS call get_weather() with the city name; for two or more cities call get_weather_many() once with all of them
+2. When users ask for time information, ALWAYS call get_current_time() with the timezone
+3. When users ask for calculations, ALWAYS call calculate() with the expression
+4. NEVER provide fake or made-up information - always use the tools
+5. If a user asks about Dhaka time, use timezone "Asia/Dhaka"
+6. If a user asks about Dhaka weather, use city "Dhaka, Bangladesh"
+
+Example correct behavior:
+User: "What's the weather in London?"
+Assistant: [Calls get_weather("London")] then presents the real data
+
+User: "What time is it in Tokyo?"
+Assistant: [Calls get_current_time("Asia/Tokyo")] then presents the real time
+
+Always use tools - never guess or make up information!"""
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+REPLY = ["It", " is", " 21", "°C", " and", " sunny", "."]
+
+
+def approximate_tokens(payload: dict) -> int:
+    """Rough BPE-like count of what the model has to prefill"""
+    return len(_TOKEN.findall(json.dumps([payload.get("messages"), payload.get("tools")], ensure_ascii=False)))
+
+
+def start_model_server(prefill_ms: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def chunk(self, payload):
+            data = f"data: {json.dumps(payload)}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt_tokens = approximate_tokens(request)
+            time.sleep(prompt_tokens * prefill_ms / 1000.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": "stub"}
+            for i, piece in enumerate(REPLY):
+                delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+                self.chunk({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            self.chunk({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            self.chunk({**base, "choices": [], "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(REPLY),
+                "total_tokens": prompt_tokens + len(REPLY),
+            }})
+            self.chunk_end()
+
+        def chunk_end(self):
+            data = b"data: [DONE]\n\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n0\r\n\r\n")
+            self.wfile.flush()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure(client, messages, tools):
+    """(prompt tokens, seconds to the first streamed token, tools sent)"""
+    from autogen_core.models import CreateResult
+
+    start = time.perf_counter()
+    first = None
+    usage = None
+    async for chunk in client.create_stream(messages, tools=tools,
+                                            extra_create_args={"stream_options": {"include_usage": True}}):
+        if isinstance(chunk, CreateResult):
+            usage = chunk.usage
+        elif first is None:
+            first = time.perf_counter() - start
+    return usage.prompt_tokens, first if first is not None else time.perf_counter() - start
+
+
+async def run(args):
+    from autogen_core.models import SystemMessage, UserMessage
+
+    from agent import FUNCTION_TOOLS, SYSTEM_MESSAGE, TOOLS, StaticSchemaTool, completion_client, model_client
+    from tool_selection import ToolSelector
+    from tools import tool_manager
+
+    legacy_tools = [StaticSchemaTool(func, description=func.__doc__ or "") for func in TOOLS]
+    selector = ToolSelector(tool_manager)
+
+    rows = []
+    print(f"{'query':<52}{'tools':>7}{'tokens before':>15}{'after':>7}{'ttft before':>13}{'after':>9}")
+    for query in QUERIES:
+        before = [await measure(completion_client,
+                                [SystemMessage(content=LEGACY_SYSTEM_MESSAGE), UserMessage(content=query, source="user")],
+                                legacy_tools) for _ in range(args.repeat)]
+        after = [await measure(model_client,
+                               [SystemMessage(content=SYSTEM_MESSAGE), UserMessage(content=query, source="user")],
+                               FUNCTION_TOOLS) for _ in range(args.repeat)]
+        tools = len(selector.select(query))
+        row = (before[0][0], after[0][0],
+               statistics.median(t for _, t in before) * 1000, statistics.median(t for _, t in after) * 1000)
+        rows.append(row)
+        print(f"{query[:50]:<52}{tools:>4}/{len(TOOLS):<2}{row[0]:>15}{row[1]:>7}{row[2]:>10.0f} ms{row[3]:>6.0f} ms")
+
+    tokens_before = sum(r[0] for r in rows)
+    tokens_after = sum(r[1] for r in rows)
+    ttft_before = statistics.mean(r[2] for r in rows)
+    ttft_after = statistics.mean(r[3] for r in rows)
+    print(f"\nPrompt tokens: {tokens_before / len(rows):.0f} -> {tokens_after / len(rows):.0f} per request "
+          f"({1 - tokens_after / tokens_before:.0%} fewer)")
+    print(f"Time to first token: {ttft_before:.0f} ms -> {ttft_after:.0f} ms "
+          f"({1 - ttft_after / ttft_before:.0%} faster)")
+    await completion_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prefill-ms", type=float, default=0.5, help="stub prefill time per prompt token")
+    parser.add_argument("--base-url", help="benchmark a real OpenAI-compatible endpoint instead of the stub")
+    parser.add_argument("--model", default="stub", help="model name at --base-url")
+    parser.add_argument("--repeat", type=int, default=3, help="requests per query and variant (median TTFT)")
+    args = parser.parse_args()
+
+    # Every request must reach the model
+    os.environ["WEATHER_AGENT_COMPLETION_CACHE"] = "false"
+    os.environ["WEATHER_AGENT_TOOL_SELECTION"] = "true"
+    model = None
+    if args.base_url is None:
+        model = start_model_server(args.prefill_ms)
+        args.base_url = f"http://127.0.0.1:{model.server_address[1]}/v1"
+    os.environ["WEATHER_AGENT_MODEL"] = args.model
+    os.environ["WEATHER_AGENT_MODEL_BASE_URL"] = args.base_url
+    try:
+        asyncio.run(run(args))
+    finally:
+        if model is not None:
+            model.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tokens per tool result: the rendered text versus the compact JSON the model is sent.
+
+Calls every tool once against local fakes of Nominatim, Open-Meteo and the
+facts API (see benchmarks/fakes.py) and counts the tokens of both forms of
+each result. Counts use tiktoken's cl100k_base encoding when it is
+installed and cached, otherwise an approximation of it: a word with its
+leading space, up to three digits or up to three ASCII punctuation marks
+(`":"`, `","`) make one token; other symbols one each, emoji two. Qwen's
+tokenizer gives different absolute numbers but similar ratios.
+
+    python -m benchmarks.bench_results
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.fakes import FakeFacts, FakeNominatim, FakeOpenMeteo
+
+_TOKEN = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[!-/:-@\[-`{-~]{1,3}|\n+| +|[^\x00-\x7f]")
+
+CALLS = [
+    ("get_weather", {"city": "Dhaka"}),
+    ("get_weather_many", {"cities": ["Paris", "Berlin", "Rome", "Madrid", "Lisbon"]}),
+    ("get_forecast", {"city": "Dhaka", "days": 7}),
+    ("get_current_time", {"timezone_name": "Asia/Tokyo"}),
+    ("get_current_times", {"timezone_names": ["Tokyo", "EST", "Bangladesh", "London"]}),
+    ("convert_timezone", {"time_str": "14:30", "from_tz": "EST", "to_tz": "Asia/Dhaka"}),
+    ("convert_timezone_many", {"time_strs": ["09:00", "17:00"], "from_tz": "UTC", "to_tzs": ["JST", "PST"]}),
+    ("calculate", {"expression": "(17 + 3) * 23 / 4"}),
+    ("get_random_fact", {}),
+    ("check_website", {"url": "{site}"}),
+    ("check_websites", {"urls": ["{site}", "{site}/missing", "http://127.0.0.1:9"]}),
+    ("about_me", {}),
+    ("agent_about", {}),
+]
+
+
+def token_counter() -> "tuple[str, Callable[[str], int]]":
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return "cl100k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "approximate", approximate_tokens
+
+
+def approximate_tokens(text: str) -> int:
+    return sum(2 if len(token.encode()) == 4 else 1 for token in _TOKEN.findall(text))
+
+
+async def collect(site: str):
+    from tools import tool_manager
+    from tools.core.http import http_clients
+    from tools.core.results import serialize
+
+    rows = []
+    await http_clients.start()
+    try:
+        for name, arguments in CALLS:
+            arguments = {key: [v.format(site=site) for v in value] if isinstance(value, list)
+                         else value.format(site=site) if isinstance(value, str) else value
+                         for key, value in arguments.items()}
+            result = await tool_manager.get_tool_by_name(name)(**arguments)
+            rows.append((name, serialize(result, compact=False), serialize(result, compact=True)))
+    finally:
+        await http_clients.aclose()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--show", action="store_true", help="print both forms of every result")
+    args = parser.parse_args()
+
+    fakes = [FakeNominatim().start(), FakeOpenMeteo().start(), FakeFacts().start()]
+    nominatim, open_meteo, facts = fakes
+    workdir = tempfile.TemporaryDirectory(prefix="weather-agent-bench-")
+    os.environ.update({
+        "WEATHER_AGENT_NOMINATIM_URL": f"{nominatim.url}/search",
+        "WEATHER_AGENT_OPEN_METEO_URL": f"{open_meteo.url}/v1/forecast",
+        "WEATHER_AGENT_FACTS_URL": f"{facts.url}/random.json?language=en",
+        "WEATHER_AGENT_FACTS_PREFETCH": "false",
+        "WEATHER_AGENT_CACHE_DIR": workdir.name,
+        "WEATHER_AGENT_GAZETTEER": str(Path(workdir.name) / "no-gazetteer.bin"),
+    })
+    try:
+        rows = asyncio.run(collect(facts.url))
+    finally:
+        for fake in fakes:
+            fake.shutdown()
+        workdir.cleanup()
+
+    encoding, count = token_counter()
+    print(f"Tokens per tool result ({encoding})")
+    print(f"{'tool':<24}{'text':>8}{'json':>8}{'saved':>8}")
+    total_text = total_json = 0
+    for name, text, compact in rows:
+        text_tokens, json_tokens = count(text), count(compact)
+        total_text += text_tokens
+        total_json += json_tokens
+        print(f"{name:<24}{text_tokens:>8}{json_tokens:>8}{1 - json_tokens / text_tokens:>8.0%}")
+        if args.show:
+            print(f"  text: {text!r}\n  json: {compact}")
+    print(f"{'total':<24}{total_text:>8}{total_json:>8}{1 - total_json / total_text:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
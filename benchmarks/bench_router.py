@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Intent fast path: hit rate, accuracy and latency saved on a labeled query set.
+
+Each query is labeled with the tool call the fast path should make, or None
+when it must fall through to the LLM. Only routing is timed here (tools are
+not called); the saving per hit is the two model calls the agent would make
+around the tool call, --model-ms each.
+
+    python -m benchmarks.bench_router --model-ms 800
+"""
+
+import argparse
+import time
+
+from router import IntentRouter
+from tools import tool_manager
+
+LABELED_QUERIES = [
+    ("weather in London", ("get_weather", {"city": "London"})),
+    ("What's the weather like in Paris?", ("get_weather", {"city": "Paris"})),
+    ("what is the weather in Dhaka, Bangladesh", ("get_weather", {"city": "Dhaka, Bangladesh"})),
+    ("Tokyo weather", ("get_weather", {"city": "Tokyo"})),
+    ("weather for New York in fahrenheit", ("get_weather", {"city": "New York", "format": "fahrenheit"})),
+    ("current weather in Austin, TX", ("get_weather", {"city": "Austin, TX"})),
+    ("is it raining in Seattle?", ("get_weather", {"city": "Seattle"})),
+    ("how's the weather in Rome", ("get_weather", {"city": "Rome"})),
+    ("weather in London and Paris", ("get_weather_many", {"cities": ["London", "Paris"]})),
+    ("weather in Rome, Paris and Berlin", ("get_weather_many", {"cities": ["Rome", "Paris", "Berlin"]})),
+    ("what time is it in Tokyo?", ("get_current_time", {"timezone_name": "Tokyo"})),
+    ("time in New York", ("get_current_time", {"timezone_name": "New York"})),
+    ("current time in UTC", ("get_current_time", {"timezone_name": "UTC"})),
+    ("Dhaka time", ("get_current_time", {"timezone_name": "Dhaka"})),
+    ("what's the time in Asia/Kolkata", ("get_current_time", {"timezone_name": "Asia/Kolkata"})),
+    ("what is 2 + 3 * 4", ("calculate", {"expression": "2 + 3 * 4"})),
+    ("calculate (15 + 5) / 4", ("calculate", {"expression": "(15 + 5) / 4"})),
+    ("12*12", ("calculate", {"expression": "12*12"})),
+    ("what's 100 % 7?", ("calculate", {"expression": "100 % 7"})),
+    ("tell me a random fact", ("get_random_fact", {})),
+    ("fun fact", ("get_random_fact", {})),
+    ("is github.com up?", ("check_website", {"url": "github.com"})),
+    ("check https://example.org", ("check_website", {"url": "https://example.org"})),
+    # Must fall through to the LLM
+    ("weather in London tomorrow", None),
+    ("Will it rain in Paris this weekend?", None),
+    ("What should I wear in Oslo today?", None),
+    ("compare the weather in Paris and Rome", None),
+    ("weather in Paris, Berlin", None),
+    ("how is the weather", None),
+    ("what time is it", None),
+    ("time in London and Tokyo", None),
+    ("convert 15:00 EST to Tokyo time", None),
+    ("what is love", None),
+    ("what is 2", None),
+    ("who created you?", None),
+    ("hello there", None),
+    ("can you tell me about yourself", None),
+    ("is the sky blue", None),
+    ("check my code", None),
+    ("what is the capital of France", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-ms", type=float, default=800.0, help="latency of one model call")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every miss")
+    args = parser.parse_args()
+
+    router = IntentRouter(tool_manager, enabled=True)
+    routable = sum(1 for _, expected in LABELED_QUERIES if expected is not None)
+    hits = correct = false_positives = 0
+    for query, expected in LABELED_QUERIES:
+        route = router.route(query)
+        actual = (route.tool, route.arguments) if route else None
+        if route is not None:
+            if expected is None:
+                false_positives += 1
+            else:
+                hits += 1
+            correct += actual == expected
+        if args.verbose and actual != expected:
+            print(f"  {query!r}: expected {expected}, got {actual}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for query, _ in LABELED_QUERIES:
+            router.route(query)
+    routing_us = (time.perf_counter() - start) / (args.repeat * len(LABELED_QUERIES)) * 1e6
+
+    routed = hits + false_positives
+    print(f"Labeled queries: {len(LABELED_QUERIES)} ({routable} routable)")
+    print(f"  hit rate        {hits / routable:6.1%}  ({hits}/{routable} routable queries took the fast path)")
+    print(f"  accuracy        {correct / routed if routed else 1:6.1%}  ({correct}/{routed} routed with the right tool and arguments)")
+    print(f"  false positives {false_positives:6d}  (queries that should have gone to the LLM)")
+    print(f"  routing cost    {routing_us:6.1f} µs / query")
+    saved = 2 * args.model_ms - routing_us / 1000
+    print(f"  latency saved   {saved:6.0f} ms per hit (2 model calls of {args.model_ms:g} ms), "
+          f"{saved * hits / len(LABELED_QUERIES):.0f} ms per query on this mix")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Throughput of the multi-session server at a target latency.
+
+Starts a stub OpenAI-compatible model server (fixed reply after
+--model-ms), the agent server on an ephemeral port, and then N concurrent
+clients, each with its own session, sending requests back to back. For
+every concurrency level it reports requests per second and p50/p95
+latency, and finally the best throughput whose p95 stays under --target-ms.
+
+    python -m benchmarks.bench_server --model-ms 50 --target-ms 250
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETION = {
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "It is 21°C and sunny in Paris."},
+        "finish_reason": "stop",
+    }],
+    "usage": {"prompt_tokens": 900, "completion_tokens": 12, "total_tokens": 912},
+}
+
+
+def start_model_server(model_ms: float) -> ThreadingHTTPServer:
+    body = json.dumps(COMPLETION).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(model_ms / 1000.0)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def client(port: int, requests: int, latencies: list, errors: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    session = None
+    try:
+        for i in range(requests):
+            start = time.perf_counter()
+            writer.write(json.dumps({"id": i, "session": session, "message": "Weather in Paris?"}).encode() + b"\n")
+            await writer.drain()
+            while True:
+                event = json.loads(await reader.readline())
+                session = event.get("session", session)
+                if event["type"] == "done":
+                    latencies.append(time.perf_counter() - start)
+                    break
+                if event["type"] == "error":
+                    errors.append(event["error"])
+                    break
+    finally:
+        writer.close()
+
+
+async def run_level(port: int, concurrency: int, requests: int):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies, errors
+
+
+def percentile(values, q: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1] if len(values) > 1 else values[0]
+
+
+async def run(args):
+    from agent import create_agent_team
+    from server import AdmissionControl, SessionPool, serve
+
+    pool = SessionPool(create_agent_team, max_sessions=max(args.levels) * 2, idle_timeout=300)
+    admission = AdmissionControl(args.max_active, args.max_queued)
+    ready = asyncio.get_running_loop().create_future()
+    server_task = asyncio.create_task(serve("127.0.0.1", 0, pool, admission, ready.set_result))
+    listener = await ready
+    port = listener.sockets[0].getsockname()[1]
+
+    best = None
+    print(f"model latency {args.model_ms:g} ms, max_active {args.max_active}, target p95 {args.target_ms:g} ms")
+    print(f"{'clients':>8}{'req/s':>9}{'p50':>10}{'p95':>10}{'errors':>8}")
+    try:
+        for concurrency in args.levels:
+            rps, latencies, errors = await run_level(port, concurrency, args.requests)
+            p50 = percentile(latencies, 50) * 1000
+            p95 = percentile(latencies, 95) * 1000
+            print(f"{concurrency:>8}{rps:>9.1f}{p50:>7.0f} ms{p95:>7.0f} ms{len(errors):>8}")
+            if p95 <= args.target_ms and not errors and (best is None or rps > best[1]):
+                best = (concurrency, rps)
+    finally:
+        server_task.cancel()
+    if best:
+        print(f"Best: {best[1]:.1f} req/s with {best[0]} concurrent sessions at p95 <= {args.target_ms:g} ms")
+    else:
+        print(f"No level met p95 <= {args.target_ms:g} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model-ms", type=float, default=50.0, help="stub model response time")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="p95 latency target")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32, 64])
+    parser.add_argument("--max-active", type=int, default=32)
+    parser.add_argument("--max-queued", type=int, default=256)
+    args = parser.parse_args()
+
+    model = start_model_server(args.model_ms)
+    os.environ["WEATHER_AGENT_MODEL"] = "stub"
+    os.environ["WEATHER_AGENT_MODEL_BASE_URL"] = f"http://127.0.0.1:{model.server_address[1]}/v1"
+    try:
+        asyncio.run(run(args))
+    finally:
+        model.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Cold start time with eager versus lazy (manifest-driven) tool discovery.
+
+Each command runs in a fresh interpreter, so module import costs are paid
+every time. The first lazy run builds the manifest; the timed runs reuse it.
+
+    python -m benchmarks.bench_startup --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = {
+    "import tools": [sys.executable, "-c", "import tools"],
+    "list_tools.py": [sys.executable, "list_tools.py"],
+    "first tool call": [sys.executable, "-c",
+                        "import asyncio, tools; "
+                        "asyncio.run(tools.tool_manager.get_tool_by_name('calculate')('2+2'))"],
+}
+
+
+def time_command(command, eager: bool, runs: int) -> float:
+    """Median wall seconds for a command"""
+    env = dict(os.environ, WEATHER_AGENT_EAGER_TOOLS="1" if eager else "0")
+    subprocess.run(command, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = time_command([sys.executable, "-c", "pass"], eager=False, runs=args.runs)
+    print(f"Interpreter start: {baseline * 1000:.0f} ms (median of {args.runs})")
+    print(f"  {'command':<16} {'eager':>9} {'lazy':>9} {'speedup':>8}")
+    for label, command in COMMANDS.items():
+        eager = time_command(command, eager=True, runs=args.runs)
+        lazy = time_command(command, eager=False, runs=args.runs)
+        print(f"  {label:<16} {eager * 1000:7.0f} ms {lazy * 1000:7.0f} ms {eager / lazy:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
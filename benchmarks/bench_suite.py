@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Hermetic benchmark suite: the tools and the full agent against local fake upstreams.
+
+Starts fake Nominatim, Open-Meteo, facts and OpenAI-compatible model
+servers (see benchmarks/fakes.py), points the agent at them through
+WEATHER_AGENT_* settings and a fresh cache directory, and then drives each
+scenario at every --concurrency level: workers call the tool (or run an
+agent team turn, one team per worker) back to back until --requests calls
+are done. It reports p50/p95/p99 latency, throughput and error rate per
+level, plus allocations per call measured with tracemalloc in a separate
+sequential pass, and saves everything as JSON. --compare flags p95 and
+throughput regressions against an earlier results file (exit status 1).
+
+    python -m benchmarks.bench_suite --concurrency 1 8 32 --upstream-ms 20 --failure-rate 0.01
+    python -m benchmarks.bench_suite --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+from benchmarks.bench_server import percentile
+from benchmarks.fakes import Faults, FakeChatModel, FakeFacts, FakeNominatim, FakeOpenMeteo, upstream_environment
+
+AGENT_QUERIES = [
+    "weather in {city}",
+    "what time is it in Tokyo?",
+    "what is 17 * 23",
+    "tell me a random fact",
+    "weather in {city} and {other}",
+    "Hello! What can you do?",
+]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_scenarios(args, site_url: str) -> Dict[str, Callable[[], Callable[[int], Awaitable[Any]]]]:
+    """Scenario name -> factory of a per-worker call(i) coroutine function"""
+    from tools import tool_manager
+
+    rng = random.Random(args.seed)
+    cities = [f"Benchtown {n}" for n in range(args.cities)]
+
+    def tool_call(name: str, arguments: Callable[[int], Dict[str, Any]]):
+        def factory():
+            tool = tool_manager.get_tool_by_name(name)
+
+            async def call(i: int):
+                return await tool(**arguments(i))
+            return call
+        return factory
+
+    def agent_factory():
+        from agent import create_agent_team
+
+        team = create_agent_team()
+
+        async def call(i: int):
+            task = AGENT_QUERIES[i % len(AGENT_QUERIES)].format(city=rng.choice(cities), other=rng.choice(cities))
+            result = await team.run(task=task)
+            return result.messages[-1].to_text()
+        return call
+
+    return {
+        "get_weather": tool_call("get_weather", lambda i: {"city": rng.choice(cities)}),
+        "get_weather_many": tool_call("get_weather_many", lambda i: {"cities": rng.sample(cities, 5)}),
+        "get_forecast": tool_call("get_forecast", lambda i: {"city": rng.choice(cities), "days": 16}),
+        "get_random_fact": tool_call("get_random_fact", lambda i: {}),
+        "check_website": tool_call("check_website", lambda i: {"url": site_url}),
+        "calculate": tool_call("calculate", lambda i: {"expression": f"({i} + 3) * 7 / 2"}),
+        "get_current_time": tool_call("get_current_time", lambda i: {"timezone_name": "Asia/Tokyo"}),
+        "agent": agent_factory,
+    }
+
+
+async def run_level(factory, concurrency: int, requests: int) -> Dict[str, Any]:
+    from tools.core.metrics import classify_result
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker(call):
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                result = await call(i)
+                failed = classify_result(result) != "ok"
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    calls = [factory() for _ in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(call) for call in calls))
+    elapsed = time.perf_counter() - start
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "concurrency": concurrency,
+        "requests": len(ms),
+        "errors": errors,
+        "error_rate": errors / len(ms) if ms else 0.0,
+        "throughput": len(ms) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ms) / len(ms),
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+    }
+
+
+async def measure_allocations(factory, calls: int) -> Dict[str, float]:
+    """Memory allocated per call (sequential, after one warm-up call)"""
+    call = factory()
+    await call(0)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(1, calls + 1):
+        await call(i)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    growth = [stat for stat in after.compare_to(before, "filename") if stat.size_diff > 0]
+    return {
+        "retained_bytes_per_call": sum(stat.size_diff for stat in growth) / calls,
+        "retained_blocks_per_call": sum(stat.count_diff for stat in growth) / calls,
+        "peak_kib": peak / 1024,
+    }
+
+
+async def run(args, site_url: str) -> Dict[str, Any]:
+    from tools.core.http import http_clients
+
+    scenarios = build_scenarios(args, site_url)
+    unknown = set(args.scenarios) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results, allocations = [], {}
+    await http_clients.start()
+    try:
+        print(f"{'scenario':<18}{'conc':>5}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}")
+        for name in args.scenarios:
+            for concurrency in args.concurrency:
+                level = await run_level(scenarios[name], concurrency, args.requests)
+                results.append({"scenario": name, **level})
+                print(f"{name:<18}{concurrency:>5}{level['throughput']:>10.1f}{level['p50_ms']:>7.1f} ms"
+                      f"{level['p95_ms']:>7.1f} ms{level['p99_ms']:>7.1f} ms{level['errors']:>8}")
+            if args.alloc_calls:
+                allocations[name] = await measure_allocations(scenarios[name], args.alloc_calls)
+    finally:
+        await http_clients.aclose()
+
+    if allocations:
+        print(f"\n{'scenario':<18}{'bytes/call':>12}{'blocks/call':>13}{'peak':>12}")
+        for name, stats in allocations.items():
+            print(f"{name:<18}{stats['retained_bytes_per_call']:>12.0f}{stats['retained_blocks_per_call']:>13.1f}"
+                  f"{stats['peak_kib']:>8.0f} KiB")
+    return {"results": results, "allocations": allocations}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """Print changes against a baseline; True when something regressed beyond threshold"""
+    before = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressed = False
+    print(f"\nAgainst {baseline['meta']['commit']} (regression threshold {threshold:.0%}):")
+    print(f"{'scenario':<18}{'conc':>5}{'p95 change':>12}{'req/s change':>14}")
+    for row in current["results"]:
+        old = before.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        p95 = row["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0.0
+        rps = row["throughput"] / old["throughput"] - 1 if old["throughput"] else 0.0
+        flag = p95 > threshold or rps < -threshold
+        regressed |= flag
+        print(f"{row['scenario']:<18}{row['concurrency']:>5}{p95:>+12.1%}{rps:>+14.1%}{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenarios", nargs="+",
+                        default=["get_weather", "get_weather_many", "get_forecast", "get_random_fact", "check_website",
+                                 "calculate", "get_current_time", "agent"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="calls per scenario and concurrency level")
+    parser.add_argument("--cities", type=int, default=500, help="distinct city names drawn from")
+    parser.add_argument("--upstream-ms", type=float, default=20.0, help="fake HTTP upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of upstream requests failing with 503")
+    parser.add_argument("--model-ms", type=float, default=50.0, help="fake model latency per completion")
+    parser.add_argument("--alloc-calls", type=int, default=50, help="calls in the allocation pass (0 to skip)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    upstream = Faults(args.upstream_ms, args.jitter_ms, args.failure_rate)
+    fakes = {
+        "nominatim": FakeNominatim(upstream, seed=args.seed).start(),
+        "open_meteo": FakeOpenMeteo(upstream, seed=args.seed + 1).start(),
+        "facts": FakeFacts(upstream, seed=args.seed + 2).start(),
+        "model": FakeChatModel(Faults(args.model_ms, args.jitter_ms, args.failure_rate), seed=args.seed + 3).start(),
+    }
+    workdir = tempfile.TemporaryDirectory(prefix="weather-agent-bench-")
+    os.environ.update(upstream_environment(fakes["nominatim"], fakes["open_meteo"], fakes["facts"], fakes["model"]))
+    os.environ.update({
+        "WEATHER_AGENT_CACHE_DIR": workdir.name,
+        "WEATHER_AGENT_GAZETTEER": str(Path(workdir.name) / "no-gazetteer.bin"),
+        "WEATHER_AGENT_COMPLETION_CACHE": "false",
+    })
+
+    commit = git_commit()
+    try:
+        report = asyncio.run(run(args, fakes["facts"].url))
+    finally:
+        for fake in fakes.values():
+            fake.shutdown()
+        workdir.cleanup()
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        "upstreams": {name: fake.stats() for name, fake in fakes.items()},
+        **report,
+    }
+    output = args.output or Path(__file__).parent / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare and compare(report, json.loads(args.compare.read_text()), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
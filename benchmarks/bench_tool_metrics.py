@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of ToolManager's metrics instrumentation.
+
+Awaits a trivial async tool directly and through the instrumented wrapper
+(and with an error result, which takes the classification branch), and
+reports the difference per call.
+
+    python -m benchmarks.bench_tool_metrics --calls 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from tools.core.metrics import MetricsRegistry
+
+
+async def noop(value: str) -> str:
+    return value
+
+
+async def failing(value: str) -> str:
+    return f"Error: {value}"
+
+
+async def time_calls(func, calls: int, repeat: int = 5) -> float:
+    """Best-of-repeat seconds per awaited call"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            await func("x")
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+async def run(calls: int):
+    registry = MetricsRegistry()
+    cases = {
+        "ok result": (noop, registry.instrument("noop", "bench", noop)),
+        "error result": (failing, registry.instrument("failing", "bench", failing)),
+    }
+    print(f"{'case':<14}{'bare':>10}{'instrumented':>14}{'overhead':>11}")
+    for label, (bare, instrumented) in cases.items():
+        bare_time = await time_calls(bare, calls)
+        wrapped_time = await time_calls(instrumented, calls)
+        print(f"{label:<14}{bare_time * 1e6:8.2f} µs{wrapped_time * 1e6:12.2f} µs"
+              f"{(wrapped_time - bare_time) * 1e6:9.2f} µs")
+
+    start = time.perf_counter()
+    snapshot = registry.snapshot()
+    registry.to_prometheus()
+    export_time = time.perf_counter() - start
+    print(f"recorded {snapshot['categories']['bench']['calls']} calls; "
+          f"snapshot + Prometheus export took {export_time * 1e6:.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Local stand-ins for the agent's upstream services.
+
+Each fake is a threaded HTTP server on an ephemeral port with configurable
+latency (plus jitter) and failure rate; failures are answered with 503.
+
+    FakeNominatim   GET /search?q=...&format=json   deterministic coordinates
+    FakeOpenMeteo   GET /v1/forecast?latitude=...   current_weather per point, or
+                    hourly/daily series when asked for them
+    FakeFacts       GET /random.json                a numbered fact
+    FakeChatModel   POST /v1/chat/completions       OpenAI-compatible; calls
+                    the tool the intent router would pick, otherwise replies
+
+Every fake also answers HEAD/GET / so it can be the target of check_website.
+upstream_environment() maps running fakes to the WEATHER_AGENT_* settings
+that point the tools and the model client at them; they must be set before
+the tools are imported.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass
+class Faults:
+    """Latency and failure behaviour of a fake"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+
+
+class FakeService:
+    """Base class: subclasses implement respond(method, path, query, body)"""
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        self.faults = faults or Faults()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failures = 0
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def respond(self, method: str, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        raise NotImplementedError
+
+    def _fault(self) -> bool:
+        """Sleep for the configured latency; True when this request should fail"""
+        with self.lock:
+            self.requests += 1
+            jitter = self.random.uniform(-1, 1) * self.faults.jitter_ms
+            failed = self.random.random() < self.faults.failure_rate
+            if failed:
+                self.failures += 1
+        delay = max(0.0, self.faults.latency_ms + jitter) / 1000.0
+        if delay:
+            time.sleep(delay)
+        return failed
+
+    def start(self) -> "FakeService":
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def handle_any(self, method: str):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+                parts = urlsplit(self.path)
+                query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+                if service._fault():
+                    status, payload = 503, {"error": "injected failure"}
+                elif parts.path == "/":
+                    status, payload = 200, "ok"
+                else:
+                    status, payload = service.respond(method, parts.path, query, body)
+                data = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain" if isinstance(payload, str) else "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Server", f"fake-{type(service).__name__.lower()}")
+                try:
+                    self.end_headers()
+                    if method != "HEAD":
+                        self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up (timeout, cancelled request)
+
+            def do_GET(self):
+                self.handle_any("GET")
+
+            def do_HEAD(self):
+                self.handle_any("HEAD")
+
+            def do_POST(self):
+                self.handle_any("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "failures": self.failures}
+
+
+class FakeNominatim(FakeService):
+    """Any name resolves to stable coordinates; names starting with "Nowhere" are unknown"""
+
+    def respond(self, method, path, query, body):
+        if path != "/search":
+            return 404, {"error": "not found"}
+        name = query.get("q", "")
+        if name.lower().startswith("nowhere"):
+            return 200, []
+        digest = zlib.crc32(name.casefold().encode())
+        lat = (digest % 17000) / 100.0 - 85.0
+        lon = (digest // 17000 % 36000) / 100.0 - 180.0
+        return 200, [{"lat": f"{lat:.4f}", "lon": f"{lon:.4f}", "display_name": f"{name}, Fakeland"}]
+
+
+class FakeOpenMeteo(FakeService):
+    def respond(self, method, path, query, body):
+        if path != "/v1/forecast":
+            return 404, {"error": "not found"}
+        if "hourly" in query:
+            return 200, self.series(query)
+        latitudes = query.get("latitude", "").split(",")
+        items = []
+        for lat in latitudes:
+            seed = zlib.crc32(lat.encode())
+            items.append({"current_weather": {
+                "temperature": round(float(lat or 0) / 3 + 10, 1),
+                "windspeed": seed % 40,
+                "weathercode": (0, 1, 2, 3, 61, 71)[seed % 6],
+            }})
+        return 200, items[0] if len(items) == 1 else items
+
+    def series(self, query: Dict[str, str]) -> Dict[str, Any]:
+        """Hourly and daily columns for one point, starting today at midnight UTC"""
+        days = int(query.get("forecast_days", 7))
+        seed = zlib.crc32(query.get("latitude", "").encode())
+        base = int(time.time()) // 86400 * 86400
+        hourly_times = [time.strftime("%Y-%m-%dT%H:00", time.gmtime(base + h * 3600)) for h in range(days * 24)]
+        hourly = {"time": hourly_times}
+        for name in query["hourly"].split(","):
+            if name == "temperature_2m":
+                hourly[name] = [round(15 + (seed % 15) + 6 * ((h % 24) - 12) / 12, 1) for h in range(days * 24)]
+            elif name == "precipitation":
+                hourly[name] = [round(((h * 7 + seed) % 23) / 10, 1) if (h + seed) % 5 == 0 else 0.0
+                                for h in range(days * 24)]
+            elif name == "precipitation_probability":
+                hourly[name] = [(h * 13 + seed) % 100 for h in range(days * 24)]
+        daily = {"time": [t[:10] for t in hourly_times[::24]]}
+        if "weathercode" in query.get("daily", ""):
+            daily["weathercode"] = [(0, 2, 3, 61, 63, 95)[(d + seed) % 6] for d in range(days)]
+        return {"timezone": "GMT", "hourly": hourly, "daily": daily}
+
+
+class FakeFacts(FakeService):
+    """Numbered facts; every tenth answer repeats an earlier one, like the real API"""
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        super().__init__(faults, seed)
+        self.served = 0
+
+    def respond(self, method, path, query, body):
+        if path != "/random.json":
+            return 404, {"error": "not found"}
+        with self.lock:
+            self.served += 1
+            number = self.served if self.served % 10 else self.random.randint(1, self.served)
+        return 200, {"text": f"Fake fact number {number}."}
+
+
+def approximate_tokens(payload: Any) -> int:
+    """Rough BPE-like token count of a JSON payload"""
+    return len(_TOKEN.findall(json.dumps(payload, ensure_ascii=False)))
+
+
+class FakeChatModel(FakeService):
+    """
+    OpenAI-compatible chat endpoint. A user turn the intent router can
+    route becomes a call of that tool; anything else, and every turn after a
+    tool result, gets a short text reply. Reported prompt tokens are
+    approximate; prefill_ms adds latency per prompt token.
+    """
+
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0, prefill_ms: float = 0.0):
+        super().__init__(faults, seed)
+        self.prefill_ms = prefill_ms
+        self._router = None
+
+    def _route(self, text: str):
+        if self._router is None:
+            from router import IntentRouter
+            from tools import tool_manager
+            self._router = IntentRouter(tool_manager, enabled=True)
+        return self._router.route(text)
+
+    def respond(self, method, path, query, body):
+        if not path.endswith("/chat/completions"):
+            return 404, {"error": "not found"}
+        request = json.loads(body)
+        messages = request.get("messages", [])
+        prompt_tokens = approximate_tokens([messages, request.get("tools")])
+        if self.prefill_ms:
+            time.sleep(prompt_tokens * self.prefill_ms / 1000.0)
+
+        last = messages[-1] if messages else {}
+        offered = {tool["function"]["name"] for tool in request.get("tools", [])}
+        route = self._route(last.get("content") or "") if last.get("role") == "user" else None
+        if route is not None and route.tool in offered:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{self.requests}", "type": "function",
+                "function": {"name": route.tool, "arguments": json.dumps(route.arguments)},
+            }]}
+            finish_reason = "tool_calls"
+        else:
+            content = last.get("content") if last.get("role") == "tool" else None
+            first_line = (content or "").strip().splitlines()[:1]
+            message = {"role": "assistant",
+                       "content": f"Here you go: {first_line[0]}" if first_line else "Happy to help!"}
+            finish_reason = "stop"
+        completion_tokens = approximate_tokens(message)
+        return 200, {
+            "id": f"chatcmpl-fake-{self.requests}", "object": "chat.completion", "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def upstream_environment(nominatim: FakeService, open_meteo: FakeService, facts: FakeService,
+                         model: FakeService) -> Dict[str, str]:
+    """WEATHER_AGENT_* settings pointing the agent at the fakes"""
+    return {
+        "WEATHER_AGENT_NOMINATIM_URL": f"{nominatim.url}/search",
+        "WEATHER_AGENT_OPEN_METEO_URL": f"{open_meteo.url}/v1/forecast",
+        "WEATHER_AGENT_FACTS_URL": f"{facts.url}/random.json?language=en",
+        "WEATHER_AGENT_MODEL": "fake",
+        "WEATHER_AGENT_MODEL_BASE_URL": f"{model.url}/v1",
+        "WEATHER_AGENT_MODEL_API_KEY": "fake",
+    }
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Build the offline gazetteer index used by get_weather before it falls back
+to Nominatim.
+
+Download a GeoNames cities dump (e.g. https://download.geonames.org/export/dump/cities15000.zip),
+unzip it and run:
+
+    python build_gazetteer.py cities15000.txt
+    python build_gazetteer.py --lookup "Dhaka, Bangladesh"
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from tools.core.gazetteer import build_index, default_index_path, get_gazetteer
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline gazetteer index")
+    parser.add_argument("source", type=Path, nargs="?", help="GeoNames cities file, e.g. cities15000.txt")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help=f"index file (default: {default_index_path()})")
+    parser.add_argument("--min-population", type=int, default=0)
+    parser.add_argument("--countries", type=Path, default=None,
+                        help="GeoNames countryInfo.txt for country names (default: pytz names)")
+    parser.add_argument("--lookup", metavar="NAME", help="resolve a place name with the existing index")
+    args = parser.parse_args()
+
+    if args.lookup:
+        gazetteer = get_gazetteer()
+        if gazetteer is None:
+            sys.exit(f"No index at {default_index_path()}; build one first")
+        place = gazetteer.lookup(args.lookup)
+        if place is None:
+            print(f"❌ No match for '{args.lookup}'")
+        else:
+            print(f"📍 {place.display_name} ({place.lat:.4f}, {place.lon:.4f}), population {place.population}")
+        return
+
+    if args.source is None:
+        parser.error("a GeoNames source file is required unless --lookup is given")
+
+    output = args.output or default_index_path()
+    n_places, n_keys = build_index(args.source, output, args.min_population, args.countries)
+    print(f"✅ Wrote {n_places} places / {n_keys} keys to {output} ({output.stat().st_size} bytes)")
+
+if __name__ == "__main__":
+    main()
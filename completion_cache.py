@@ -0,0 +1,242 @@
+"""
+Content-addressed cache for model completions.
+
+CachingChatCompletionClient wraps any AutoGen ChatCompletionClient. Each
+request is keyed by a SHA-256 over the model name, the system message, the
+tool schemas and the normalized message history (whitespace collapsed,
+user text case-folded, tool arguments re-serialized with sorted keys).
+Completions are kept in a PersistentLRUCache (memory LRU backed by SQLite,
+with a TTL), so a repeated "what can you do?" is answered without a
+generation even after a restart.
+
+Conversations that contain results of time-sensitive tools (by default the
+"weather" and "time" categories, or tools the registry does not know) are
+never looked up or stored, so no stale observation is ever replayed. A
+cached *request* to call such a tool is fine: the tool still runs fresh.
+"""
+
+import hashlib
+import json
+from typing import Any, AsyncGenerator, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    FunctionExecutionResultMessage,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+    SystemMessage,
+    UserMessage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+from tools import tool_manager
+from tools.core.cache import PersistentLRUCache
+from tools.core.config import cache_dir, env_bool, env_float, env_int, env_str
+
+# Tool categories whose results go stale within minutes
+TIME_SENSITIVE_CATEGORIES = frozenset(
+    part.strip() for part in env_str("COMPLETION_CACHE_BYPASS", "weather,time").split(",") if part.strip()
+)
+
+
+def _normalize_text(text: str, casefold: bool = False) -> str:
+    text = " ".join(text.split())
+    return text.casefold() if casefold else text
+
+
+def _normalize_arguments(arguments: str) -> str:
+    try:
+        return json.dumps(json.loads(arguments), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return _normalize_text(arguments)
+
+
+def _normalize_content(content: Any, casefold: bool = False) -> Any:
+    if isinstance(content, str):
+        return _normalize_text(content, casefold)
+    if isinstance(content, list):
+        normalized = []
+        for item in content:
+            if hasattr(item, "arguments"):  # FunctionCall
+                normalized.append(["call", item.name, _normalize_arguments(item.arguments)])
+            elif hasattr(item, "call_id"):  # FunctionExecutionResult
+                normalized.append(["result", item.name, _normalize_text(item.content), item.is_error])
+            elif isinstance(item, str):
+                normalized.append(_normalize_text(item, casefold))
+            else:
+                # Images and other media
+                normalized.append(repr(item))
+        return normalized
+    return repr(content)
+
+
+def _tool_schema(tool: Union[Tool, ToolSchema]) -> Mapping[str, Any]:
+    return tool.schema if isinstance(tool, Tool) else tool
+
+
+def completion_key(model: str, messages: Sequence[LLMMessage], tools: Sequence[Union[Tool, ToolSchema]],
+                   tool_choice: Any = "auto", json_output: Any = None,
+                   extra_create_args: Optional[Mapping[str, Any]] = None) -> str:
+    """SHA-256 identifying a completion request"""
+    system = [_normalize_text(m.content) for m in messages if isinstance(m, SystemMessage)]
+    history = [
+        [type(m).__name__, _normalize_content(m.content, casefold=isinstance(m, UserMessage))]
+        for m in messages if not isinstance(m, SystemMessage)
+    ]
+    if isinstance(json_output, type):
+        json_output = json_output.__name__
+    if isinstance(tool_choice, Tool):
+        tool_choice = tool_choice.name
+    document = {
+        "model": model,
+        "system": system,
+        "tools": [_tool_schema(tool) for tool in tools],
+        "tool_choice": tool_choice,
+        "json_output": json_output,
+        "extra": dict(extra_create_args or {}),
+        "messages": history,
+    }
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def tools_used(messages: Iterable[LLMMessage]) -> set:
+    """Names of tools whose results appear in the history"""
+    names = set()
+    for message in messages:
+        if isinstance(message, FunctionExecutionResultMessage):
+            names.update(result.name for result in message.content)
+    return names
+
+
+class CachingChatCompletionClient(ChatCompletionClient):
+    """
+    ChatCompletionClient that replays identical completions from a
+    persistent cache and delegates everything else to the wrapped client.
+    """
+
+    def __init__(self, client: ChatCompletionClient, model: str, cache: Optional[PersistentLRUCache] = None,
+                 bypass_categories: Iterable[str] = TIME_SENSITIVE_CATEGORIES, enabled: bool = True):
+        self._client = client
+        self._model = model
+        self._cache = cache
+        self._bypass_categories = frozenset(bypass_categories)
+        self._enabled = enabled and cache is not None
+        self._counters = {"hits": 0, "misses": 0, "bypassed": 0,
+                          "prompt_tokens_saved": 0, "completion_tokens_saved": 0}
+
+    def _cacheable(self, messages: Sequence[LLMMessage]) -> bool:
+        registry = tool_manager.list_tools()
+        for name in tools_used(messages):
+            category = registry.get(name, {}).get("category")
+            if category is None or category in self._bypass_categories:
+                return False
+        return True
+
+    def _lookup(self, key: Optional[str]) -> Optional[CreateResult]:
+        if key is None:
+            return None
+        stored = self._cache.get(key)
+        if stored is None:
+            self._counters["misses"] += 1
+            return None
+        result = CreateResult.model_validate(stored)
+        self._counters["hits"] += 1
+        self._counters["prompt_tokens_saved"] += result.usage.prompt_tokens
+        self._counters["completion_tokens_saved"] += result.usage.completion_tokens
+        return result.model_copy(update={"cached": True})
+
+    def _key(self, messages, tools, tool_choice, json_output, extra_create_args) -> Optional[str]:
+        if not self._enabled:
+            return None
+        if not self._cacheable(messages):
+            self._counters["bypassed"] += 1
+            return None
+        return completion_key(self._model, messages, tools, tool_choice, json_output, extra_create_args)
+
+    def _store(self, key: Optional[str], result: CreateResult):
+        if key is not None and result.finish_reason in ("stop", "function_calls"):
+            self._cache.set(key, result.model_dump(mode="json"))
+
+    async def create(self, messages: Sequence[LLMMessage], *, tools: Sequence[Union[Tool, ToolSchema]] = [],
+                     tool_choice: Any = "auto", json_output: Any = None,
+                     extra_create_args: Mapping[str, Any] = {},
+                     cancellation_token: Optional[CancellationToken] = None) -> CreateResult:
+        key = self._key(messages, tools, tool_choice, json_output, extra_create_args)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        result = await self._client.create(
+            messages, tools=tools, tool_choice=tool_choice, json_output=json_output,
+            extra_create_args=extra_create_args, cancellation_token=cancellation_token,
+        )
+        self._store(key, result)
+        return result
+
+    async def create_stream(self, messages: Sequence[LLMMessage], *,
+                            tools: Sequence[Union[Tool, ToolSchema]] = [], tool_choice: Any = "auto",
+                            json_output: Any = None, extra_create_args: Mapping[str, Any] = {},
+                            cancellation_token: Optional[CancellationToken] = None
+                            ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        key = self._key(messages, tools, tool_choice, json_output, extra_create_args)
+        cached = self._lookup(key)
+        if cached is not None:
+            if isinstance(cached.content, str):
+                yield cached.content
+            yield cached
+            return
+        async for chunk in self._client.create_stream(
+            messages, tools=tools, tool_choice=tool_choice, json_output=json_output,
+            extra_create_args=extra_create_args, cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                self._store(key, chunk)
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_ratio": self._counters["hits"] / lookups if lookups else 0.0,
+            "tokens_saved": self._counters["prompt_tokens_saved"] + self._counters["completion_tokens_saved"],
+        }
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Union[Tool, ToolSchema]] = []) -> int:
+        return self._client.count_tokens(messages, tools=tools)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *,
+                         tools: Sequence[Union[Tool, ToolSchema]] = []) -> int:
+        return self._client.remaining_tokens(messages, tools=tools)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore[override]
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
+
+
+def create_completion_cache() -> Optional[PersistentLRUCache]:
+    """The shared completion store, or None when disabled (WEATHER_AGENT_COMPLETION_CACHE=false)"""
+    if not env_bool("COMPLETION_CACHE", True):
+        return None
+    return PersistentLRUCache(
+        cache_dir() / "completions.sqlite3",
+        table="completions",
+        max_entries=env_int("COMPLETION_CACHE_SIZE", 512),
+        ttl=env_float("COMPLETION_CACHE_TTL", 24 * 3600.0),
+    )
@@ -0,0 +1,193 @@
+"""
+Bounded model context for long conversations.
+
+AssistantAgent keeps every message of a session and sends all of them on
+each turn, so prompts (and prefill time) grow linearly with the length of
+the conversation. RollingSummaryContext keeps the last `keep_turns` turns
+verbatim and folds older turns into a rolling summary: one short
+structured line per turn (what was asked, which tools ran with which
+arguments and the first line of their results, and the answer). The
+summary is sent as a system message after the agent's own system prompt,
+which the agent adds separately and so is never dropped.
+
+When the verbatim turns exceed `max_tokens` the oldest of them are folded
+early; the current turn is always kept whole. At most `max_summary_turns`
+summary lines are kept, so memory per session is bounded.
+"""
+
+import json
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional
+
+from autogen_core.model_context import ChatCompletionContext
+from autogen_core.models import (
+    AssistantMessage,
+    FunctionExecutionResultMessage,
+    LLMMessage,
+    SystemMessage,
+    UserMessage,
+)
+
+from tools.core.config import env_int
+
+SUMMARY_HEADER = "Summary of earlier conversation (oldest first):"
+
+# Longest excerpt of a question, tool result or answer kept in a summary line
+EXCERPT_CHARS = 100
+
+
+def estimate_tokens(message: LLMMessage) -> int:
+    """About four characters per token, plus per-message overhead"""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, default=lambda item: getattr(item, "__dict__", repr(item)), ensure_ascii=False)
+    return len(content) // 4 + 4
+
+
+def _excerpt(text: Any, limit: int = EXCERPT_CHARS) -> str:
+    if not isinstance(text, str):
+        text = repr(text)
+    lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+    text = lines[0] if lines else ""
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _arguments(arguments: str) -> str:
+    try:
+        parsed = json.loads(arguments)
+    except ValueError:
+        return _excerpt(arguments, 60)
+    if not isinstance(parsed, dict):
+        return _excerpt(arguments, 60)
+    return _excerpt(", ".join(f"{key}={value!r}" for key, value in parsed.items()), 60)
+
+
+def summarize_turn(messages: List[LLMMessage]) -> str:
+    """One structured line for a finished turn"""
+    parts = []
+    calls = {}
+    for message in messages:
+        if isinstance(message, UserMessage):
+            parts.append(f"user: {_excerpt(message.content)}")
+        elif isinstance(message, AssistantMessage) and isinstance(message.content, list):
+            for call in message.content:
+                calls[call.id] = f"{call.name}({_arguments(call.arguments)})"
+        elif isinstance(message, FunctionExecutionResultMessage):
+            for result in message.content:
+                call = calls.pop(result.call_id, f"{result.name}()")
+                status = "error" if result.is_error else _excerpt(result.content, 80)
+                parts.append(f"{call} -> {status}")
+        elif isinstance(message, AssistantMessage):
+            parts.append(f"answer: {_excerpt(message.content)}")
+    parts.extend(f"{call} -> (no result)" for call in calls.values())
+    return "- " + "; ".join(parts)
+
+
+class RollingSummaryContext(ChatCompletionContext):
+    """
+    Chat completion context keeping the last `keep_turns` turns verbatim
+    within `max_tokens`, with older turns summarized.
+    """
+
+    def __init__(self, keep_turns: Optional[int] = None, max_tokens: Optional[int] = None,
+                 max_summary_turns: Optional[int] = None,
+                 token_counter: Callable[[LLMMessage], int] = estimate_tokens,
+                 initial_messages: Optional[List[LLMMessage]] = None):
+        super().__init__(initial_messages)
+        self.keep_turns = max(1, env_int("CONTEXT_KEEP_TURNS", 6) if keep_turns is None else keep_turns)
+        self.max_tokens = env_int("CONTEXT_MAX_TOKENS", 2048) if max_tokens is None else max_tokens
+        max_summary_turns = env_int("CONTEXT_SUMMARY_TURNS", 20) if max_summary_turns is None else max_summary_turns
+        self.token_counter = token_counter
+        self.summary: Deque[str] = deque(maxlen=max(1, max_summary_turns))
+        self.turns_summarized = 0
+        self._compact()
+
+    def _turn_starts(self) -> List[int]:
+        starts = [i for i, m in enumerate(self._messages) if isinstance(m, UserMessage)]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        return starts
+
+    def _fold(self, end: int, starts: List[int]):
+        """Summarize the turns in self._messages[:end] and drop them"""
+        bounds = [s for s in starts if s < end] + [end]
+        for start, stop in zip(bounds, bounds[1:]):
+            if stop > start:
+                self.summary.append(summarize_turn(self._messages[start:stop]))
+                self.turns_summarized += 1
+        del self._messages[:end]
+
+    def _compact(self):
+        starts = self._turn_starts()
+        if len(starts) > self.keep_turns:
+            self._fold(starts[-self.keep_turns], starts)
+            starts = self._turn_starts()
+        # Over budget: fold the oldest verbatim turns, never the current one
+        while len(starts) > 1 and self._tokens() > self.max_tokens:
+            self._fold(starts[1], starts)
+            starts = self._turn_starts()
+
+    def _summary_message(self) -> Optional[SystemMessage]:
+        if not self.summary:
+            return None
+        return SystemMessage(content="\n".join([SUMMARY_HEADER, *self.summary]))
+
+    def _tokens(self) -> int:
+        summary = self._summary_message()
+        total = sum(self.token_counter(m) for m in self._messages)
+        return total + (self.token_counter(summary) if summary else 0)
+
+    async def add_message(self, message: LLMMessage) -> None:
+        self._messages.append(message)
+        if isinstance(message, UserMessage):
+            # A new turn: the previous ones are complete and may be folded
+            self._compact()
+
+    async def get_messages(self) -> List[LLMMessage]:
+        summary = self._summary_message()
+        messages = list(self._messages)
+        # A window never opens with orphaned tool results
+        while messages and isinstance(messages[0], FunctionExecutionResultMessage):
+            messages.pop(0)
+        return [summary, *messages] if summary else messages
+
+    async def clear(self) -> None:
+        self._messages = []
+        self.summary.clear()
+        self.turns_summarized = 0
+
+    async def save_state(self) -> Mapping[str, Any]:
+        state = dict(await super().save_state())
+        state["summary"] = list(self.summary)
+        state["turns_summarized"] = self.turns_summarized
+        return state
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        await super().load_state(state)
+        self.summary.clear()
+        self.summary.extend(state.get("summary", []))
+        self.turns_summarized = state.get("turns_summarized", 0)
+        self._compact()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages": len(self._messages),
+            "summary_lines": len(self.summary),
+            "turns_summarized": self.turns_summarized,
+            "tokens": self._tokens(),
+            "max_tokens": self.max_tokens,
+        }
+
+
+async def remember_exchange(team: Any, message: str, answer: str):
+    """
+    Add a turn answered without the model (the router's fast path) to the
+    context of every agent in the team, so follow-ups like "and tomorrow?"
+    have the question and answer to refer to.
+    """
+    # Teams do not expose their agents publicly; each agent keeps its own context
+    for agent in getattr(team, "_participants", ()):
+        context = getattr(agent, "model_context", None)
+        if context is not None:
+            await context.add_message(UserMessage(content=message, source="user"))
+            await context.add_message(AssistantMessage(content=answer, source=agent.name))
@@ -2,11 +2,59 @@
 # filepath: /home/sharif/Documents/Codes/python/weather-agent/list_tools.py
 """
 Utility script to list all available tools and their capabilities.
+
+    python list_tools.py                 # tools by category
+    python list_tools.py --metrics       # plus call metrics saved by main.py
+    python list_tools.py --prometheus    # the same metrics in Prometheus text format
 """
 
+import json
+import sys
+
 from tools import tool_manager
+from tools.core.metrics import default_metrics_path
+
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    return f"{value * 1000:.0f} ms" if value >= 0.001 else f"{value * 1e6:.0f} µs"
+
+
+def load_saved_metrics():
+    """Load the snapshot main.py saved on exit; returns its path or None"""
+    path = default_metrics_path()
+    try:
+        tool_manager.metrics.restore(json.loads(path.read_text()))
+    except (OSError, ValueError, KeyError):
+        return None
+    return path
+
+
+def print_metrics(source):
+    snapshot = tool_manager.get_metrics()
+    print(f"\n📈 TOOL METRICS ({source or 'no saved snapshot'}):")
+    print("-" * 30)
+    
+    print(f"{'tool':<24}{'calls':>7}{'errors':>8}{'timeouts':>10}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, metrics in snapshot["tools"].items():
+        latency = metrics["latency_seconds"]
+        print(f"{name:<24}{metrics['calls']:>7}{metrics['errors']:>8}{metrics['timeouts']:>10}"
+              f"{format_seconds(latency['p50']):>9}{format_seconds(latency['p95']):>9}"
+              f"{format_seconds(latency['p99']):>9}")
+    print()
+    for category, metrics in snapshot["categories"].items():
+        latency = metrics.get("latency_seconds", {})
+        print(f"📂 {category}: {metrics['calls']} calls, {metrics['errors']} errors, "
+              f"p95 {format_seconds(latency.get('p95'))}")
+
 
 def main():
+    source = load_saved_metrics() if {"--metrics", "--prometheus"} & set(sys.argv) else None
+    if "--prometheus" in sys.argv:
+        print(tool_manager.export_metrics("prometheus"), end="")
+        return
+    
     print("🔧 Available Tools for Weather Agent\n")
     print("=" * 50)
     
@@ -36,6 +84,8 @@ def main():
             # Show function signature
             sig = metadata['signature']
             print(f"   📋 Usage: {name}{sig}")
+            if metadata['executor'] != "inline":
+                print(f"   ⚙️ Runs in the shared {metadata['executor']} pool")
             
             if metadata['docstring']:
                 # Show first line of docstring
@@ -44,6 +94,9 @@ def main():
                     print(f"   💡 {first_line}")
             print()
     
+    if "--metrics" in sys.argv:
+        print_metrics(source)
+    
     print(f"\n✅ Total tools available: {len(tools)}")
     print("\nTo add new tools, create a new .py file in the tools/ directory")
     print("and use the @tool decorator on your async functions.")
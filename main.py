@@ -1,16 +1,56 @@
 import asyncio
-from tools.weather_api import get_weather
-from agent import weather_agent, agent_team
+import logging
+from agent import agent_team, completion_client, model_client
+from conversation_context import remember_exchange
 from autogen_agentchat.ui import Console 
+from tools.core.http import http_clients
+from tools.core.facts import fact_pool
+from tools.core.prefetch import prefetcher
+from tools import tool_manager
+from tools.core.config import env_str
+from router import IntentRouter
 
 async def main():
+    logging.basicConfig(level=env_str("LOG_LEVEL", "WARNING").upper())
+    router = IntentRouter(tool_manager)
     print("Weather chatbot. Type 'exit' to quit.")
-    while True:
-        user = input("You: ")
-        if user.lower() == "exit":
-            break
-        stream = agent_team.run_stream(task=user)
-        await Console(stream)
+    await http_clients.start()
+    # Keep the most requested places' weather and a pool of facts ready in the background
+    prefetcher.start()
+    fact_pool.start()
+    tool_manager.start_executors()
+    try:
+        while True:
+            # input() runs in a worker thread so the event loop (background
+            # cache refreshes, in-flight tool calls) keeps running meanwhile
+            user = await asyncio.to_thread(input, "You: ")
+            if user.lower() == "exit":
+                break
+            # Obvious weather/time/math requests skip the model entirely
+            answer = await router.try_answer(user)
+            if answer is not None:
+                print(f"⚡ {answer}")
+                await remember_exchange(agent_team, user, answer)
+                continue
+            stream = agent_team.run_stream(task=user)
+            await Console(stream)
+    finally:
+        await prefetcher.aclose()
+        await fact_pool.aclose()
+        await tool_manager.close_executors()
+        await http_clients.aclose()
+        cache = completion_client.stats()
+        if cache["hits"] or cache["misses"]:
+            print(f"💾 Completion cache: {cache['hits']}/{cache['hits'] + cache['misses']} hits "
+                  f"({cache['hit_ratio']:.0%}), {cache['tokens_saved']} tokens saved")
+        prompts = model_client.stats()
+        if prompts["requests"]:
+            print(f"🧮 Prompt tokens: {prompts['mean_prompt_tokens']:.0f} per request, "
+                  f"{prompts['mean_tools_offered']:.1f}/{len(tool_manager.list_tools())} tools offered")
+        try:
+            tool_manager.save_metrics()
+        except OSError as e:
+            print(f"Warning: Could not save tool metrics: {e}")
 
 if __name__ == "__main__":
     asyncio.run(main())
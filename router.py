@@ -0,0 +1,246 @@
+"""
+Deterministic fast path in front of the LLM.
+
+Obvious single-tool requests ("weather in London", "time in Tokyo",
+"what is 2 + 3 * 4") are matched with compiled patterns, their arguments
+extracted and the tool called directly, skipping the two model calls that
+would otherwise wrap the tool call. Intents are enabled only for tools the
+registry actually has (by name and category). Anything ambiguous, and any
+tool result that is an error, falls through to the agent.
+
+Every query's path is logged on the "weather_agent.router" logger and
+counted in IntentRouter.stats().
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Pattern
+
+from tools.core.config import env_bool
+from tools.core.gazetteer import COUNTRY_ALIASES, normalize_name
+from tools.core.metrics import classify_result
+
+logger = logging.getLogger("weather_agent.router")
+
+# Words that make a weather request something the current-weather tool cannot answer
+_NOT_CURRENT = re.compile(
+    r"\b(?:tomorrow|yesterday|tonight|next|last|week|weekend|forecast|will|should|going to|"
+    r"hourly|daily|average|history|compare|vs|versus|than)\b", re.IGNORECASE)
+_PLACE = re.compile(r"^[^\W\d_][\w .,'/\-]{0,60}$")
+_CITY_SEPARATOR = re.compile(r"\s*(?:,\s*(?:and\s+)?|\band\b|&)\s*", re.IGNORECASE)
+_EXPRESSION = re.compile(r"^[\d\s+\-*/().%]*\d[\d\s+\-*/().%]*$")
+_OPERATOR = re.compile(r"\d\s*[+\-*/%]|\)\s*[+\-*/%]")
+_DOMAIN = re.compile(r"^(?:https?://)?(?:[a-z0-9-]+\.)+[a-z]{2,}(?:[/:][^\s]*)?$", re.IGNORECASE)
+_UNITS = {"f": "fahrenheit", "fahrenheit": "fahrenheit", "c": "celsius", "celsius": "celsius"}
+_TRAILING = re.compile(r"[\s?.!]+$")
+_LEADING_NON_PLACE = {"how", "what", "what's", "whats", "is", "tell", "show", "give", "me", "my", "current"}
+_TOPIC_WORDS = {"weather", "time", "temperature"}
+
+
+class Route(NamedTuple):
+    intent: str
+    tool: str
+    arguments: Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    A pattern family for one tool. extract() turns a match into the tool's
+    arguments, or None when the match is not unambiguous after all.
+    """
+    name: str
+    tool: str
+    category: str
+    patterns: List[Pattern]
+    extract: Callable[["re.Match"], Optional[Dict[str, Any]]]
+
+
+def _strip_place(text: str) -> Optional[str]:
+    place = text.strip(" ,.'\"")
+    if not place or not _PLACE.match(place) or len(place.split()) > 5 or _NOT_CURRENT.search(place):
+        return None
+    words = place.lower().split()
+    if words[0] in _LEADING_NON_PLACE or _TOPIC_WORDS.intersection(words):
+        return None
+    return place
+
+
+@lru_cache(maxsize=1)
+def _country_names() -> frozenset:
+    import pytz
+    return frozenset(normalize_name(name) for name in [*pytz.country_names.values(), *COUNTRY_ALIASES])
+
+
+def _is_region(part: str) -> bool:
+    """"Bangladesh", "UK", "TX": the qualifier in "City, Region" rather than another city"""
+    return (len(part) <= 3 and part.isalpha()) or normalize_name(part) in _country_names()
+
+
+def _split_places(text: str) -> Optional[List[str]]:
+    """
+    The places in a weather request: one for "Dhaka, Bangladesh", several
+    for "Rome, Paris and Berlin", None for an ambiguous "Paris, Berlin".
+    """
+    parts = [part for part in _CITY_SEPARATOR.split(text) if part.strip()]
+    has_conjunction = re.search(r"\band\b|&", text, re.IGNORECASE) is not None
+    if len(parts) > 1 and not has_conjunction:
+        if not _is_region(parts[-1].strip()):
+            return None
+        parts = [text]
+    places = [_strip_place(part) for part in parts]
+    return None if any(place is None for place in places) else places
+
+
+def _unit_arguments(match: "re.Match") -> Dict[str, Any]:
+    unit = (match.groupdict().get("unit") or "").lower()
+    return {"format": _UNITS[unit]} if unit else {}
+
+
+def _weather_arguments(match: "re.Match") -> Optional[Dict[str, Any]]:
+    if _NOT_CURRENT.search(match.string):
+        return None
+    places = _split_places(match.group("place"))
+    if places is None or len(places) != 1:
+        return None
+    return {"city": places[0], **_unit_arguments(match)}
+
+
+def _weather_many_arguments(match: "re.Match") -> Optional[Dict[str, Any]]:
+    if _NOT_CURRENT.search(match.string):
+        return None
+    places = _split_places(match.group("places"))
+    if places is None or len(places) < 2:
+        return None
+    return {"cities": places, **_unit_arguments(match)}
+
+
+def _time_arguments(match: "re.Match") -> Optional[Dict[str, Any]]:
+    place = _strip_place(match.group("place"))
+    if place is None or _CITY_SEPARATOR.search(place):
+        return None
+    return {"timezone_name": place}
+
+
+def _calculate_arguments(match: "re.Match") -> Optional[Dict[str, Any]]:
+    expression = match.group("expression").strip()
+    if not _EXPRESSION.match(expression) or not _OPERATOR.search(expression):
+        return None
+    return {"expression": expression}
+
+
+def _website_arguments(match: "re.Match") -> Optional[Dict[str, Any]]:
+    url = match.group("url").strip()
+    return {"url": url} if _DOMAIN.match(url) else None
+
+
+def _compile(*patterns: str) -> List[Pattern]:
+    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+
+_UNIT = r"(?:\s+in\s+(?P<unit>celsius|fahrenheit|c|f))?"
+
+INTENTS = [
+    Intent("weather_many", "get_weather_many", "weather", _compile(
+        rf"^(?:what(?:'s| is) the )?(?:current )?weather (?:like )?(?:in|for|at) (?P<places>.+?(?:,|\band\b|&).+?){_UNIT}$",
+    ), _weather_many_arguments),
+    Intent("weather", "get_weather", "weather", _compile(
+        rf"^(?:what(?:'s| is) the |how(?:'s| is) the )?(?:current )?weather (?:like )?(?:in|for|at) (?P<place>.+?){_UNIT}$",
+        rf"^(?:what(?:'s| is) the )?(?P<place>[^\W\d_][\w .'\-]*?) weather(?: now| today)?{_UNIT}$",
+        rf"^(?:is it|how) (?:hot|cold|warm|raining|sunny) (?:in|at) (?P<place>.+?){_UNIT}$",
+    ), _weather_arguments),
+    Intent("time", "get_current_time", "time", _compile(
+        r"^(?:what(?:'s| is) the )?(?:current |local )?time (?:now |right now )?(?:in|at) (?P<place>.+?)(?: now| right now)?$",
+        r"^what time is it (?:now |right now )?(?:in|at) (?P<place>.+?)(?: now| right now)?$",
+        r"^(?P<place>[^\W\d_][\w/ .'\-]*?) (?:local )?time(?: now)?$",
+    ), _time_arguments),
+    Intent("calculate", "calculate", "utility", _compile(
+        r"^(?:what(?:'s| is)|calculate|compute|evaluate|solve)\s+(?P<expression>[\d\s+\-*/().%]+?)(?:\s*=)?$",
+        r"^(?P<expression>[\d\s+\-*/().%]+?)(?:\s*=)?$",
+    ), _calculate_arguments),
+    Intent("random_fact", "get_random_fact", "utility", _compile(
+        r"^(?:tell me |give me |share )?(?:a |an )?(?:random |fun |interesting )+fact$",
+    ), lambda match: {}),
+    Intent("website", "check_website", "utility", _compile(
+        r"^(?:is|check(?: if| whether)?) (?P<url>\S+) (?:up|down|online|accessible|reachable|working)$",
+        r"^check (?:the )?(?:website |site )?(?P<url>\S+)$",
+    ), _website_arguments),
+]
+
+
+def normalize_query(query: str) -> str:
+    """Matching form: trimmed, single spaces, no trailing punctuation"""
+    return _TRAILING.sub("", " ".join(query.split()))
+
+
+class IntentRouter:
+    """Routes unambiguous queries straight to a tool through a ToolManager"""
+
+    def __init__(self, manager, intents: List[Intent] = INTENTS, enabled: Optional[bool] = None):
+        self.manager = manager
+        self.enabled = env_bool("FAST_PATH", True) if enabled is None else enabled
+        registry = manager.list_tools()
+        # Only intents whose tool is registered under the expected category
+        self.intents = [
+            intent for intent in intents
+            if registry.get(intent.tool, {}).get("category") == intent.category
+        ]
+        self.counts = {"fast_path": 0, "no_match": 0, "tool_error": 0, "exception": 0, "disabled": 0}
+
+    def route(self, query: str) -> Optional[Route]:
+        """The tool call for a query, or None when the LLM should handle it"""
+        text = normalize_query(query)
+        for intent in self.intents:
+            for pattern in intent.patterns:
+                match = pattern.match(text)
+                if match is None:
+                    continue
+                arguments = intent.extract(match)
+                if arguments is not None and self._accepts(intent.tool, arguments):
+                    return Route(intent.name, intent.tool, arguments)
+        return None
+
+    def _accepts(self, tool: str, arguments: Dict[str, Any]) -> bool:
+        properties = self.manager.list_tools()[tool]["parameters"]["properties"]
+        return all(name in properties for name in arguments)
+
+    async def try_answer(self, query: str) -> Optional[str]:
+        """
+        Answer the query directly when it is an unambiguous single-tool
+        request; None means "ask the agent".
+        """
+        if not self.enabled:
+            self.counts["disabled"] += 1
+            return None
+        start = time.perf_counter()
+        try:
+            route = self.route(query)
+            if route is None:
+                self.counts["no_match"] += 1
+                logger.info("path=llm reason=no_match query=%r", query)
+                return None
+            result = await self.manager.get_tool_by_name(route.tool)(**route.arguments)
+        except Exception:
+            # A broken route or tool must not end the session; the agent gets the query instead
+            self.counts["exception"] += 1
+            logger.warning("path=llm reason=exception query=%r", query, exc_info=True)
+            return None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if classify_result(result) != "ok":
+            # Let the agent rephrase, retry or explain instead of echoing an error
+            self.counts["tool_error"] += 1
+            logger.info("path=llm reason=tool_error intent=%s tool=%s args=%r query=%r",
+                        route.intent, route.tool, route.arguments, query)
+            return None
+        self.counts["fast_path"] += 1
+        logger.info("path=fast intent=%s tool=%s args=%r ms=%.1f query=%r",
+                    route.intent, route.tool, route.arguments, elapsed_ms, query)
+        # Fast-path answers go straight to people, so structured results are rendered
+        return str(result)
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self.counts.values())
+        return {**self.counts, "hit_ratio": self.counts["fast_path"] / total if total else 0.0}
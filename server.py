@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Multi-session server mode for the weather agent.
+
+Clients speak line-delimited JSON over TCP. A request line
+
+    {"session": "alice", "message": "What's the weather in Paris?"}
+
+is answered with one line per agent event (tool calls, tool results, the
+reply) and a final {"type": "done", ...} line. Requests the intent router
+can answer directly come back as a single FastPathAnswer event. Omitting "session" starts a
+new session whose id is returned in every event. Other requests:
+{"type": "stats"} and {"type": "close", "session": "..."}.
+
+Every session gets its own agent and conversation state; all of them share
+one model client and the tool caches. At most --max-active turns run at
+once, up to --max-queued more wait, and anything beyond that is refused
+with a "busy" error instead of piling up. Sessions idle for longer than
+--idle-timeout are evicted, and when --max-sessions is reached the least
+recently used idle session makes room.
+
+    python server.py --port 8765
+    printf '{"message": "What time is it in Tokyo?"}\\n' | nc 127.0.0.1 8765
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from autogen_agentchat.base import TaskResult
+
+from tools import tool_manager
+from conversation_context import remember_exchange
+from router import IntentRouter
+from tools.core.config import env_float, env_int, env_str
+from tools.core.http import http_clients
+from tools.core.facts import fact_pool
+from tools.core.prefetch import prefetcher
+from tools.core.weather_cache import current_weather_cache
+
+# Longest accepted request line
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ServerBusy(Exception):
+    """The server cannot take this request right now; the client should retry"""
+
+
+class Session:
+    __slots__ = ("id", "team", "lock", "created", "last_used", "turns", "pending")
+
+    def __init__(self, session_id: str, team):
+        self.id = session_id
+        self.team = team
+        self.lock = asyncio.Lock()  # one turn at a time per conversation
+        self.created = self.last_used = time.monotonic()
+        self.turns = 0
+        self.pending = 0  # requests queued for admission or for the lock, or running
+
+    @property
+    def busy(self) -> bool:
+        return self.pending > 0 or self.lock.locked()
+
+
+class SessionPool:
+    """
+    Sessions keyed by id, in least-recently-used order.
+
+    The factory builds a fresh agent team for each new session. When the
+    pool is full the least recently used idle session is evicted; if every
+    session has a request queued or running the new one is refused with
+    ServerBusy.
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_sessions: int = 100, idle_timeout: float = 900.0):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        session = self.sessions.get(session_id) if session_id else None
+        if session is None:
+            if len(self.sessions) >= self.max_sessions and not self._evict_lru():
+                raise ServerBusy(f"session limit ({self.max_sessions}) reached")
+            session = Session(session_id or uuid.uuid4().hex[:12], self.factory())
+            self.sessions[session.id] = session
+            self.created += 1
+        self.sessions.move_to_end(session.id)
+        session.last_used = time.monotonic()
+        return session
+
+    def close(self, session_id: str) -> bool:
+        session = self.sessions.get(session_id)
+        if session is None or session.busy:
+            return False
+        del self.sessions[session_id]
+        return True
+
+    def _evict_lru(self) -> bool:
+        for session in self.sessions.values():
+            if not session.busy:
+                del self.sessions[session.id]
+                self.evicted += 1
+                return True
+        return False
+
+    def evict_idle(self) -> int:
+        cutoff = time.monotonic() - self.idle_timeout
+        stale = [s.id for s in self.sessions.values() if not s.busy and s.last_used < cutoff]
+        for session_id in stale:
+            del self.sessions[session_id]
+        self.evicted += len(stale)
+        return len(stale)
+
+    async def run_evictor(self):
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self.sessions),
+            "busy": sum(1 for s in self.sessions.values() if s.busy),
+            "max_sessions": self.max_sessions,
+            "created": self.created,
+            "evicted": self.evicted,
+        }
+
+
+class AdmissionControl:
+    """
+    Bounds concurrent turns: max_active run, max_queued wait for a slot and
+    further requests are refused immediately (backpressure to the client).
+    """
+
+    def __init__(self, max_active: int = 16, max_queued: int = 64):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.slots = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+
+    async def run(self, turn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.active >= self.max_active and self.queued >= self.max_queued:
+            self.rejected += 1
+            raise ServerBusy("too many requests in flight")
+        self.queued += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        try:
+            return await turn()
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self.slots.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+def event_payload(event: Any) -> Dict[str, Any]:
+    """JSON form of an AutoGen message or event"""
+    return {
+        "type": type(event).__name__,
+        "source": getattr(event, "source", None),
+        "content": event.to_text() if hasattr(event, "to_text") else str(event),
+    }
+
+
+class AgentServer:
+    """Line-delimited JSON server over a SessionPool"""
+
+    def __init__(self, pool: SessionPool, admission: AdmissionControl, router=None, model_client=None,
+                 completion_client=None):
+        self.pool = pool
+        self.admission = admission
+        self.router = router
+        self.model_client = model_client
+        self.completion_client = completion_client
+        self.started = time.monotonic()
+        self.connections = 0
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def send(payload: Dict[str, Any]):
+            writer.write(json.dumps(payload).encode() + b"\n")
+            await writer.drain()  # a slow reader slows its own turn, not the server
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await send({"type": "error", "error": f"request line longer than {MAX_LINE_BYTES} bytes"})
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    await self.handle_request(line, send)
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away, or the server is shutting down
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def handle_request(self, line: bytes, send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            await send({"type": "error", "error": f"invalid request: {e}"})
+            return
+
+        request_id = request.get("id")
+        kind = request.get("type", "message")
+        if kind == "stats":
+            await send({"type": "stats", "id": request_id, **self.stats()})
+        elif kind == "close":
+            closed = self.pool.close(str(request.get("session", "")))
+            await send({"type": "closed", "id": request_id, "session": request.get("session"), "closed": closed})
+        elif kind == "message" and isinstance(request.get("message"), str):
+            await self.handle_message(request, send)
+        else:
+            await send({"type": "error", "id": request_id, "error": "expected {\"message\": \"...\"}"})
+
+    async def handle_message(self, request: Dict[str, Any], send: Callable[[Dict[str, Any]], Awaitable[None]]):
+        request_id = request.get("id")
+        started = time.perf_counter()
+        try:
+            session = self.pool.get(request.get("session"))
+        except ServerBusy as e:
+            await send({"type": "error", "id": request_id, "error": "busy", "detail": str(e)})
+            return
+        # Held from here, so the session cannot be evicted while the request waits for admission
+        session.pending += 1
+        try:
+            await self._run_turn(session, request, send, started)
+        finally:
+            session.pending -= 1
+
+    async def _run_turn(self, session: Session, request: Dict[str, Any],
+                        send: Callable[[Dict[str, Any]], Awaitable[None]], started: float):
+        request_id = request.get("id")
+
+        async def turn():
+            async with session.lock:
+                session.turns += 1
+                answer = await self.router.try_answer(request["message"]) if self.router else None
+                if answer is not None:
+                    await remember_exchange(session.team, request["message"], answer)
+                    session.last_used = time.monotonic()
+                    await send({"type": "FastPathAnswer", "source": "router", "content": answer,
+                                "id": request_id, "session": session.id})
+                    return
+                async for event in session.team.run_stream(task=request["message"]):
+                    if not isinstance(event, TaskResult):
+                        await send({**event_payload(event), "id": request_id, "session": session.id})
+                session.last_used = time.monotonic()
+
+        try:
+            await self.admission.run(turn)
+        except ServerBusy as e:
+            await send({"type": "error", "id": request_id, "session": session.id, "error": "busy", "detail": str(e)})
+            return
+        except ConnectionError:
+            raise
+        except Exception as e:
+            await send({"type": "error", "id": request_id, "session": session.id,
+                        "error": f"{type(e).__name__}: {e}"})
+            return
+        await send({
+            "type": "done",
+            "id": request_id,
+            "session": session.id,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "uptime": round(time.monotonic() - self.started, 1),
+            "connections": self.connections,
+            "pool": self.pool.stats(),
+            "admission": self.admission.stats(),
+            "breakers": tool_manager.get_breaker_states(),
+            "router": self.router.stats() if self.router else None,
+            "tool_selection": self.model_client.stats() if hasattr(self.model_client, "stats") else None,
+            "completion_cache": self.completion_client.stats() if self.completion_client else None,
+            "weather_cache": current_weather_cache.stats(),
+            "prefetch": prefetcher.stats(),
+            "facts": fact_pool.stats(),
+            "executors": tool_manager.get_executor_stats(),
+            "tools": {
+                name: {key: metrics[key] for key in ("calls", "errors", "in_flight")}
+                for name, metrics in tool_manager.get_metrics()["tools"].items()
+            },
+        }
+
+
+async def serve(host: str, port: int, pool: SessionPool, admission: AdmissionControl,
+                ready: Optional[Callable[[asyncio.AbstractServer], None]] = None, router=None,
+                model_client=None, completion_client=None):
+    """Run the server until cancelled"""
+    server = AgentServer(pool, admission, router, model_client, completion_client)
+    listener = await asyncio.start_server(server.handle_connection, host, port, limit=MAX_LINE_BYTES)
+    evictor = asyncio.create_task(pool.run_evictor())
+    await http_clients.start()
+    prefetcher.start()
+    fact_pool.start()
+    tool_manager.start_executors()
+    if ready is not None:
+        ready(listener)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        evictor.cancel()
+        await prefetcher.aclose()
+        await fact_pool.aclose()
+        await tool_manager.close_executors()
+        await http_clients.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-session weather agent server (line-delimited JSON over TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=env_int("SERVER_PORT", 8765))
+    parser.add_argument("--max-sessions", type=int, default=env_int("SERVER_MAX_SESSIONS", 100))
+    parser.add_argument("--idle-timeout", type=float, default=env_float("SERVER_IDLE_TIMEOUT", 900.0),
+                        help="seconds before an idle session is evicted")
+    parser.add_argument("--max-active", type=int, default=env_int("SERVER_MAX_ACTIVE", 16),
+                        help="turns running at once")
+    parser.add_argument("--max-queued", type=int, default=env_int("SERVER_MAX_QUEUED", 64),
+                        help="turns waiting for a slot before requests are refused")
+    args = parser.parse_args()
+
+    # Imported here so `import server` does not build the model client
+    from agent import completion_client, create_agent_team, model_client
+
+    logging.basicConfig(level=env_str("LOG_LEVEL", "WARNING").upper())
+    pool = SessionPool(create_agent_team, args.max_sessions, args.idle_timeout)
+    admission = AdmissionControl(args.max_active, args.max_queued)
+
+    def ready(listener: asyncio.AbstractServer):
+        address = listener.sockets[0].getsockname()
+        print(f"Weather agent server listening on {address[0]}:{address[1]}")
+
+    try:
+        asyncio.run(serve(args.host, args.port, pool, admission, ready, IntentRouter(tool_manager),
+                          model_client, completion_client))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        try:
+            tool_manager.save_metrics()
+        except OSError as e:
+            print(f"Warning: Could not save tool metrics: {e}")
+
+
+if __name__ == "__main__":
+    main()
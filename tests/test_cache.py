@@ -0,0 +1,66 @@
+import time
+
+from tools.core.cache import PersistentLRUCache
+
+
+def make_cache(tmp_path, **options):
+    options.setdefault("flush_interval", 60.0)
+    return PersistentLRUCache(tmp_path / "cache.sqlite3", table="entries", max_entries=2, **options)
+
+
+def test_queued_writes_are_read_back_before_they_are_flushed(tmp_path):
+    cache = make_cache(tmp_path)
+    for i in range(5):
+        cache.set(f"k{i}", {"value": i})
+    # k0 has left the memory tier but only exists in the write queue
+    assert cache.stats()["pending_writes"] == 5
+    assert cache.get("k0") == {"value": 0}
+    cache.delete("k1")
+    assert cache.get("k1") is None
+    cache.close()
+
+
+def test_writer_thread_commits_without_an_explicit_flush(tmp_path):
+    cache = make_cache(tmp_path, flush_interval=0.02)
+    cache.set("city", "Paris")
+    deadline = time.monotonic() + 2.0
+    while cache.stats()["flushes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.stats()["pending_writes"] == 0
+    assert cache.stats()["disk_size"] == 1
+    cache.close()
+
+
+def test_entries_survive_a_restart(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("kept", [1, 2])
+    cache.set("deleted", 3)
+    cache.delete("deleted")
+    cache.set("expired", 4, ttl=-1)
+    cache.close()
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get("kept") == [1, 2]
+    assert reopened.get("deleted") is None
+    assert reopened.get("expired") is None
+    reopened.clear()
+    assert reopened.stats()["disk_size"] == 0
+    reopened.close()
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = make_cache(tmp_path, max_disk_entries=3)
+    for i in range(10):
+        cache.set(f"k{i}", i)
+    cache.flush()
+    assert cache.stats()["disk_size"] == 3
+    cache.close()
+
+
+def test_memory_only_cache(tmp_path):
+    cache = PersistentLRUCache(None, max_entries=1)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert "disk_size" not in cache.stats()
@@ -0,0 +1,60 @@
+import asyncio
+
+from tools.tool_manager import SingleFlight, coalesce_calls
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def get_weather(city: str, unit: str = "celsius"):
+        calls.append(city)
+        await asyncio.sleep(0.01)
+        return f"{city}: 12°"
+
+    coalesced = coalesce_calls(get_weather)
+
+    async def run():
+        return await asyncio.gather(coalesced("Paris"), coalesced(" paris "), coalesced("Paris", unit="celsius"),
+                                    coalesced("Paris", "fahrenheit"))
+
+    results = asyncio.run(run())
+    assert calls == ["Paris", "Paris"]
+    assert results[:3] == ["Paris: 12°"] * 3
+    assert coalesced.single_flight.stats() == {"calls": 4, "coalesced": 2, "in_flight": 0}
+
+
+def test_cancelling_one_waiter_keeps_the_shared_call_running():
+    async def run():
+        flight = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.run("key", slow))
+        second = asyncio.create_task(flight.run("key", slow))
+        await started.wait()
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_shared_call_is_cancelled_when_every_waiter_leaves():
+    async def run():
+        flight = SingleFlight()
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+        waiter = asyncio.create_task(flight.run("key", slow))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.08)
+        return finished, flight.stats()["in_flight"]
+
+    assert asyncio.run(run()) == ([], 0)
@@ -0,0 +1,78 @@
+import asyncio
+
+from tools.core.http import note_upstream_request
+from tools.core.policy import CLOSED, HALF_OPEN, OPEN, ExecutionPolicy, apply_policy
+
+
+def make_tool(name, answers, **policy):
+    """A policy-wrapped tool returning answers in turn; ("upstream", x) sends a request first"""
+    answers = iter(answers)
+
+    async def lookup(city: str):
+        source, answer = next(answers)
+        if source == "upstream":
+            note_upstream_request()
+        return answer
+
+    lookup.__name__ = name
+    options = dict(failure_threshold=2, reset_timeout=0.05)
+    options.update(policy)
+    return apply_policy(lookup, ExecutionPolicy(**options))
+
+
+def breaker(tool):
+    return tool.execution.breaker
+
+
+def test_cached_answers_do_not_keep_a_failing_breaker_closed():
+    tool = make_tool("cached_answers", [("upstream", "API Error: 503"), ("cache", "London: 12°C"),
+                                        ("upstream", "API Error: 503")])
+
+    async def run():
+        for _ in range(3):
+            await tool("London")
+
+    asyncio.run(run())
+    assert breaker(tool).state == OPEN
+
+
+def test_caller_errors_are_neutral():
+    tool = make_tool("caller_errors", [("upstream", "API Error: 503"), ("upstream", "Error: Could not find 'Xyz'"),
+                                       ("upstream", "Network Error: refused")])
+
+    async def run():
+        for _ in range(3):
+            await tool("Xyz")
+
+    asyncio.run(run())
+    assert breaker(tool).state == OPEN
+
+
+def test_half_open_probe_needs_an_upstream_success():
+    tool = make_tool("half_open_probe", [("upstream", "API Error"), ("upstream", "API Error"),
+                                         ("cache", "London: 12°C"), ("upstream", "London: 13°C")])
+
+    async def run():
+        await tool("London")
+        await tool("London")
+        assert breaker(tool).state == OPEN
+        await asyncio.sleep(0.06)
+        await tool("London")
+        assert breaker(tool).state == HALF_OPEN
+        await tool("London")
+        assert breaker(tool).state == CLOSED
+
+    asyncio.run(run())
+
+
+def test_upstream_success_resets_the_failure_count():
+    tool = make_tool("upstream_success", [("upstream", "API Error"), ("upstream", "London: 12°C"),
+                                          ("upstream", "API Error")])
+
+    async def run():
+        for _ in range(3):
+            await tool("London")
+
+    asyncio.run(run())
+    assert breaker(tool).state == CLOSED
+    assert breaker(tool).consecutive_failures == 1
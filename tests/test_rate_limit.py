@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import pytest
+
+from tools.core.rate_limit import TokenBucket
+
+
+def test_burst_is_served_immediately_then_spaced():
+    async def run():
+        bucket = TokenBucket(rate=20.0, burst=2)
+        start = time.monotonic()
+        times = []
+        for _ in range(4):
+            await bucket.acquire()
+            times.append(time.monotonic() - start)
+        return times
+
+    times = asyncio.run(run())
+    assert times[1] < 0.02
+    assert times[2] == pytest.approx(0.05, abs=0.03)
+    assert times[3] == pytest.approx(0.10, abs=0.03)
+
+
+def test_cancelled_waiter_does_not_let_later_callers_share_a_slot():
+    async def run():
+        bucket = TokenBucket(rate=10.0, burst=1)
+        start = time.monotonic()
+        finished = {}
+
+        async def call(name):
+            await bucket.acquire()
+            finished[name] = time.monotonic() - start
+
+        await call("a")
+        b = asyncio.create_task(call("b"))
+        c = asyncio.create_task(call("c"))
+        await asyncio.sleep(0.01)
+        b.cancel()
+        d = asyncio.create_task(call("d"))
+        await asyncio.gather(c, d)
+        return finished
+
+    finished = asyncio.run(run())
+    assert "b" not in finished
+    assert finished["d"] - finished["c"] >= 0.08
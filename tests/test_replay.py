@@ -0,0 +1,50 @@
+import asyncio
+
+import httpx
+import pytest
+
+from tools.core.replay import HttpTape, RecordingTransport, ReplayTransport, normalize_request, parse_latency
+
+
+def upstream():
+    """Mock upstream answering with a counter, so repeated requests differ"""
+    served = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        served.append(str(request.url))
+        return httpx.Response(200, json={"n": len(served)}, headers={"x-upstream": "mock"})
+
+    return httpx.MockTransport(handler), served
+
+
+def test_recorded_exchanges_replay_in_turn_without_the_network(tmp_path):
+    tape = HttpTape(tmp_path / "tape.sqlite3")
+    transport, served = upstream()
+
+    async def run():
+        async with httpx.AsyncClient(transport=RecordingTransport(tape, transport)) as client:
+            for _ in range(2):
+                await client.get("https://API.example.com:443/v1?b=2&a=1")
+        async with httpx.AsyncClient(transport=ReplayTransport(tape, latency=0.0)) as client:
+            answers = [(await client.get("https://api.example.com/v1?a=1&b=2")).json()["n"] for _ in range(3)]
+            response = await client.get("https://api.example.com/v1?a=1&b=2")
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://api.example.com/other")
+        return answers, response
+
+    answers, response = asyncio.run(run())
+    assert len(served) == 2
+    assert answers == [1, 2, 1]
+    assert response.headers["x-upstream"] == "mock"
+    assert tape.stats() == {"recorded": 2, "replayed": 4, "missing": 1, "exchanges": 2}
+    tape.close()
+
+
+def test_normalize_request():
+    url = httpx.URL("https://Example.com:443/path?z=1&a=2")
+    assert normalize_request("get", url) == "GET https://example.com/path?a=2&z=1"
+
+
+@pytest.mark.parametrize("value, expected", [("original", 1.0), ("zero", 0.0), ("0.5", 0.5), ("fast", 1.0)])
+def test_parse_latency(value, expected):
+    assert parse_latency(value) == expected
@@ -0,0 +1,35 @@
+import asyncio
+
+from router import IntentRouter
+
+
+class FakeManager:
+    """Registers calculate and answers with the given coroutine function"""
+
+    def __init__(self, calculate):
+        self.calculate = calculate
+
+    def list_tools(self):
+        return {"calculate": {"category": "utility",
+                              "parameters": {"type": "object", "properties": {"expression": {"type": "string"}}}}}
+
+    def get_tool_by_name(self, name):
+        return self.calculate
+
+
+def test_failing_tool_falls_back_to_the_agent():
+    async def calculate(expression: str):
+        raise RuntimeError("boom")
+
+    router = IntentRouter(FakeManager(calculate), enabled=True)
+    assert asyncio.run(router.try_answer("what is 2 + 3 * 4")) is None
+    assert router.counts["exception"] == 1
+
+
+def test_fast_path_answer():
+    async def calculate(expression: str):
+        return f"{expression} = 14"
+
+    router = IntentRouter(FakeManager(calculate), enabled=True)
+    assert asyncio.run(router.try_answer("what is 2 + 3 * 4")) == "2 + 3 * 4 = 14"
+    assert router.counts["fast_path"] == 1
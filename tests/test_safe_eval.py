@@ -0,0 +1,25 @@
+import pytest
+
+from tools.core.safe_eval import EvaluationError, evaluate, normalize_expression
+
+
+@pytest.mark.parametrize("expression", ["2 * * 3", "8 / / 3", "2 3"])
+def test_spaced_tokens_are_not_joined(expression):
+    with pytest.raises(EvaluationError):
+        evaluate(expression)
+
+
+def test_spacing_variants_share_a_cache_key():
+    assert normalize_expression("2**3") == normalize_expression(" 2 ** 3 ")
+    assert evaluate("2**3") == evaluate("2 ** 3") == 8
+    assert evaluate("(1+2)*3") == 9
+
+
+def test_unbalanced_expression_is_rejected():
+    with pytest.raises(EvaluationError):
+        evaluate("(1 +")
+
+
+def test_exponent_limit():
+    with pytest.raises(EvaluationError):
+        evaluate("9**9**9")
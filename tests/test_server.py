@@ -0,0 +1,41 @@
+import asyncio
+
+from server import AdmissionControl, AgentServer, SessionPool
+
+
+class BlockingTeam:
+    """Agent team whose turns wait until released"""
+
+    def __init__(self, release: asyncio.Event):
+        self.release = release
+
+    async def run_stream(self, task: str):
+        await self.release.wait()
+        yield task
+
+
+def test_sessions_queued_for_admission_are_not_evicted():
+    async def run():
+        release = asyncio.Event()
+        pool = SessionPool(lambda: BlockingTeam(release), max_sessions=2)
+        server = AgentServer(pool, AdmissionControl(max_active=1, max_queued=4))
+        replies = []
+
+        async def send(payload):
+            replies.append(payload)
+
+        running = asyncio.create_task(server.handle_message({"session": "a", "message": "hi"}, send))
+        queued = asyncio.create_task(server.handle_message({"session": "b", "message": "hi"}, send))
+        await asyncio.sleep(0.01)
+        assert server.admission.queued == 1
+
+        await asyncio.wait_for(server.handle_message({"session": "c", "message": "hi"}, send), 1.0)
+        assert set(pool.sessions) == {"a", "b"}
+        assert replies[-1]["error"] == "busy"
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert [reply["session"] for reply in replies if reply["type"] == "done"] == ["a", "b"]
+        assert not any(session.busy for session in pool.sessions.values())
+
+    asyncio.run(run())
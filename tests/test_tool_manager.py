@@ -0,0 +1,25 @@
+from tools.tool_manager import ToolManager
+
+TOOL_MODULE = '''
+async def greet(name: str, punctuation: str = "!") -> str:
+    """Say hello"""
+    return f"Hello {name}{punctuation}"
+'''
+
+
+def test_lazy_and_eager_tools_describe_signatures_alike(tmp_path, monkeypatch):
+    monkeypatch.setenv("WEATHER_AGENT_CACHE_DIR", str(tmp_path / "cache"))
+    tools_dir = tmp_path / "tools"
+    tools_dir.mkdir()
+    (tools_dir / "greetings.py").write_text(TOOL_MODULE)
+
+    lazy, eager = ToolManager(), ToolManager()
+    lazy.discover_tools(str(tools_dir), lazy=True)
+    eager.discover_tools(str(tools_dir))
+
+    lazy_meta = lazy.list_tools()["greet"]
+    eager_meta = eager.list_tools()["greet"]
+    assert not lazy_meta["loaded"] and eager_meta["loaded"]
+    assert isinstance(lazy_meta["signature"], str)
+    assert lazy_meta["signature"] == eager_meta["signature"] == "(name: str, punctuation: str = '!') -> str"
+    assert lazy_meta["parameters"] == eager_meta["parameters"]
@@ -0,0 +1,47 @@
+import asyncio
+
+from tools.core.web_check import iter_website_checks, probe, url_key
+from tools.tool_manager import coalesce_calls
+
+
+def test_url_key_lowercases_only_scheme_and_host():
+    assert url_key("HTTPS://Example.COM/Docs?Q=1") == "https://example.com/Docs?Q=1"
+    assert url_key(" Example.com/Docs ") == "https://example.com/Docs"
+    assert url_key("https://User@Example.com:8443/A") == "https://User@example.com:8443/A"
+    assert url_key("http://[::1") == "http://[::1"
+
+
+def test_malformed_url_is_reported_not_raised():
+    result = asyncio.run(probe("http://[::1"))
+    assert result.error.startswith("Invalid URL")
+    assert "total" in result.timings
+
+
+def test_malformed_url_does_not_abort_the_sweep():
+    async def sweep():
+        return [check async for check in iter_website_checks(["http://[::1", "http://127.0.0.1:9"], timeout=2.0)]
+
+    checks = {check.url: check for check in asyncio.run(sweep())}
+    assert set(checks) == {"http://[::1", "http://127.0.0.1:9"}
+    assert checks["http://[::1"].error.startswith("Invalid URL")
+    assert checks["http://127.0.0.1:9"].error
+
+
+def test_coalescing_by_url_key_keeps_paths_apart():
+    calls = []
+
+    async def check(url: str):
+        calls.append(url)
+        await asyncio.sleep(0.01)
+        return url
+
+    coalesced = coalesce_calls(check, url_key)
+
+    async def run():
+        return await asyncio.gather(coalesced("https://example.com/Docs"), coalesced("HTTPS://EXAMPLE.com/Docs"),
+                                    coalesced("https://example.com/docs"))
+
+    results = asyncio.run(run())
+    assert len(calls) == 2
+    assert results[0] == results[1] == "https://example.com/Docs"
+    assert results[2] == "https://example.com/docs"
@@ -0,0 +1,238 @@
+"""
+Per-query tool subsetting and a system prompt generated from tool metadata.
+
+Prefill dominates latency on a small local model, and every request used
+to carry every tool schema plus a system prompt repeating the tool list.
+ToolSelector scores the latest user message against keywords for each
+ToolManager category and for each tool (words of its name and
+description), and ToolSelectingChatCompletionClient sends only the matching
+tools together with a system prompt built for just those tools. Queries
+that match nothing get the full tool set.
+
+The agent keeps every tool registered, so a tool the model calls outside
+the subset still runs. Actual prompt tokens per request are taken from the
+model's usage report and kept in stats().
+"""
+
+import logging
+import re
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Union
+
+from autogen_core import CancellationToken
+from autogen_core.models import (
+    ChatCompletionClient,
+    CreateResult,
+    LLMMessage,
+    ModelCapabilities,
+    ModelInfo,
+    RequestUsage,
+    SystemMessage,
+    UserMessage,
+)
+from autogen_core.tools import Tool, ToolSchema
+
+from tools.core.config import env_bool
+
+logger = logging.getLogger("weather_agent.tool_selection")
+
+# Words that point at a whole category
+CATEGORY_KEYWORDS = {
+    "weather": {"weather", "temperature", "temp", "rain", "raining", "rainy", "sunny", "snow", "snowing",
+                "wind", "windy", "hot", "cold", "warm", "humid", "humidity", "cloudy", "storm", "umbrella",
+                "degrees", "celsius", "fahrenheit", "climate", "outside"},
+    "time": {"time", "clock", "timezone", "timezones", "zone", "hour", "hours", "o'clock", "am", "pm",
+             "utc", "gmt", "est", "pst", "cst", "ist", "jst", "convert", "midnight", "noon"},
+}
+
+# Extra words for individual tools beyond their name and description
+TOOL_KEYWORDS = {
+    "get_forecast": {"forecast", "tomorrow", "week", "weekend", "will", "next", "days", "going"},
+    "calculate": {"math", "plus", "minus", "times", "divided", "multiply", "sum", "percent", "sqrt", "compute"},
+    "get_random_fact": {"fact", "facts", "trivia", "interesting", "fun"},
+    "check_website": {"website", "site", "url", "online", "down", "reachable", "http", "https"},
+    "check_websites": {"websites", "sites", "urls"},
+    "about_me": {"creator", "created", "made", "author", "developer", "built", "shariful"},
+    "agent_about": {"yourself", "capabilities", "features", "help", "tools"},
+}
+
+# Prompt rules, emitted only when every tool they mention is offered
+TOOL_RULES = [
+    (("get_weather",), "For weather, ALWAYS call get_weather with the city name; "
+                       "for Dhaka use \"Dhaka, Bangladesh\"."),
+    (("get_weather_many",), "For two or more cities, call get_weather_many once with all of them."),
+    (("get_forecast",), "For future weather (tomorrow, this week, will it rain), call get_forecast with the city "
+                        "and the number of days."),
+    (("get_current_time",), "For the current time, ALWAYS call get_current_time with a timezone, city "
+                            "or country (e.g. \"Asia/Dhaka\")."),
+    (("convert_timezone",), "To convert a time between zones, call convert_timezone."),
+    (("calculate",), "For calculations, ALWAYS call calculate with the expression."),
+]
+
+BASE_PROMPT = ("You are a professional multi-purpose assistant. You MUST use the provided tools to answer "
+               "user requests; NEVER guess or make up information.")
+
+_WORD = re.compile(r"[a-z][a-z'/]*")
+_ARITHMETIC = re.compile(r"\d\s*[-+*/%^x]\s*\(?\d|\d\s*%\s*of\b")
+_URL = re.compile(r"\b(?:https?://)?(?:[a-z0-9-]+\.)+(?:com|org|net|io|dev|edu|gov|[a-z]{2})\b", re.IGNORECASE)
+_STOPWORDS = {"a", "an", "the", "of", "in", "for", "to", "and", "or", "at", "get", "is", "any", "with",
+              "several", "once", "many", "basic", "specific", "information", "between", "different", "one",
+              "more", "if", "this", "its", "about", "me", "ai"}
+
+
+def _words(text: str) -> Set[str]:
+    return set(_WORD.findall(text.lower()))
+
+
+def build_system_prompt(tool_names: Iterable[str]) -> str:
+    """A compact system prompt for the offered tools; their schemas describe them, so no tool list"""
+    offered = set(tool_names)
+    rules = [text for tools, text in TOOL_RULES if offered.issuperset(tools)]
+    lines = [BASE_PROMPT]
+    lines.extend(f"{i}. {rule}" for i, rule in enumerate(rules, 1))
+    return "\n".join(lines)
+
+
+class ToolSelector:
+    """Keyword scorer over ToolManager metadata"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.tool_words: Dict[str, Set[str]] = {}
+        self.categories: Dict[str, List[str]] = {}
+        for name, metadata in manager.list_tools().items():
+            words = _words(name.replace("_", " ")) | _words(metadata.get("description") or "")
+            self.tool_words[name] = (words - _STOPWORDS) | TOOL_KEYWORDS.get(name, set())
+            self.categories.setdefault(metadata["category"], []).append(name)
+
+    def select(self, query: str) -> List[str]:
+        """Tool names relevant to the query, in registry order; every tool when nothing matches"""
+        words = _words(query)
+        selected: Set[str] = set()
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            if words & keywords:
+                selected.update(self.categories.get(category, ()))
+        for name, tool_words in self.tool_words.items():
+            if words & tool_words:
+                selected.add(name)
+        if _ARITHMETIC.search(query):
+            selected.add("calculate")
+        if _URL.search(query):
+            selected.add("check_website")
+        selected &= set(self.tool_words)
+        if not selected:
+            return list(self.tool_words)
+        # Every weather/time question is cheap to widen to its siblings
+        for category in ("weather", "time"):
+            if selected & set(self.categories.get(category, ())):
+                selected.update(self.categories[category])
+        return [name for name in self.tool_words if name in selected]
+
+
+def _tool_name(tool: Union[Tool, ToolSchema]) -> str:
+    return tool.name if isinstance(tool, Tool) else tool["name"]
+
+
+def _latest_query(messages: Sequence[LLMMessage]) -> Optional[str]:
+    for message in reversed(messages):
+        if isinstance(message, UserMessage) and isinstance(message.content, str):
+            return message.content
+    return None
+
+
+class ToolSelectingChatCompletionClient(ChatCompletionClient):
+    """
+    Sends each request with only the tools relevant to the latest user
+    message and a system prompt generated for them.
+    """
+
+    def __init__(self, client: ChatCompletionClient, selector: ToolSelector, enabled: Optional[bool] = None):
+        self._client = client
+        self._selector = selector
+        self._enabled = env_bool("TOOL_SELECTION", True) if enabled is None else enabled
+        self._counters = {"requests": 0, "tools_offered": 0, "tools_available": 0,
+                          "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _narrow(self, messages: Sequence[LLMMessage], tools: Sequence[Union[Tool, ToolSchema]]):
+        query = _latest_query(messages)
+        if not self._enabled or not tools or query is None:
+            return list(messages), list(tools)
+        wanted = set(self._selector.select(query))
+        subset = [tool for tool in tools if _tool_name(tool) in wanted] or list(tools)
+        prompt = build_system_prompt(_tool_name(tool) for tool in subset)
+        messages = list(messages)
+        if messages and isinstance(messages[0], SystemMessage):
+            # Only the agent's own prompt; later system messages (e.g. a
+            # conversation summary) are kept
+            messages[0] = SystemMessage(content=prompt)
+        return messages, subset
+
+    def _record(self, available: int, offered: int, result: CreateResult):
+        counters = self._counters
+        counters["requests"] += 1
+        counters["tools_available"] += available
+        counters["tools_offered"] += offered
+        counters["prompt_tokens"] += result.usage.prompt_tokens
+        counters["completion_tokens"] += result.usage.completion_tokens
+        logger.info("prompt_tokens=%d completion_tokens=%d tools=%d/%d cached=%s",
+                    result.usage.prompt_tokens, result.usage.completion_tokens, offered, available, result.cached)
+
+    async def create(self, messages: Sequence[LLMMessage], *, tools: Sequence[Union[Tool, ToolSchema]] = [],
+                     tool_choice: Any = "auto", json_output: Any = None,
+                     extra_create_args: Mapping[str, Any] = {},
+                     cancellation_token: Optional[CancellationToken] = None) -> CreateResult:
+        narrowed, subset = self._narrow(messages, tools)
+        result = await self._client.create(
+            narrowed, tools=subset, tool_choice=tool_choice, json_output=json_output,
+            extra_create_args=extra_create_args, cancellation_token=cancellation_token,
+        )
+        self._record(len(tools), len(subset), result)
+        return result
+
+    async def create_stream(self, messages: Sequence[LLMMessage], *,
+                            tools: Sequence[Union[Tool, ToolSchema]] = [], tool_choice: Any = "auto",
+                            json_output: Any = None, extra_create_args: Mapping[str, Any] = {},
+                            cancellation_token: Optional[CancellationToken] = None
+                            ) -> AsyncGenerator[Union[str, CreateResult], None]:
+        narrowed, subset = self._narrow(messages, tools)
+        async for chunk in self._client.create_stream(
+            narrowed, tools=subset, tool_choice=tool_choice, json_output=json_output,
+            extra_create_args=extra_create_args, cancellation_token=cancellation_token,
+        ):
+            if isinstance(chunk, CreateResult):
+                self._record(len(tools), len(subset), chunk)
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        counters = self._counters
+        requests = counters["requests"]
+        return {
+            **counters,
+            "mean_prompt_tokens": counters["prompt_tokens"] / requests if requests else 0.0,
+            "mean_tools_offered": counters["tools_offered"] / requests if requests else 0.0,
+        }
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def actual_usage(self) -> RequestUsage:
+        return self._client.actual_usage()
+
+    def total_usage(self) -> RequestUsage:
+        return self._client.total_usage()
+
+    def count_tokens(self, messages: Sequence[LLMMessage], *, tools: Sequence[Union[Tool, ToolSchema]] = []) -> int:
+        narrowed, subset = self._narrow(messages, tools)
+        return self._client.count_tokens(narrowed, tools=subset)
+
+    def remaining_tokens(self, messages: Sequence[LLMMessage], *,
+                         tools: Sequence[Union[Tool, ToolSchema]] = []) -> int:
+        narrowed, subset = self._narrow(messages, tools)
+        return self._client.remaining_tokens(narrowed, tools=subset)
+
+    @property
+    def capabilities(self) -> ModelCapabilities:  # type: ignore[override]
+        return self._client.capabilities
+
+    @property
+    def model_info(self) -> ModelInfo:
+        return self._client.model_info
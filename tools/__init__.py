@@ -1,17 +1,33 @@
 """
 Tools package for the weather agent.
 This package contains all available tools and the tool management system.
+
+Tool modules are not imported up front: tools are registered from a cached
+manifest and each module is imported on first use (or on first attribute
+access, e.g. ``tools.get_weather``). Set WEATHER_AGENT_EAGER_TOOLS=1 to
+import every module at startup instead.
 """
 
+import importlib
+
+from .core.config import env_bool
 from .tool_manager import tool_manager, tool
-from .weather_api import get_weather
 
-# Import all tool modules to register them
-from . import time_tools
-from . import utility_tools
+if env_bool("EAGER_TOOLS", False):
+    # Import all tool modules to register them
+    from . import weather_api
+    from . import time_tools
+    from . import utility_tools
+
+    tool_manager.discover_tools()
+else:
+    tool_manager.discover_tools(lazy=True)
 
 
-tool_manager.discover_tools()
+def __getattr__(name):
+    if name == "get_weather":
+        return importlib.import_module(".weather_api", __name__).get_weather
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ['tool_manager', 'tool', 'get_weather']
@@ -0,0 +1,6 @@
+"""
+Shared infrastructure used by the tool modules.
+
+Modules in this package are not tools themselves, so ToolManager never
+scans them during discovery.
+"""
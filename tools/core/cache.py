@@ -0,0 +1,274 @@
+"""
+A two-tier LRU cache: an in-memory OrderedDict in front of a SQLite file.
+
+Values must be JSON-serialisable. Entries expire after a TTL and both
+tiers are size-bounded, evicting the least recently used keys first.
+
+Writes never touch SQLite on the caller's thread: sets, deletes and
+last-used updates are queued and a writer thread with its own connection
+applies them in one transaction every flush_interval seconds. Until a
+batch is committed, reads consult the queue before the file.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# A queued write: (expires_at, JSON value), or None for a delete
+_Write = Optional[Tuple[float, str]]
+_MISSING = object()
+
+
+class PersistentLRUCache:
+    """
+    LRU cache with TTL that survives restarts.
+
+    Reads are served from memory when possible; on a memory miss the SQLite
+    file is consulted and a fresh row is promoted back into memory. Pass
+    path=None for a memory-only cache. flush() commits queued writes now;
+    close() commits them and stops the writer.
+    """
+
+    def __init__(self, path: Optional[Path], table: str = "cache", max_entries: int = 1024,
+                 ttl: float = 3600.0, max_disk_entries: Optional[int] = None,
+                 flush_interval: float = 1.0, max_pending: int = 256):
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries or max_entries * 10
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Held for a whole batch so flush(), clear() and close() never interleave
+        self._write_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writer_db: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, _Write] = {}
+        self._flushing: Dict[str, _Write] = {}
+        self._touched: Dict[str, float] = {}
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._counters = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0,
+                          "evictions": 0, "expired": 0, "flushes": 0, "write_errors": 0}
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer_db = sqlite3.connect(str(path), check_same_thread=False)
+            # WAL lets the reading connection see the last commit while the writer holds a transaction
+            self._writer_db.execute("PRAGMA journal_mode=WAL")
+            self._writer_db.execute("PRAGMA synchronous=NORMAL")
+            self._writer_db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._writer_db.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_last_used ON {self.table} (last_used)"
+            )
+            self._writer_db.commit()
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not open cache file {path}, using memory only: {e}")
+            for db in (self._db, self._writer_db):
+                if db is not None:
+                    db.close()
+            self._db = self._writer_db = None
+            return
+        self._writer = threading.Thread(target=self._write_loop, name=f"weather-agent-cache-{self.table}",
+                                        daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or expired entry"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters["hits"] += 1
+                    self._counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._counters["expired"] += 1
+
+            value = self._disk_get(key, now)
+            if value is not None:
+                self._counters["hits"] += 1
+                self._counters["disk_hits"] += 1
+                return value
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """Store value under key in memory and queue it for the file"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        raw = json.dumps(value) if self._db is not None else None
+        with self._lock:
+            self._memory_put(key, expires_at, value)
+            if self._db is not None:
+                self._queue(key, (expires_at, raw))
+
+    def delete(self, key: str):
+        """Remove a key from both tiers"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._queue(key, None)
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._write_lock:
+            with self._lock:
+                self._memory.clear()
+                self._pending.clear()
+                self._touched.clear()
+                for name in self._counters:
+                    self._counters[name] = 0
+                if self._writer_db is None:
+                    return
+            try:
+                self._writer_db.execute(f"DELETE FROM {self.table}")
+                self._writer_db.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not clear cache file {self.path}: {e}")
+
+    def flush(self):
+        """Commit queued writes and last-used updates in one transaction"""
+        with self._write_lock:
+            with self._lock:
+                if self._writer_db is None or not (self._pending or self._touched):
+                    return
+                batch, touched = self._pending, self._touched
+                self._pending, self._touched = {}, {}
+                # Still visible to readers until the commit lands
+                self._flushing = batch
+            db = self._writer_db
+            now = time.time()
+            overflow = 0
+            try:
+                db.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(key, entry[1], entry[0], now) for key, entry in batch.items() if entry is not None],
+                )
+                db.executemany(f"DELETE FROM {self.table} WHERE key = ?",
+                               [(key,) for key, entry in batch.items() if entry is None])
+                db.executemany(f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+                               [(used, key) for key, used in touched.items() if key not in batch])
+                overflow = self._prune_disk(db)
+                db.commit()
+            except sqlite3.Error as e:
+                db.rollback()
+                overflow = 0
+                print(f"Warning: Could not write {len(batch)} cache entries to {self.path}: {e}")
+                with self._lock:
+                    self._counters["write_errors"] += 1
+            with self._lock:
+                self._flushing = {}
+                self._counters["flushes"] += 1
+                self._counters["evictions"] += overflow
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current sizes"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counters)
+            stats["size"] = len(self._memory)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            if self._db is not None:
+                stats["pending_writes"] = len(self._pending) + len(self._flushing)
+                try:
+                    stats["disk_size"] = self._db.execute(
+                        f"SELECT COUNT(*) FROM {self.table}"
+                    ).fetchone()[0]
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not count cache entries in {self.path}: {e}")
+            return stats
+
+    def close(self):
+        """Commit queued writes, stop the writer and close the SQLite connections"""
+        if self._writer is not None:
+            self._closing.set()
+            self._wake.set()
+            self._writer.join()
+            self._writer = None
+        self.flush()
+        with self._write_lock, self._lock:
+            for db in (self._db, self._writer_db):
+                if db is not None:
+                    db.close()
+            self._db = self._writer_db = None
+
+    def _write_loop(self):
+        while not self._closing.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _queue(self, key: str, entry: _Write):
+        self._pending[key] = entry
+        self._touched.pop(key, None)
+        if len(self._pending) >= self.max_pending:
+            self._wake.set()
+
+    def _memory_put(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Any]:
+        if self._db is None:
+            return None
+        try:
+            entry = self._pending.get(key, _MISSING)
+            if entry is _MISSING:
+                entry = self._flushing.get(key, _MISSING)
+            if entry is _MISSING:
+                entry = self._db.execute(
+                    f"SELECT expires_at, value FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                queued = False
+            else:
+                queued = True
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at <= now:
+                self._queue(key, None)
+                self._counters["expired"] += 1
+                return None
+            if not queued:
+                self._touched[key] = now
+            value = json.loads(raw)
+            self._memory_put(key, expires_at, value)
+            return value
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Warning: Could not read cache entry {key!r}: {e}")
+            return None
+
+    def _prune_disk(self, db: sqlite3.Connection) -> int:
+        overflow = db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_disk_entries
+        if overflow > 0:
+            db.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+        return max(0, overflow)
@@ -0,0 +1,47 @@
+"""
+Small helpers for reading runtime settings from the environment.
+
+Every setting has a sensible default so the agent runs without any
+configuration; the WEATHER_AGENT_* variables only override them.
+"""
+
+import os
+from pathlib import Path
+
+ENV_PREFIX = "WEATHER_AGENT_"
+
+
+def env_str(name: str, default: str) -> str:
+    """Read a string setting, e.g. env_str("CACHE_DIR", "...")"""
+    return os.environ.get(ENV_PREFIX + name, default)
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to the default on bad input"""
+    try:
+        return int(os.environ[ENV_PREFIX + name])
+    except (KeyError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to the default on bad input"""
+    try:
+        return float(os.environ[ENV_PREFIX + name])
+    except (KeyError, ValueError):
+        return default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting ("1", "true", "yes" and "on" are truthy)"""
+    value = os.environ.get(ENV_PREFIX + name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def cache_dir() -> Path:
+    """Directory for persistent caches (created on first use)"""
+    path = Path(env_str("CACHE_DIR", str(Path.home() / ".cache" / "weather-agent")))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
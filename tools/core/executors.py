@@ -0,0 +1,215 @@
+"""
+Executor policies: where a tool's body runs.
+
+Tools run inline on the event loop by default, which suits code that
+awaits I/O. A tool whose body blocks or burns CPU stalls every other
+conversation for as long as it runs, so @tool(executor=...) can move it:
+
+- "inline": called on the event loop (the default; async tools always
+  run inline);
+- "thread": the shared thread pool, for blocking I/O and C code that
+  releases the GIL;
+- "process": the shared process pool, for pure-Python CPU work that
+  holds the GIL.
+
+Offloaded tools are plain synchronous functions. The pools are shared by
+every tool, created on first use and sized by THREAD_POOL_SIZE and
+PROCESS_POOL_SIZE (0 runs that kind inline); OFFLOAD=false runs every tool
+inline.
+
+Cancelling an offloaded call (a missed deadline, every coalesced caller
+gone) cancels it if it is still queued. A call already running in a thread
+sees cancelled() turn true and may stop early; one running in a process
+runs to the end and its result is dropped. Arguments of process tools are
+pickled on the event loop before submission, so unpicklable arguments fail
+at the call with a TypeError rather than inside the pool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import inspect
+import multiprocessing
+import os
+import pickle
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from tools.core.config import env_bool, env_int, env_str
+
+INLINE, THREAD, PROCESS = "inline", "thread", "process"
+EXECUTORS = (INLINE, THREAD, PROCESS)
+
+_cancel_event: "contextvars.ContextVar[Optional[threading.Event]]" = contextvars.ContextVar(
+    "tool_cancel_event", default=None)
+
+
+def cancelled() -> bool:
+    """Whether the offloaded call running in this thread has been cancelled (poll in long loops)"""
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def _run_in_thread(event: threading.Event, func: Callable, args, kwargs) -> Any:
+    _cancel_event.set(event)
+    return func(*args, **kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve(module_name: str, qualname: str) -> Callable:
+    """The undecorated function behind module.qualname, imported in the worker"""
+    obj: Any = importlib.import_module(module_name)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return inspect.unwrap(obj)
+
+
+def _run_in_process(module_name: str, qualname: str, payload: bytes) -> Any:
+    args, kwargs = pickle.loads(payload)
+    return _resolve(module_name, qualname)(*args, **kwargs)
+
+
+def _noop():
+    return None
+
+
+class ExecutorPools:
+    """
+    The shared thread and process pools, created on first use.
+
+    start() spawns the process pool's workers in the background and
+    aclose() shuts both pools down; counters per pool are in stats().
+    """
+
+    def __init__(self, thread_workers: int = 8, process_workers: int = 2, start_method: str = "spawn",
+                 enabled: bool = True):
+        self.thread_workers = max(0, thread_workers)
+        self.process_workers = max(0, process_workers)
+        # Not fork: the agent process has threads (pools, SQLite, input()) a forked child would inherit locked
+        self.start_method = start_method
+        self.enabled = enabled
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._active = {THREAD: 0, PROCESS: 0}
+        self._counters = {
+            kind: {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "abandoned": 0, "unpicklable": 0}
+            for kind in (THREAD, PROCESS)
+        }
+
+    def offloads(self, kind: str) -> bool:
+        """Whether calls of this kind leave the event loop"""
+        if not self.enabled or kind == INLINE:
+            return False
+        return (self.thread_workers if kind == THREAD else self.process_workers) > 0
+
+    def executor(self, kind: str) -> Executor:
+        if kind == THREAD:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="weather-agent-tool")
+            return self._threads
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(self.process_workers,
+                                                  mp_context=multiprocessing.get_context(self.start_method))
+        return self._processes
+
+    async def run(self, kind: str, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """Run func(*args, **kwargs) in the pool of this kind; cancellation reaches the pool"""
+        counters = self._counters[kind]
+        event = None
+        if kind == PROCESS:
+            try:
+                payload = pickle.dumps((args, kwargs), pickle.HIGHEST_PROTOCOL)
+            except Exception as e:
+                counters["unpicklable"] += 1
+                raise TypeError(f"arguments of {func.__qualname__} cannot be sent to a worker process: {e}") from e
+            future = self.executor(PROCESS).submit(_run_in_process, func.__module__, func.__qualname__, payload)
+        else:
+            event = threading.Event()
+            future = self.executor(THREAD).submit(
+                contextvars.copy_context().run, _run_in_thread, event, func, args, kwargs)
+        counters["submitted"] += 1
+        self._active[kind] += 1
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if future.cancel():
+                counters["cancelled"] += 1
+            else:
+                counters["abandoned"] += 1
+                if event is not None:
+                    event.set()
+            raise
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory); the next call starts a fresh pool
+            counters["failed"] += 1
+            if self._processes is not None:
+                self._processes.shutdown(wait=False)
+                self._processes = None
+            raise
+        except BaseException:
+            counters["failed"] += 1
+            raise
+        finally:
+            self._active[kind] -= 1
+        counters["completed"] += 1
+        return result
+
+    def start(self):
+        """Spawn the process pool's workers now rather than on the first call"""
+        if self.offloads(PROCESS):
+            pool = self.executor(PROCESS)
+            for _ in range(self.process_workers):
+                pool.submit(_noop)
+
+    async def aclose(self):
+        """Shut both pools down, dropping queued calls"""
+        pools = [pool for pool in (self._threads, self._processes) if pool is not None]
+        self._threads = self._processes = None
+        for pool in pools:
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            THREAD: {"workers": self.thread_workers, "active": self._active[THREAD], **self._counters[THREAD]},
+            PROCESS: {"workers": self.process_workers, "active": self._active[PROCESS], **self._counters[PROCESS]},
+        }
+
+
+def offload(func: Callable, executor: str = INLINE, pools: Optional[ExecutorPools] = None) -> Callable:
+    """
+    Async wrapper running a synchronous tool on the given executor. The
+    wrapper keeps the function's signature and exposes the executor name
+    as wrapper.executor. Coroutine functions are returned unchanged.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"Unknown executor {executor!r}; use one of: {', '.join(EXECUTORS)}")
+    if inspect.iscoroutinefunction(func):
+        if executor != INLINE:
+            raise ValueError(f"{func.__qualname__} is async; only synchronous tools can run in a {executor} pool")
+        return func
+    if executor == PROCESS and "<" in func.__qualname__:
+        # Workers import the function by module and name: no lambdas, closures or nested functions
+        raise ValueError(f"{func.__qualname__} cannot run in a process pool: it is not a module-level function")
+    if pools is None:
+        pools = executor_pools
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        if not pools.offloads(executor):
+            return func(*args, **kwargs)
+        return await pools.run(executor, func, args, kwargs)
+
+    wrapper.executor = executor
+    return wrapper
+
+
+executor_pools = ExecutorPools(
+    thread_workers=env_int("THREAD_POOL_SIZE", min(32, (os.cpu_count() or 1) + 4)),
+    process_workers=env_int("PROCESS_POOL_SIZE", min(4, os.cpu_count() or 1)),
+    start_method=env_str("PROCESS_START_METHOD", "spawn"),
+    enabled=env_bool("OFFLOAD", True),
+)
@@ -0,0 +1,228 @@
+"""
+Prefetched pool of random facts.
+
+get_random_fact takes the next fact from an in-memory ring buffer (a
+deque popped from the left, O(1)) and never waits on the network. When
+the buffer drops below the low-water mark a background task refills it
+from the facts API, a few requests at a time, until it is full again.
+
+Every fact ever fetched is deduplicated by a hash of its normalized text
+and appended to a local corpus file (JSON lines), so a restart comes up
+with a warm buffer. While the API is unreachable the buffer is topped up
+with corpus facts that are not already queued.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from tools.core.config import cache_dir, env_bool, env_int, env_str
+from tools.core.http import get_client, untrack_upstream
+
+FACTS_URL = env_str("FACTS_URL", "https://uselessfacts.jsph.pl/random.json?language=en")
+
+logger = logging.getLogger("weather_agent.facts")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fact_hash(text: str) -> bytes:
+    """8-byte digest of the case-folded, single-spaced text"""
+    normalized = _WHITESPACE.sub(" ", text).strip().casefold()
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+
+async def fetch_fact(timeout: float = 10.0) -> str:
+    """One fact from the facts API; HTTP errors propagate"""
+    response = await get_client(FACTS_URL).get(FACTS_URL, timeout=timeout)
+    response.raise_for_status()
+    text = response.json().get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("the facts API returned no text")
+    return text.strip()
+
+
+class FactPool:
+    """
+    Ring buffer of facts with background refill and a persistent corpus.
+
+    take() is synchronous and constant-time; it returns None only when the
+    buffer is empty and nothing has been fetched or persisted yet.
+    """
+
+    def __init__(self, path: Optional[Path], capacity: int = 32, low_water: int = 8,
+                 corpus_size: int = 5000, concurrency: int = 4, fetcher=fetch_fact, enabled: bool = True):
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.low_water = min(max(0, low_water), self.capacity - 1)
+        self.corpus_size = corpus_size
+        self.concurrency = max(1, concurrency)
+        self.fetcher = fetcher
+        self.enabled = enabled
+        self._buffer: Deque[Tuple[str, bytes]] = deque(maxlen=self.capacity)
+        self._queued: Set[bytes] = set()
+        self._corpus: List[str] = []
+        self._known: Set[bytes] = set()
+        self._loaded = False
+        self._refill_task: Optional[asyncio.Task] = None
+        self._counters = {"served": 0, "empty": 0, "fetched": 0, "duplicates": 0, "errors": 0,
+                          "refills": 0, "recycled": 0}
+
+    def _load(self):
+        """Read the corpus and queue a shuffled sample of it"""
+        self._loaded = True
+        if self.path is None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        text = json.loads(line)["text"]
+                    except (ValueError, KeyError, TypeError):
+                        continue  # A torn last line from an interrupted write
+                    digest = fact_hash(text)
+                    if digest not in self._known:
+                        self._known.add(digest)
+                        self._corpus.append(text)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Warning: Could not read the facts corpus {self.path}: {e}")
+            return
+        self._recycle()
+
+    def _queue(self, text: str, digest: bytes) -> bool:
+        if digest in self._queued or len(self._buffer) >= self.capacity:
+            return False
+        self._buffer.append((text, digest))
+        self._queued.add(digest)
+        return True
+
+    def _recycle(self) -> int:
+        """Top the buffer up from the corpus; returns how many facts were queued"""
+        room = self.capacity - len(self._buffer)
+        queued = 0
+        for text in random.sample(self._corpus, min(len(self._corpus), room + len(self._queued))):
+            if queued >= room:
+                break
+            queued += self._queue(text, fact_hash(text))
+        self._counters["recycled"] += queued
+        return queued
+
+    def take(self) -> Optional[str]:
+        """The next fact, without waiting; schedules a refill below the low-water mark"""
+        if not self._loaded:
+            self._load()
+        if self._buffer:
+            text, digest = self._buffer.popleft()
+            self._queued.discard(digest)
+            self._counters["served"] += 1
+        elif self._corpus:
+            # Refilling has not caught up; repeat a known fact rather than wait
+            text = random.choice(self._corpus)
+            self._counters["served"] += 1
+        else:
+            text = None
+            self._counters["empty"] += 1
+        if len(self._buffer) < self.low_water:
+            self._schedule_refill()
+        return text
+
+    def _schedule_refill(self):
+        if not self.enabled or self._refill_task is not None:
+            return
+        try:
+            self._refill_task = asyncio.get_running_loop().create_task(self._refill())
+        except RuntimeError:
+            pass  # No event loop (synchronous caller); the next call in one will refill
+
+    async def _refill(self):
+        untrack_upstream()
+        self._counters["refills"] += 1
+        added: List[str] = []
+        try:
+            # Random facts repeat; give up on a round after this many duplicates or errors
+            misses = 0
+            while len(self._buffer) < self.capacity and misses < 2 * self.capacity:
+                batch = min(self.concurrency, self.capacity - len(self._buffer))
+                results = await asyncio.gather(*(self.fetcher() for _ in range(batch)), return_exceptions=True)
+                errors = [r for r in results if isinstance(r, BaseException)]
+                for text in results:
+                    if isinstance(text, BaseException):
+                        continue
+                    digest = fact_hash(text)
+                    if digest not in self._known and len(self._corpus) < self.corpus_size:
+                        self._known.add(digest)
+                        self._corpus.append(text)
+                        added.append(text)
+                    if self._queue(text, digest):
+                        self._counters["fetched"] += 1
+                    else:
+                        self._counters["duplicates"] += 1
+                        misses += 1
+                self._counters["errors"] += len(errors)
+                if len(errors) == len(results):
+                    logger.info("fact refill failed: %s", errors[0])
+                    break
+                misses += len(errors)
+        finally:
+            self._refill_task = None
+            if len(self._buffer) < self.low_water:
+                self._recycle()
+            if added:
+                await asyncio.to_thread(self._append, added)
+
+    def _append(self, texts: List[str]):
+        if self.path is None:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps({"text": text}, ensure_ascii=False) + "\n" for text in texts)
+        except OSError as e:
+            print(f"Warning: Could not save facts to {self.path}: {e}")
+
+    def start(self):
+        """Load the corpus and start filling the buffer (call from the event loop)"""
+        if not self._loaded:
+            self._load()
+        if len(self._buffer) < self.capacity:
+            self._schedule_refill()
+
+    async def aclose(self):
+        task = self._refill_task
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._counters)
+        stats["buffered"] = len(self._buffer)
+        stats["corpus"] = len(self._corpus)
+        return stats
+
+
+def _build_pool() -> FactPool:
+    path = None
+    if env_bool("FACTS_PERSIST", True):
+        path = Path(env_str("FACTS_CORPUS", str(cache_dir() / "facts.jsonl")))
+    return FactPool(
+        path,
+        capacity=env_int("FACTS_BUFFER_SIZE", 32),
+        low_water=env_int("FACTS_LOW_WATER", 8),
+        corpus_size=env_int("FACTS_CORPUS_SIZE", 5000),
+        concurrency=env_int("FACTS_REFILL_CONCURRENCY", 4),
+        enabled=env_bool("FACTS_PREFETCH", True),
+    )
+
+
+fact_pool = _build_pool()
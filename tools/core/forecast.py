@@ -0,0 +1,199 @@
+"""
+Hourly/daily forecasts from Open-Meteo, held as NumPy columns.
+
+Only the variables the summaries use are requested. Each series becomes
+one typed array (timestamps as datetime64, values as float32 with NaN for
+gaps) instead of a list of dicts: a 16-day hourly forecast takes under
+8 KB. Daily min/max/mean, precipitation totals and "first hour above a
+threshold" are computed with ufunc reductions over contiguous day slices
+(np.ufunc.reduceat), so the per-day work never loops in Python.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from tools.core.cache import PersistentLRUCache
+from tools.core.config import env_float, env_int
+from tools.core.http import get_client
+from tools.core.open_meteo import FORECAST_URL, REQUEST_HEADERS, Coordinate
+
+HOURLY_VARIABLES = ("temperature_2m", "precipitation", "precipitation_probability")
+DAILY_VARIABLES = ("weathercode",)
+
+MAX_FORECAST_DAYS = 16
+
+# Hourly precipitation (mm) that counts as rain
+RAIN_THRESHOLD_MM = 0.1
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """Columnar forecast for one place; hourly arrays share one length"""
+    __slots__ = ("timezone", "hours", "temperature", "precipitation", "precipitation_probability",
+                 "days", "weathercode")
+    timezone: str
+    hours: np.ndarray                      # datetime64[m], local time
+    temperature: np.ndarray                # float32, °C
+    precipitation: np.ndarray              # float32, mm
+    precipitation_probability: np.ndarray  # float32, %
+    days: np.ndarray                       # datetime64[D]
+    weathercode: np.ndarray                # int16, dominant WMO code per day
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.__slots__[1:])
+
+
+@dataclass(frozen=True)
+class DailySummary:
+    """One entry per forecast day, as parallel arrays"""
+    __slots__ = ("days", "temperature_min", "temperature_max", "temperature_mean",
+                 "precipitation_total", "precipitation_probability_max", "first_rain_hour", "weathercode")
+    days: np.ndarray
+    temperature_min: np.ndarray
+    temperature_max: np.ndarray
+    temperature_mean: np.ndarray
+    precipitation_total: np.ndarray
+    precipitation_probability_max: np.ndarray
+    first_rain_hour: np.ndarray  # hour of day (0-23) of the first rainy hour, -1 if dry
+    weathercode: np.ndarray
+
+
+def _column(values: Any, dtype) -> np.ndarray:
+    # None (missing hours) becomes NaN
+    return np.array(values if values is not None else [], dtype=dtype)
+
+
+def _timestamps(values: Any, unit: str, step: int) -> np.ndarray:
+    """Parse ISO timestamps; a regular series is rebuilt from its first entry"""
+    if not values:
+        return np.array([], dtype=f"datetime64[{unit}]")
+    first = np.datetime64(values[0], unit)
+    regular = first + np.arange(len(values)) * np.timedelta64(step, unit)
+    if regular[-1] == np.datetime64(values[-1], unit):
+        return regular
+    return np.array(values, dtype=f"datetime64[{unit}]")
+
+
+def parse_forecast(data: Dict[str, Any]) -> Forecast:
+    """Build a Forecast from an Open-Meteo response body"""
+    hourly = data.get("hourly", {})
+    daily = data.get("daily", {})
+    codes = np.nan_to_num(_column(daily.get("weathercode"), np.float32), nan=-1).astype(np.int16)
+    return Forecast(
+        timezone=data.get("timezone", "GMT"),
+        hours=_timestamps(hourly.get("time"), "m", 60),
+        temperature=_column(hourly.get("temperature_2m"), np.float32),
+        precipitation=_column(hourly.get("precipitation"), np.float32),
+        precipitation_probability=_column(hourly.get("precipitation_probability"), np.float32),
+        days=_timestamps(daily.get("time"), "D", 1),
+        weathercode=codes,
+    )
+
+
+def day_starts(hours: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(calendar days, index of each day's first hour) for sorted timestamps"""
+    days = hours.astype("datetime64[D]")
+    starts = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+    return days[starts], starts
+
+
+def first_index_above(values: np.ndarray, threshold: float, starts: np.ndarray) -> np.ndarray:
+    """Per day slice, offset of the first value above threshold, or -1"""
+    if not len(values):
+        return np.array([], dtype=np.int64)
+    above = values > threshold  # NaN compares False
+    ends = np.append(starts[1:], len(values))
+    # First True in each slice: the minimum of the masked positions
+    candidates = np.where(above, np.arange(len(values)), len(values))
+    first = np.minimum.reduceat(candidates, starts)
+    return np.where(first < ends, first - starts, -1)
+
+
+def summarize_daily(forecast: Forecast, rain_threshold: float = RAIN_THRESHOLD_MM) -> DailySummary:
+    """Daily aggregates of the hourly columns"""
+    days, starts = day_starts(forecast.hours)
+    if not len(starts):
+        empty = np.array([], dtype=np.float32)
+        return DailySummary(days, empty, empty, empty, empty, empty,
+                            np.array([], dtype=np.int64), np.array([], dtype=np.int16))
+
+    temperature = forecast.temperature
+    valid = temperature == temperature  # False for NaN
+    valid_hours = np.add.reduceat(valid.astype(np.int32), starts)
+    totals = np.add.reduceat(np.where(valid, temperature, 0), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid_hours > 0, totals / valid_hours, np.nan).astype(np.float32)
+
+    probability = forecast.precipitation_probability
+    if len(probability) == len(temperature):
+        probability_max = np.fmax.reduceat(probability, starts)
+    else:
+        probability_max = np.full(len(days), np.nan, dtype=np.float32)
+
+    hour_of_day = (forecast.hours - forecast.hours.astype("datetime64[D]")).astype("timedelta64[h]").astype(np.int64)
+    first_rain = first_index_above(forecast.precipitation, rain_threshold - 1e-6, starts)
+    first_rain_hour = np.where(first_rain >= 0, hour_of_day[starts + np.maximum(first_rain, 0)], -1)
+
+    codes = np.full(len(days), -1, dtype=np.int16)
+    if len(forecast.days):
+        # Daily codes are matched to the calendar days of the hourly series
+        positions = np.minimum(np.searchsorted(forecast.days, days), len(forecast.days) - 1)
+        known = forecast.days[positions] == days
+        codes[known] = forecast.weathercode[positions[known]]
+
+    return DailySummary(
+        days=days,
+        temperature_min=np.fmin.reduceat(temperature, starts),
+        temperature_max=np.fmax.reduceat(temperature, starts),
+        temperature_mean=mean,
+        precipitation_total=np.add.reduceat(np.fmax(forecast.precipitation, 0), starts),
+        precipitation_probability_max=probability_max,
+        first_rain_hour=first_rain_hour,
+        weathercode=codes,
+    )
+
+
+async def fetch_forecast(lat: Coordinate, lon: Coordinate, days: int) -> Forecast:
+    """Request the hourly and daily columns for one point; HTTP errors propagate"""
+    response = await get_client(FORECAST_URL).get(
+        FORECAST_URL,
+        params={
+            "latitude": str(lat),
+            "longitude": str(lon),
+            "hourly": ",".join(HOURLY_VARIABLES),
+            "daily": ",".join(DAILY_VARIABLES),
+            "forecast_days": str(days),
+            "timezone": "auto",
+        },
+        headers=REQUEST_HEADERS,
+    )
+    response.raise_for_status()
+    return parse_forecast(response.json())
+
+
+class ForecastCache:
+    """Forecasts by grid cell and length; forecasts only change hourly"""
+
+    def __init__(self, ttl: float = 1800.0, grid: float = 0.05, max_entries: int = 256):
+        self.grid = grid
+        self._cache = PersistentLRUCache(None, table="forecast", max_entries=max_entries, ttl=ttl)
+
+    async def get(self, lat: Coordinate, lon: Coordinate, days: int) -> Forecast:
+        key = f"{round(float(lat) / self.grid)}:{round(float(lon) / self.grid)}:{days}"
+        forecast = self._cache.get(key)
+        if forecast is None:
+            forecast = await fetch_forecast(lat, lon, days)
+            self._cache.set(key, forecast)
+        return forecast
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+forecast_cache = ForecastCache(
+    ttl=env_float("FORECAST_CACHE_TTL", 1800.0),
+    max_entries=env_int("FORECAST_CACHE_SIZE", 256),
+)
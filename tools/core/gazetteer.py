@@ -0,0 +1,365 @@
+"""
+Offline geocoder built from a GeoNames cities dump (e.g. cities15000.txt).
+
+The dump is compiled once into a compact binary index that is memory-mapped
+at runtime, so startup never parses the text file:
+
+    python build_gazetteer.py cities15000.txt
+
+Layout (little endian): a header, a fixed-size place table, a key table
+sorted by normalized name bytes (binary-searchable in place), a JSON blob
+of country names and a UTF-8 string blob that both tables point into.
+"""
+
+import json
+import mmap
+import struct
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from tools.core.config import cache_dir, env_str
+
+MAGIC = b"WAGAZ002"
+# magic, n_places, n_keys, places_off, keys_off, countries_off, countries_len, strings_off
+HEADER = struct.Struct("<8s7I")
+# lat, lon, population, name_off, name_len, country code
+PLACE = struct.Struct("<ffIIH2s")
+# key_off, key_len, place_id, letter mask
+KEY = struct.Struct("<IHII")
+
+# Column positions in the GeoNames "geoname" table dump
+_NAME, _ASCIINAME, _ALTERNATES, _LAT, _LON, _COUNTRY, _POPULATION = 1, 2, 3, 4, 5, 8, 14
+
+MAX_FUZZY_DISTANCE = 2
+
+# Common ways of naming a country that differ from the stored country names
+COUNTRY_ALIASES = {
+    "uk": "GB", "united kingdom": "GB", "great britain": "GB", "england": "GB",
+    "scotland": "GB", "wales": "GB", "usa": "US", "us": "US", "america": "US",
+    "united states of america": "US", "uae": "AE", "russia": "RU",
+    "south korea": "KR", "north korea": "KP", "czechia": "CZ", "holland": "NL",
+}
+
+
+def normalize_name(name: str) -> str:
+    """Accent-stripped, case-folded, punctuation-free form used as index key"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    cleaned = "".join(c if c.isalnum() else " " for c in stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+def letter_mask(text: str) -> int:
+    """
+    32-bit set of the characters in text (a-z individually, anything else
+    folded into the top bits). One edit changes at most two bits, so masks
+    that differ in more bits rule a key out of a fuzzy match cheaply.
+    """
+    mask = 0
+    for c in text:
+        if "a" <= c <= "z":
+            mask |= 1 << (ord(c) - 97)
+        elif c != " ":
+            mask |= 1 << (26 + ord(c) % 6)
+    return mask
+
+
+class Place(NamedTuple):
+    name: str
+    country_code: str
+    country: str
+    lat: float
+    lon: float
+    population: int
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.name}, {self.country}" if self.country else self.name
+
+
+def _bounded_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, or limit + 1 as soon as it must exceed limit.
+
+    Only the diagonal band of width 2 * limit + 1 is computed.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(lo, hi + 1):
+            value = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+class Gazetteer:
+    """Read-only view over a memory-mapped index file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.n_places, self.n_keys, self._places_off, self._keys_off,
+         countries_off, countries_len, self._strings_off) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a gazetteer index")
+        self.countries: Dict[str, str] = json.loads(
+            self._mm[countries_off:countries_off + countries_len].decode("utf-8")
+        )
+        self._country_codes: Dict[str, str] = {code.casefold(): code for code in self.countries}
+        for code, name in self.countries.items():
+            self._country_codes[normalize_name(name)] = code
+        self._country_codes.update(COUNTRY_ALIASES)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings_off + offset
+        return self._mm[start:start + length]
+
+    def _key(self, index: int) -> Tuple[bytes, int]:
+        offset, length, place_id, _ = KEY.unpack_from(self._mm, self._keys_off + index * KEY.size)
+        return self._string(offset, length), place_id
+
+    def place(self, place_id: int) -> Place:
+        lat, lon, population, name_off, name_len, country = PLACE.unpack_from(
+            self._mm, self._places_off + place_id * PLACE.size
+        )
+        code = country.decode("ascii").strip("\0")
+        return Place(self._string(name_off, name_len).decode("utf-8"), code,
+                     self.countries.get(code, code), lat, lon, population)
+
+    def _lower_bound(self, key: bytes) -> int:
+        lo, hi = 0, self.n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _scan(self, start: int, prefix: bytes) -> Iterator[Tuple[bytes, int]]:
+        for index in range(start, self.n_keys):
+            key, place_id = self._key(index)
+            if not key.startswith(prefix):
+                return
+            yield key, place_id
+
+    def _prefix_range(self, prefix: bytes) -> Tuple[int, int]:
+        """Index range [start, end) of keys starting with prefix"""
+        start = self._lower_bound(prefix)
+        end = self._lower_bound(prefix[:-1] + bytes([prefix[-1] + 1])) if prefix[-1] < 0xFF else self.n_keys
+        return start, end
+
+    def country_code(self, country: str) -> Optional[str]:
+        """ISO code for a country name or code, or None if unknown"""
+        return self._country_codes.get(normalize_name(country))
+
+    def _split_query(self, query: str) -> Tuple[str, Optional[str], bool]:
+        parts = [part.strip() for part in query.split(",") if part.strip()]
+        if not parts:
+            return "", None, False
+        name = normalize_name(parts[0])
+        if len(parts) == 1:
+            return name, None, False
+        # "City, Region, Country": the last part decides the country
+        code = self.country_code(parts[-1])
+        return name, code, code is None
+
+    def exact(self, name: str, country_code: Optional[str] = None) -> Optional[Place]:
+        """Most populous place whose normalized name equals name"""
+        key = normalize_name(name).encode("utf-8")
+        # Keys are sorted by (name, population descending), so the first match wins
+        for found, place_id in self._scan(self._lower_bound(key), key):
+            if found != key:
+                break
+            place = self.place(place_id)
+            if country_code is None or place.country_code == country_code:
+                return place
+        return None
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[Place]:
+        """Places whose name starts with prefix, most populous first"""
+        key = normalize_name(prefix).encode("utf-8")
+        seen = set()
+        places = []
+        for _, place_id in self._scan(self._lower_bound(key), key):
+            if place_id not in seen:
+                seen.add(place_id)
+                places.append(self.place(place_id))
+        places.sort(key=lambda place: -place.population)
+        return places[:limit]
+
+    def fuzzy(self, name: str, country_code: Optional[str] = None) -> Optional[Place]:
+        """
+        Best match within a small edit distance, tie-broken by population.
+
+        Only keys sharing the query's first character are compared, which
+        keeps the scan to a small slice of the index.
+        """
+        query = normalize_name(name)
+        if len(query) < 4:
+            return None
+        limit = min(MAX_FUZZY_DISTANCE, len(query) // 4)
+        best: Optional[Tuple[int, int, Place]] = None
+        encoded = query.encode("utf-8")
+        start, end = self._prefix_range(encoded[:1])
+        mask = letter_mask(query)
+        mm, keys_off, key_size = self._mm, self._keys_off, KEY.size
+        for index in range(start, end):
+            offset, length, place_id, key_mask = KEY.unpack_from(mm, keys_off + index * key_size)
+            # Byte length and letter masks are cheap filters ahead of the edit distance
+            if abs(length - len(encoded)) > limit or bin(mask ^ key_mask).count("1") > 2 * limit:
+                continue
+            distance = _bounded_distance(query, self._string(offset, length).decode("utf-8"), limit)
+            if distance > limit:
+                continue
+            place = self.place(place_id)
+            if country_code is not None and place.country_code != country_code:
+                continue
+            rank = (distance, -place.population)
+            if best is None or rank < best[:2]:
+                best = (distance, -place.population, place)
+        return best[2] if best else None
+
+    def lookup(self, query: str) -> Optional[Place]:
+        """
+        Resolve a free-form query such as "paris", "Paris, France" or
+        "Dhaka, Bangladesh". Returns None rather than guessing when the
+        query names a country the index does not know.
+        """
+        name, code, unknown_country = self._split_query(query)
+        if not name or unknown_country:
+            return None
+        return self.exact(name, code) or self.fuzzy(name, code)
+
+
+def _read_geonames(source: Path, min_population: int) -> Iterator[List[str]]:
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) <= _POPULATION:
+                continue
+            population = int(fields[_POPULATION] or 0)
+            if population >= min_population:
+                yield fields
+
+
+def _country_names(country_info: Optional[Path] = None) -> Dict[str, str]:
+    """ISO code -> country name, from GeoNames countryInfo.txt or pytz"""
+    if country_info is not None:
+        names = {}
+        with open(country_info, encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                fields = line.rstrip("\n").split("\t")
+                if len(fields) > 4:
+                    names[fields[0]] = fields[4]
+        return names
+    try:
+        import pytz
+    except ImportError:
+        return {}
+    return dict(pytz.country_names)
+
+
+def build_index(source: Path, output: Path, min_population: int = 0,
+                country_info: Optional[Path] = None) -> Tuple[int, int]:
+    """
+    Compile a GeoNames dump into a binary index.
+
+    Each place is indexed under its name, ASCII name and any ASCII
+    alternate names. Country names come from countryInfo.txt when given,
+    otherwise from pytz. Returns (places, keys) written.
+    """
+    strings = bytearray()
+    offsets: Dict[bytes, int] = {}
+
+    def intern(value: bytes) -> int:
+        offset = offsets.get(value)
+        if offset is None:
+            offset = offsets[value] = len(strings)
+            strings.extend(value)
+        return offset
+
+    places = bytearray()
+    keys: List[Tuple[bytes, int, int, int]] = []
+    place_id = 0
+    for fields in _read_geonames(source, min_population):
+        name = fields[_NAME].encode("utf-8")[:0xFFFF]
+        population = min(int(fields[_POPULATION] or 0), 0xFFFFFFFF)
+        places.extend(PLACE.pack(float(fields[_LAT]), float(fields[_LON]), population,
+                                 intern(name), len(name), fields[_COUNTRY][:2].encode("ascii")))
+
+        names = {fields[_NAME], fields[_ASCIINAME]}
+        names.update(alt for alt in fields[_ALTERNATES].split(",") if alt.isascii())
+        for key in {normalize_name(n) for n in names if n}:
+            if key:
+                keys.append((key.encode("utf-8")[:0xFFFF], -population, place_id, letter_mask(key)))
+        place_id += 1
+
+    keys.sort()
+    key_table = bytearray()
+    for key, _, pid, mask in keys:
+        key_table.extend(KEY.pack(intern(key), len(key), pid, mask))
+
+    countries = json.dumps(_country_names(country_info), separators=(",", ":")).encode("utf-8")
+    places_off = HEADER.size
+    keys_off = places_off + len(places)
+    countries_off = keys_off + len(key_table)
+    strings_off = countries_off + len(countries)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, place_id, len(keys), places_off, keys_off,
+                            countries_off, len(countries), strings_off))
+        f.write(places)
+        f.write(key_table)
+        f.write(countries)
+        f.write(strings)
+    return place_id, len(keys)
+
+
+def default_index_path() -> Path:
+    return Path(env_str("GAZETTEER", str(cache_dir() / "gazetteer.bin")))
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_checked = False
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """The shared index, or None if no index file has been built"""
+    global _gazetteer, _gazetteer_checked
+    if not _gazetteer_checked:
+        _gazetteer_checked = True
+        path = default_index_path()
+        if path.exists():
+            try:
+                _gazetteer = Gazetteer(path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Warning: Could not load gazetteer {path}: {e}")
+    return _gazetteer
@@ -0,0 +1,85 @@
+"""
+City name -> coordinates lookup.
+
+Queries are answered, in order, by the offline gazetteer (if an index has
+been built), the persistent geocode cache, and finally Nominatim.
+"""
+
+import re
+from typing import Any, Dict, Optional
+
+from tools.core.cache import PersistentLRUCache
+from tools.core.config import cache_dir, env_bool, env_float, env_int, env_str
+from tools.core.gazetteer import get_gazetteer
+from tools.core.http import get_client
+
+NOMINATIM_URL = env_str("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+
+NOMINATIM_HEADERS = {
+    'User-Agent': 'WeatherAgent/1.0 (weather-agent-project-python; contact@realbrain.cc)',
+    'Accept-Language': 'en,en-US;q=0.9',
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_city(city: str) -> str:
+    """Canonical cache key for a city query: case-folded, single-spaced"""
+    return _WHITESPACE.sub(" ", city).strip().casefold()
+
+
+def _build_cache() -> PersistentLRUCache:
+    path = None
+    if env_bool("GEOCODE_CACHE_PERSIST", True):
+        path = cache_dir() / "geocode.sqlite3"
+    return PersistentLRUCache(
+        path,
+        table="geocode",
+        max_entries=env_int("GEOCODE_CACHE_SIZE", 2048),
+        ttl=env_float("GEOCODE_CACHE_TTL", 30 * 24 * 3600.0),
+    )
+
+
+geocode_cache = _build_cache()
+
+
+async def geocode(city: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a city name to {"lat", "lon", "display_name"}.
+
+    Gazetteer and cached results are returned without touching the
+    network; Nominatim's one-request-per-second policy is enforced by the
+    HTTP layer's rate limiter. Returns None when Nominatim does not know the
+    place; HTTP errors propagate.
+    """
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        place = gazetteer.lookup(city)
+        if place is not None:
+            # The index stores float32 coordinates; five decimals is ~1 m
+            return {"lat": round(place.lat, 5), "lon": round(place.lon, 5),
+                    "display_name": place.display_name}
+
+    key = normalize_city(city)
+    cached = geocode_cache.get(key)
+    if cached is not None:
+        return cached
+
+    response = await get_client(NOMINATIM_URL).get(
+        NOMINATIM_URL,
+        params={"q": city, "format": "json"},
+        headers=NOMINATIM_HEADERS,
+    )
+    response.raise_for_status()
+
+    results = response.json()
+    if not results:
+        return None
+
+    location = {
+        "lat": results[0]["lat"],
+        "lon": results[0]["lon"],
+        "display_name": results[0]["display_name"],
+    }
+    geocode_cache.set(key, location)
+    return location
@@ -0,0 +1,170 @@
+"""
+Application-scoped pool of httpx.AsyncClient instances shared by every tool.
+
+Reusing clients keeps TCP/TLS connections alive between tool calls instead
+of paying a fresh handshake per request. Hosts listed in HOST_LIMITS get a
+dedicated client with their own connection limits; every other host shares
+the default client. Every request first waits for the host's rate-limit
+budget (see rate_limit.py). When an HTTP tape is configured the clients
+record to it or replay from it (see replay.py).
+
+Requests sent inside track_upstream() are counted, which tells execution
+policies whether a tool call reached its upstream or was answered from a
+cache.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from tools.core.config import env_bool, env_float, env_int, env_str
+from tools.core.rate_limit import RateLimiter, rate_limiter
+from tools.core.replay import HttpTape, RecordingTransport, ReplayTransport, parse_latency, tape_from_env
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+
+HOST_LIMITS: Dict[str, httpx.Limits] = {
+    "nominatim.openstreetmap.org": httpx.Limits(max_connections=2, max_keepalive_connections=2),
+    "api.open-meteo.com": httpx.Limits(max_connections=10, max_keepalive_connections=10),
+    "uselessfacts.jsph.pl": httpx.Limits(max_connections=4, max_keepalive_connections=2),
+}
+
+
+class UpstreamContact:
+    """Requests the shared clients sent on behalf of one tracked call"""
+    __slots__ = ("requests",)
+
+    def __init__(self):
+        self.requests = 0
+
+
+_upstream_contact: "ContextVar[Optional[UpstreamContact]]" = ContextVar("upstream_contact", default=None)
+
+
+@contextmanager
+def track_upstream() -> Iterator[UpstreamContact]:
+    """Count the requests sent inside the block, including by tasks started there"""
+    contact = UpstreamContact()
+    token = _upstream_contact.set(contact)
+    try:
+        yield contact
+    finally:
+        _upstream_contact.reset(token)
+
+
+def untrack_upstream():
+    """Detach a background task from the call that started it; its requests are not that call's"""
+    _upstream_contact.set(None)
+
+
+def note_upstream_request():
+    """Count a request for the tracked call; the shared clients do this for every request they send"""
+    contact = _upstream_contact.get()
+    if contact is not None:
+        contact.requests += 1
+
+
+async def _note_request(request: httpx.Request):
+    note_upstream_request()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpClientRegistry:
+    """
+    Lazily creates and owns the shared AsyncClients.
+
+    Clients are created on first use inside the running event loop and must
+    be closed with aclose() before that loop shuts down.
+    """
+
+    def __init__(self, host_limits: Optional[Dict[str, httpx.Limits]] = None,
+                 default_limits: Optional[httpx.Limits] = None,
+                 timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+                 keepalive_expiry: float = 30.0, http2: bool = False,
+                 limiter: Optional[RateLimiter] = None, tape: Optional[HttpTape] = None,
+                 tape_mode: Optional[str] = None, replay_latency: float = 1.0):
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limits = default_limits or httpx.Limits(
+            max_connections=env_int("HTTP_MAX_CONNECTIONS", 50),
+            max_keepalive_connections=env_int("HTTP_MAX_KEEPALIVE", 20),
+        )
+        self.timeout = timeout
+        self.keepalive_expiry = keepalive_expiry
+        if http2 and not _http2_available():
+            print("Warning: HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.limiter = limiter
+        self.tape = tape
+        self.tape_mode = tape_mode if tape is not None else None
+        self.replay_latency = replay_latency
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get_client(self, url: str = "") -> httpx.AsyncClient:
+        """Return the shared client responsible for the host of url"""
+        host = urlsplit(url).hostname or ""
+        key = host if host in self.host_limits else ""
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._create_client(self.host_limits.get(key, self.default_limits))
+            self._clients[key] = client
+        return client
+
+    def _create_client(self, limits: httpx.Limits) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        transport = None
+        if self.tape_mode == "replay":
+            transport = ReplayTransport(self.tape, self.replay_latency)
+        elif self.tape_mode == "record":
+            transport = RecordingTransport(self.tape, httpx.AsyncHTTPTransport(limits=limits, http2=self.http2))
+        # Replayed requests never reach the upstream, so they need no budget
+        rate_limited = self.limiter is not None and self.tape_mode != "replay"
+        event_hooks = {"request": [_note_request, self._wait_for_budget] if rate_limited else [_note_request]}
+        return httpx.AsyncClient(timeout=self.timeout, limits=limits, http2=self.http2,
+                                 event_hooks=event_hooks, transport=transport)
+
+    async def _wait_for_budget(self, request: httpx.Request):
+        await self.limiter.acquire(request.url.host)
+
+    async def start(self):
+        """Create the clients for every configured host up front"""
+        for host in self.host_limits:
+            self.get_client(f"https://{host}/")
+        self.get_client()
+
+    async def aclose(self):
+        """Close every client and release their connections"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+_tape_mode, _tape = tape_from_env()
+
+http_clients = HttpClientRegistry(
+    keepalive_expiry=env_float("HTTP_KEEPALIVE_EXPIRY", 30.0),
+    http2=env_bool("HTTP2", False),
+    limiter=rate_limiter,
+    tape=_tape,
+    tape_mode=_tape_mode,
+    replay_latency=parse_latency(env_str("HTTP_REPLAY_LATENCY", "original")),
+)
+
+
+def get_client(url: str = "") -> httpx.AsyncClient:
+    """Shortcut for http_clients.get_client(url)"""
+    return http_clients.get_client(url)
@@ -0,0 +1,176 @@
+"""
+Static tool manifest: tool metadata read from source without importing it.
+
+Each tool module is parsed with the ast module to find its public async
+functions (and synchronous ones decorated with @tool, which run through an
+executor) and their @tool(...) arguments, signatures and JSON schemas. The
+result is cached in a JSON file and reused until a module's mtime/size
+changes and its content hash no longer matches.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tools.core.config import cache_dir
+
+MANIFEST_VERSION = 2
+
+_SCHEMA_TYPES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
+_SEQUENCE = re.compile(r"(?:typing\.)?(?:List|list|Sequence|Tuple|tuple)\[(.+?)(?:, \.\.\.)?\]")
+
+
+def annotation_schema(annotation: str) -> Dict[str, Any]:
+    """JSON schema for a type annotation given as source text, e.g. "List[str]" """
+    match = _SEQUENCE.fullmatch(annotation.strip())
+    if match:
+        return {"type": "array", "items": annotation_schema(match.group(1))}
+    schema_type = _SCHEMA_TYPES.get(annotation.strip())
+    return {"type": schema_type} if schema_type else {}
+
+
+def parameters_schema(parameters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Object schema for a list of {"name", "annotation", "default"?} entries;
+    parameters without a default are required.
+    """
+    properties = {}
+    required = []
+    for param in parameters:
+        schema = annotation_schema(param.get("annotation") or "")
+        if "default" in param:
+            schema["default"] = param["default"]
+        else:
+            required.append(param["name"])
+        properties[param["name"]] = schema
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def _tool_decorator(node: ast.AST) -> Optional[ast.Call]:
+    for decorator in node.decorator_list:
+        if isinstance(decorator, ast.Call):
+            func = decorator.func
+            name = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if name == "tool":
+                return decorator
+    return None
+
+
+def _describe_function(node: ast.AST, module_name: str) -> Dict[str, Any]:
+    docstring = ast.get_docstring(node, clean=False)
+    category, description = module_name, docstring or f"Tool from {module_name}"
+    executor = "inline"
+
+    decorator = _tool_decorator(node)
+    if decorator is not None:
+        options = dict(zip(("category", "description"), (_literal(arg) for arg in decorator.args)))
+        options.update((kw.arg, _literal(kw.value)) for kw in decorator.keywords if kw.arg)
+        category = options.get("category") or "general"
+        description = options.get("description") or ""
+        executor = options.get("executor") or "inline"
+
+    args = node.args
+    positional = args.posonlyargs + args.args
+    defaults = [None] * (len(positional) - len(args.defaults)) + list(args.defaults)
+    parameters = []
+    rendered = []
+    for arg, default in list(zip(positional, defaults)) + list(zip(args.kwonlyargs, args.kw_defaults)):
+        param: Dict[str, Any] = {"name": arg.arg}
+        text = arg.arg
+        if arg.annotation is not None:
+            param["annotation"] = ast.unparse(arg.annotation)
+            text += f": {param['annotation']}"
+        if default is not None:
+            param["default"] = _literal(default)
+            text += f" = {ast.unparse(default)}"
+        parameters.append(param)
+        rendered.append(text)
+
+    signature = f"({', '.join(rendered)})"
+    if node.returns is not None:
+        signature += f" -> {ast.unparse(node.returns)}"
+
+    return {
+        "name": node.name,
+        "category": category,
+        "description": description,
+        "signature": signature,
+        "docstring": docstring,
+        "parameters": parameters_schema(parameters),
+        "executor": executor,
+    }
+
+
+def scan_module(path: Path) -> List[Dict[str, Any]]:
+    """Metadata for every public module-level async function or @tool function in a file"""
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+    return [
+        _describe_function(node, path.stem)
+        for node in tree.body
+        if not getattr(node, "name", "_").startswith("_") and (
+            isinstance(node, ast.AsyncFunctionDef)
+            or isinstance(node, ast.FunctionDef) and _tool_decorator(node) is not None)
+    ]
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def default_manifest_path(tools_path: Path) -> Path:
+    """Manifest file for a tools directory; one per directory, so several checkouts never share one"""
+    digest = hashlib.sha1(str(tools_path.resolve()).encode()).hexdigest()[:12]
+    return cache_dir() / f"tool_manifest-{digest}.json"
+
+
+def load_manifest(tool_files: List[Path], manifest_path: Path) -> Dict[str, Dict[str, Any]]:
+    """
+    Manifest entries keyed by module name, re-scanning only changed files.
+
+    Each entry holds the module's path, mtime/size/hash and tool metadata.
+    The cache file is rewritten only when something changed.
+    """
+    try:
+        cached = json.loads(manifest_path.read_text())
+        if cached.get("version") != MANIFEST_VERSION:
+            cached = {}
+    except (OSError, ValueError):
+        cached = {}
+    old_modules: Dict[str, Dict[str, Any]] = cached.get("modules", {})
+
+    modules: Dict[str, Dict[str, Any]] = {}
+    changed = set(old_modules) != {path.stem for path in tool_files}
+    for path in tool_files:
+        stat = path.stat()
+        entry = old_modules.get(path.stem)
+        if (entry is not None and entry["path"] == str(path)
+                and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size):
+            modules[path.stem] = entry
+            continue
+
+        digest = _file_hash(path)
+        if entry is None or entry["sha256"] != digest or entry["path"] != str(path):
+            entry = {"path": str(path), "sha256": digest, "tools": scan_module(path)}
+        entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        modules[path.stem] = entry
+        changed = True
+
+    if changed:
+        try:
+            tmp = manifest_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "modules": modules}, indent=1))
+            os.replace(tmp, manifest_path)
+        except OSError as e:
+            print(f"Warning: Could not write tool manifest {manifest_path}: {e}")
+    return modules
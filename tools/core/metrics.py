@@ -0,0 +1,259 @@
+"""
+Per-tool call metrics: latency histograms, call/error/timeout counters and
+in-flight gauges, aggregated per tool and per category.
+
+Recording a call is a couple of perf_counter() reads, a bisect into fixed
+bucket bounds and a few integer increments, so instrumenting every tool
+costs a few microseconds per call. Snapshots export as JSON-ready dicts or
+Prometheus text exposition format.
+"""
+
+import asyncio
+import functools
+import re
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from tools.core.config import cache_dir, env_str
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Tools report most failures as text rather than raising
+_ERROR_RESULT = re.compile(r"^(?:❌|(?:API |Network )?Error\b)")
+
+
+def default_metrics_path() -> Path:
+    """Where main.py saves the metrics snapshot on exit and list_tools.py reads it"""
+    return Path(env_str("METRICS_FILE", str(cache_dir() / "tool_metrics.json")))
+
+
+def classify_result(result: Any) -> str:
+    """"ok", "error" or "timeout" for a tool's return value"""
+    if isinstance(result, str) and _ERROR_RESULT.match(result):
+        return "timeout" if "timeout" in result.lower() else "error"
+    return "ok"
+
+
+def _is_timeout(error: BaseException) -> bool:
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in type(error).__name__
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; quantiles are interpolated within buckets"""
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket in enumerate(self.counts):
+            if bucket and seen + bucket >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket
+            seen += bucket
+        return self.bounds[-1]
+
+    def cumulative(self) -> List[int]:
+        total = 0
+        result = []
+        for bucket in self.counts:
+            total += bucket
+            result.append(total)
+        return result
+
+    def merge(self, other: "Histogram"):
+        for i, bucket in enumerate(other.counts):
+            self.counts[i] += bucket
+        self.count += other.count
+        self.sum += other.sum
+
+
+class ToolMetrics:
+    """Counters and latency histogram for one tool"""
+
+    __slots__ = ("name", "category", "calls", "errors", "timeouts", "cancelled", "in_flight", "latency")
+
+    def __init__(self, name: str, category: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.category = category
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.in_flight = 0
+        self.latency = Histogram(buckets)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latency = self.latency
+        quantiles = {f"p{int(q * 100)}": latency.quantile(q) for q in (0.5, 0.95, 0.99)}
+        return {
+            "category": self.category,
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "in_flight": self.in_flight,
+            "latency_seconds": {
+                "count": latency.count,
+                "sum": latency.sum,
+                "mean": latency.sum / latency.count if latency.count else None,
+                **quantiles,
+                "buckets": dict(zip([*map(str, latency.bounds), "+Inf"], latency.cumulative())),
+            },
+        }
+
+
+class MetricsRegistry:
+    """All ToolMetrics of one ToolManager, with JSON and Prometheus export"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.tools: Dict[str, ToolMetrics] = {}
+
+    def for_tool(self, name: str, category: str) -> ToolMetrics:
+        metrics = self.tools.get(name)
+        if metrics is None:
+            metrics = self.tools[name] = ToolMetrics(name, category, self.buckets)
+        metrics.category = category
+        return metrics
+
+    def instrument(self, name: str, category: str, func: Callable) -> Callable:
+        """
+        Wrap an async tool so every call is recorded. The wrapper keeps the
+        tool's signature (functools.wraps) and exposes its ToolMetrics as
+        wrapper.tool_metrics.
+        """
+        metrics = self.for_tool(name, category)
+        observe = metrics.latency.observe
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            metrics.calls += 1
+            metrics.in_flight += 1
+            start = clock()
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                metrics.cancelled += 1
+                raise
+            except BaseException as e:
+                observe(clock() - start)
+                metrics.errors += 1
+                if _is_timeout(e):
+                    metrics.timeouts += 1
+                raise
+            else:
+                observe(clock() - start)
+                outcome = classify_result(result)
+                if outcome != "ok":
+                    metrics.errors += 1
+                    if outcome == "timeout":
+                        metrics.timeouts += 1
+                return result
+            finally:
+                metrics.in_flight -= 1
+
+        wrapper.tool_metrics = metrics
+        return wrapper
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable metrics per tool and per category"""
+        categories: Dict[str, Dict[str, Any]] = {}
+        histograms: Dict[str, Histogram] = {}
+        for metrics in self.tools.values():
+            totals = categories.setdefault(metrics.category, {
+                "calls": 0, "errors": 0, "timeouts": 0, "cancelled": 0, "in_flight": 0,
+            })
+            for key in totals:
+                totals[key] += getattr(metrics, key)
+            histograms.setdefault(metrics.category, Histogram(self.buckets)).merge(metrics.latency)
+        for category, histogram in histograms.items():
+            categories[category]["latency_seconds"] = {
+                "count": histogram.count,
+                "sum": histogram.sum,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+        return {
+            "tools": {name: metrics.snapshot() for name, metrics in self.tools.items()},
+            "categories": categories,
+        }
+
+    def restore(self, snapshot: Dict[str, Any]):
+        """Load counters and histograms from a snapshot() (e.g. one saved to disk)"""
+        for name, saved in snapshot.get("tools", {}).items():
+            metrics = self.for_tool(name, saved["category"])
+            for key in ("calls", "errors", "timeouts", "cancelled"):
+                setattr(metrics, key, saved[key])
+            latency = saved["latency_seconds"]
+            cumulative = list(latency["buckets"].values())
+            if len(cumulative) != len(metrics.latency.counts):
+                continue  # saved with different bucket bounds
+            metrics.latency.counts[:] = [b - a for a, b in zip([0] + cumulative, cumulative)]
+            metrics.latency.count = latency["count"]
+            metrics.latency.sum = latency["sum"]
+
+    def to_prometheus(self, prefix: str = "weather_agent_tool") -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        def labels(metrics: ToolMetrics, **extra: str) -> str:
+            pairs = {"tool": metrics.name, "category": metrics.category, **extra}
+            return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs.items()) + "}"
+
+        for name, kind, help_text in (
+            ("calls_total", "counter", "Tool invocations"),
+            ("errors_total", "counter", "Tool invocations that raised or returned an error"),
+            ("timeouts_total", "counter", "Tool invocations that timed out"),
+            ("cancelled_total", "counter", "Tool invocations cancelled by the caller"),
+            ("in_flight", "gauge", "Tool invocations currently running"),
+        ):
+            family(name, kind, help_text)
+            attribute = name[:-len("_total")] if name.endswith("_total") else name
+            for metrics in self.tools.values():
+                lines.append(f"{prefix}_{name}{labels(metrics)} {getattr(metrics, attribute)}")
+
+        family("latency_seconds", "histogram", "Tool invocation latency")
+        for metrics in self.tools.values():
+            histogram = metrics.latency
+            bounds = [*(f"{bound:g}" for bound in histogram.bounds), "+Inf"]
+            for bound, count in zip(bounds, histogram.cumulative()):
+                lines.append(f"{prefix}_latency_seconds_bucket{labels(metrics, le=bound)} {count}")
+            lines.append(f"{prefix}_latency_seconds_sum{labels(metrics)} {histogram.sum:.6f}")
+            lines.append(f"{prefix}_latency_seconds_count{labels(metrics)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Zero counters and histograms; in-flight gauges keep counting"""
+        for metrics in self.tools.values():
+            metrics.calls = metrics.errors = metrics.timeouts = metrics.cancelled = 0
+            latency = metrics.latency
+            latency.counts[:] = [0] * len(latency.counts)
+            latency.count = 0
+            latency.sum = 0.0
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
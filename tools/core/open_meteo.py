@@ -0,0 +1,76 @@
+"""
+Open-Meteo forecast API client.
+
+Open-Meteo accepts comma-separated latitude/longitude lists, so the current
+weather for any number of places is fetched with a single request.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from tools.core.config import env_str
+from tools.core.http import get_client
+
+FORECAST_URL = env_str("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+
+REQUEST_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
+}
+
+WEATHER_DESCRIPTIONS = {
+    0: "Clear sky",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Fog",
+    48: "Depositing rime fog",
+    51: "Light drizzle",
+    53: "Moderate drizzle",
+    55: "Dense drizzle",
+    56: "Light freezing drizzle",
+    57: "Dense freezing drizzle",
+    61: "Slight rain",
+    63: "Moderate rain",
+    65: "Heavy rain",
+    71: "Slight snow fall",
+    73: "Moderate snow fall",
+    75: "Heavy snow fall",
+    95: "Thunderstorm"
+}
+
+Coordinate = Union[str, float]
+
+
+def describe_weather(weathercode: int) -> str:
+    """Human-readable description of a WMO weather code"""
+    return WEATHER_DESCRIPTIONS.get(weathercode, f"Unknown ({weathercode})")
+
+
+async def fetch_current_weather(points: Sequence[Tuple[Coordinate, Coordinate]]) -> List[Dict[str, Any]]:
+    """
+    Fetch the current_weather block for every (lat, lon) in one request.
+
+    Returns one dict per point, in input order, with the raw Celsius
+    temperature, windspeed and weathercode. HTTP errors propagate.
+    """
+    if not points:
+        return []
+
+    response = await get_client(FORECAST_URL).get(
+        FORECAST_URL,
+        params={
+            "latitude": ",".join(str(lat) for lat, _ in points),
+            "longitude": ",".join(str(lon) for _, lon in points),
+            "current_weather": "true"
+        },
+        headers=REQUEST_HEADERS
+    )
+    response.raise_for_status()
+
+    data = response.json()
+    # A single location comes back as an object, several as a list
+    if isinstance(data, dict):
+        data = [data]
+    if len(data) != len(points):
+        raise ValueError(f"Open-Meteo returned {len(data)} results for {len(points)} locations")
+    return [item["current_weather"] for item in data]
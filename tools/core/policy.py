@@ -0,0 +1,306 @@
+"""
+Execution policies for tools: an overall deadline, a concurrency limit and
+a circuit breaker.
+
+A breaker opens after `failure_threshold` consecutive failures (exceptions,
+missed deadlines or results the policy classifies as upstream failures).
+While open, calls fail fast with the last good answer for the same
+arguments (when `cache_results` is set and it is younger than
+`cache_max_age`), the policy's fallback, or an error string. After `reset_timeout` seconds one probe call is let through
+(half-open): success closes the breaker, failure opens it again.
+
+Only a good answer from a call that actually sent a request upstream
+counts as a success (see http.track_upstream). Answers served from caches
+and caller errors ("city not found") leave the breaker as it was, so they
+can neither keep a failing upstream's breaker closed nor pass a probe.
+
+Breakers are registered by name, so tools hitting the same upstream can
+share one by naming it in their policies.
+"""
+
+import asyncio
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+from tools.core.http import track_upstream
+from tools.core.metrics import classify_result
+from tools.core.results import ItemError, ToolResult
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+# Result prefixes of tools reporting that their upstream failed (HTTP errors, unreachable hosts)
+UPSTREAM_ERROR_PREFIXES = ("API Error", "Network Error")
+
+
+def upstream_failure(result: Any) -> bool:
+    """
+    Default failure test for results: timeouts and upstream API or network
+    errors, or a batch result in which every item failed that way. Other
+    errors ("city not found") are the caller's, not the upstream's.
+    """
+    if isinstance(result, str):
+        return classify_result(result) == "timeout" or result.startswith(UPSTREAM_ERROR_PREFIXES)
+    items = getattr(result, "items", None)
+    if isinstance(result, ToolResult) and isinstance(items, tuple) and items:
+        return all(isinstance(item, ItemError) and upstream_failure(item.error) for item in items)
+    return False
+
+
+@dataclass(frozen=True)
+class ExecutionPolicy:
+    """
+    How a tool is executed.
+
+    timeout: overall deadline in seconds, including time queued for a slot
+    max_concurrency: calls allowed to run at once (others wait)
+    failure_threshold: consecutive failures that open the breaker (0 = no breaker)
+    reset_timeout: seconds the breaker stays open before a probe call
+    breaker: breaker name; tools naming the same breaker share it
+    fallback: answer used on failure or while open; a string or a function
+        called with the tool's arguments (sync or async)
+    cache_results: remember the last good answer per argument set and serve
+        it while the breaker is open
+    cache_max_age: seconds a remembered answer may be served for (None = any age)
+    is_failure: decides whether a returned result counts as a failure
+    """
+    timeout: Optional[float] = None
+    max_concurrency: Optional[int] = None
+    failure_threshold: int = 0
+    reset_timeout: float = 30.0
+    breaker: Optional[str] = None
+    fallback: Union[str, Callable[..., Any], None] = None
+    cache_results: bool = False
+    cache_size: int = 256
+    cache_max_age: Optional[float] = None
+    is_failure: Callable[[Any], bool] = upstream_failure
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; in half-open state only one probe may"""
+        if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+            self.state = OPEN
+            self.opened_at = self.clock()
+
+    def release(self):
+        """A call ended without a verdict (e.g. it was cancelled)"""
+        self.probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(0.0, self.reset_timeout - (self.clock() - self.opened_at))
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in": retry_in,
+        }
+
+
+class BreakerRegistry:
+    """Named circuit breakers shared across tools"""
+
+    def __init__(self):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str, failure_threshold: int, reset_timeout: float) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        return breaker
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+
+
+circuit_breakers = BreakerRegistry()
+
+
+class PolicyState:
+    """Runtime state of one tool's policy, exposed as wrapper.execution"""
+
+    def __init__(self, name: str, policy: ExecutionPolicy, breaker: Optional[CircuitBreaker]):
+        self.name = name
+        self.policy = policy
+        self.breaker = breaker
+        self.semaphore = asyncio.Semaphore(policy.max_concurrency) if policy.max_concurrency else None
+        self.results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.running = 0
+        self.deadline_exceeded = 0
+        self.fallbacks = 0
+        self.cached_answers = 0
+
+    def remember(self, key: Hashable, result: Any):
+        self.results[key] = (time.monotonic(), result)
+        self.results.move_to_end(key)
+        while len(self.results) > self.policy.cache_size:
+            self.results.popitem(last=False)
+
+    def recall(self, key: Hashable) -> Optional[Any]:
+        """The remembered answer for key, unless it is older than cache_max_age"""
+        entry = self.results.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        max_age = self.policy.cache_max_age
+        if max_age is not None and time.monotonic() - stored_at > max_age:
+            del self.results[key]
+            return None
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        policy = self.policy
+        return {
+            "timeout": policy.timeout,
+            "max_concurrency": policy.max_concurrency,
+            "running": self.running,
+            "deadline_exceeded": self.deadline_exceeded,
+            "fallbacks": self.fallbacks,
+            "cached_answers": self.cached_answers,
+            "breaker": self.breaker.name if self.breaker else None,
+        }
+
+
+async def _fallback_answer(state: PolicyState, key: Hashable, reason: str, args, kwargs) -> Any:
+    cached = state.recall(key) if state.policy.cache_results else None
+    if cached is not None:
+        state.cached_answers += 1
+        if isinstance(cached, ToolResult):
+            return cached.annotate(f"cached answer: {reason}")
+        return f"{cached} (cached answer: {reason})"
+    fallback = state.policy.fallback
+    if fallback is None:
+        return None
+    state.fallbacks += 1
+    if isinstance(fallback, str):
+        return fallback
+    answer = fallback(*args, **kwargs)
+    if inspect.isawaitable(answer):
+        answer = await answer
+    return answer
+
+
+def apply_policy(func: Callable, policy: ExecutionPolicy) -> Callable:
+    """
+    Wrap an async tool in an execution policy. The wrapper keeps the tool's
+    signature and exposes its PolicyState as wrapper.execution.
+    """
+    # Imported here: tool_manager imports this module
+    from tools.tool_manager import normalize_argument
+
+    name = func.__name__
+    signature = inspect.signature(func)
+    breaker = None
+    if policy.failure_threshold > 0:
+        breaker = circuit_breakers.get(policy.breaker or name, policy.failure_threshold, policy.reset_timeout)
+    state = PolicyState(name, policy, breaker)
+
+    async def run(*args, **kwargs):
+        if state.semaphore is None:
+            return await func(*args, **kwargs)
+        async with state.semaphore:
+            return await func(*args, **kwargs)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = None
+        if policy.cache_results:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple((arg, normalize_argument(value)) for arg, value in bound.arguments.items())
+
+        if breaker is not None and not breaker.allow():
+            answer = await _fallback_answer(state, key, f"{name} is temporarily unavailable", args, kwargs)
+            if answer is None:
+                retry_in = breaker.stats()["retry_in"]
+                answer = f"❌ {name} is temporarily unavailable after repeated failures"
+                if retry_in:
+                    answer += f"; retry in {retry_in:.0f} s"
+            return answer
+
+        state.running += 1
+        # True: failure, False: success, None: no verdict (cancelled, cached, the caller's error)
+        failed = True
+        with track_upstream() as upstream:
+            try:
+                if policy.timeout is None:
+                    result = await run(*args, **kwargs)
+                else:
+                    result = await asyncio.wait_for(run(*args, **kwargs), policy.timeout)
+                if policy.is_failure(result):
+                    answer = await _fallback_answer(state, key, f"{name} failed", args, kwargs)
+                    return answer if answer is not None else result
+                failed = False if upstream.requests and classify_result(result) == "ok" else None
+                if failed is False and policy.cache_results:
+                    state.remember(key, result)
+                return result
+            except asyncio.TimeoutError:
+                state.deadline_exceeded += 1
+                answer = await _fallback_answer(state, key, f"{name} timed out", args, kwargs)
+                if answer is None:
+                    answer = f"Error: {name} timed out after {policy.timeout:g} seconds"
+                return answer
+            except asyncio.CancelledError:
+                failed = None
+                raise
+            except Exception:
+                answer = await _fallback_answer(state, key, f"{name} failed", args, kwargs)
+                if answer is None:
+                    raise
+                return answer
+            finally:
+                state.running -= 1
+                if breaker is not None:
+                    if failed is None:
+                        breaker.release()
+                    elif failed:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+
+    wrapper.execution = state
+    return wrapper
@@ -0,0 +1,81 @@
+"""
+Exponentially decaying request counts, for finding the hottest keys.
+
+A hit at time t adds 2 ** ((t - epoch) / half_life) to the key's score
+instead of decaying every score on every hit: all scores share the same
+scale, so ranking them needs no per-key work and a hit is O(1). The
+epoch moves forward (rescaling all scores once) before the weights could
+overflow a float.
+"""
+
+import heapq
+import time
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Rebase when a hit's weight reaches 2 ** this; far below the float limit
+_MAX_EXPONENT = 512.0
+
+
+class PopularityTracker(Generic[K, V]):
+    """
+    Decaying hit counts per key, plus the latest value recorded for it.
+
+    A key's score halves every half_life seconds without hits. At most
+    max_keys keys are kept; beyond that the least popular quarter is dropped.
+    """
+
+    def __init__(self, half_life: float = 3600.0, max_keys: int = 4096,
+                 clock: Callable[[], float] = time.monotonic):
+        if half_life <= 0 or max_keys < 1:
+            raise ValueError("half_life must be positive and max_keys at least 1")
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self.clock = clock
+        self._epoch = clock()
+        self._scores: Dict[K, float] = {}
+        self._values: Dict[K, V] = {}
+        self.hits = 0
+
+    def _weight(self, now: float) -> float:
+        exponent = (now - self._epoch) / self.half_life
+        if exponent > _MAX_EXPONENT:
+            self._rebase(now)
+            exponent = 0.0
+        return 2.0 ** exponent
+
+    def _rebase(self, now: float):
+        scale = 2.0 ** (-(now - self._epoch) / self.half_life)
+        self._scores = {key: score * scale for key, score in self._scores.items()}
+        self._epoch = now
+
+    def record(self, key: K, value: V):
+        """Count one hit for key and remember value with it"""
+        self.hits += 1
+        self._scores[key] = self._scores.get(key, 0.0) + self._weight(self.clock())
+        self._values[key] = value
+        if len(self._scores) > self.max_keys:
+            self._prune()
+
+    def _prune(self):
+        keep = heapq.nlargest(self.max_keys * 3 // 4, self._scores.items(), key=lambda item: item[1])
+        self._scores = dict(keep)
+        self._values = {key: self._values[key] for key in self._scores}
+
+    def score(self, key: K) -> float:
+        """Decayed hit count of key right now (0 if unknown)"""
+        return self._scores.get(key, 0.0) / self._weight(self.clock())
+
+    def top(self, n: int, min_score: float = 0.0) -> List[Tuple[K, V, float]]:
+        """Up to n (key, value, decayed score) tuples, most popular first"""
+        scale = 1.0 / self._weight(self.clock())
+        best = heapq.nlargest(n, self._scores.items(), key=lambda item: item[1])
+        return [(key, self._values[key], score * scale) for key, score in best if score * scale >= min_score]
+
+    def value(self, key: K) -> Optional[V]:
+        return self._values.get(key)
+
+    def __len__(self) -> int:
+        return len(self._scores)
@@ -0,0 +1,137 @@
+"""
+Background refresh of the most requested weather cells.
+
+Every few seconds the prefetcher takes the top-N cells by decayed request
+count (see tools/core/popularity.py) and refreshes those whose cached
+observation goes stale within the lead window, or has been evicted, so
+the next request for a popular place is a plain cache hit.
+
+Refreshes are spread out rather than fired together:
+
+- each cell becomes due at a random point of the lead window (jitter),
+  so cells fetched in the same batch do not all expire together again;
+- due cells are fetched in batches of up to PREFETCH_BATCH points per
+  Open-Meteo request, and the batches are paced by a token bucket of
+  PREFETCH_RATE requests per second, well below the upstream's limits;
+- after a failed batch the prefetcher backs off exponentially instead of
+  retrying into an outage.
+
+Only cells asked for at least PREFETCH_MIN_SCORE times (decayed) qualify,
+so one-off places are never refreshed for nobody.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.core.config import env_bool, env_float, env_int
+from tools.core.rate_limit import TokenBucket
+from tools.core.weather_cache import CellKey, WeatherCache, current_weather_cache
+
+logger = logging.getLogger("weather_agent.prefetch")
+
+# Longest pause after repeated failures
+MAX_BACKOFF = 300.0
+
+
+class Prefetcher:
+    """Keeps the cache's hottest cells fresh; start() and aclose() bracket its task"""
+
+    def __init__(self, cache: WeatherCache, top_n: int = 50, lead: float = 120.0, jitter: float = 0.5,
+                 interval: float = 10.0, rate: float = 0.5, batch_size: int = 10, min_score: float = 2.0,
+                 enabled: bool = True, seed: Optional[int] = None):
+        if cache.popularity is None:
+            raise ValueError("the cache does not track popularity")
+        self.cache = cache
+        self.top_n = top_n
+        self.lead = min(lead, cache.ttl)
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.min_score = min_score
+        self.enabled = enabled and top_n > 0
+        self.bucket = TokenBucket(rate, burst=1)
+        self.random = random.Random(seed)
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self._counters = {"rounds": 0, "batches": 0, "cells": 0, "errors": 0}
+
+    def due(self) -> List[Tuple[CellKey, Tuple[float, float]]]:
+        """Hot cells to refresh now, most popular first"""
+        due = []
+        for key, point, _ in self.cache.popularity.top(self.top_n, self.min_score):
+            if self.cache.is_refreshing(key):
+                continue
+            remaining = self.cache.expires_in(key)
+            # Drawn anew each round, so a cell's refresh lands anywhere in the last part of the lead window
+            window = self.lead * (1.0 - self.jitter * self.random.random())
+            if remaining is None or remaining <= window:
+                due.append((key, point))
+        return due
+
+    async def run_once(self) -> int:
+        """Refresh every due cell; returns how many were refreshed"""
+        self._counters["rounds"] += 1
+        due = self.due()
+        refreshed = 0
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            await self.bucket.acquire()
+            try:
+                await self.cache.prefetch(batch)
+            except Exception as e:
+                self._counters["errors"] += 1
+                self._failures += 1
+                logger.info("prefetch of %d cells failed: %s", len(batch), e)
+                break
+            self._failures = 0
+            refreshed += len(batch)
+            self._counters["batches"] += 1
+        self._counters["cells"] += refreshed
+        return refreshed
+
+    async def run(self):
+        while True:
+            backoff = min(MAX_BACKOFF, self.interval * 2 ** self._failures) if self._failures else self.interval
+            # Jittered so several processes sharing an upstream do not tick in step
+            await asyncio.sleep(backoff * self.random.uniform(0.75, 1.25))
+            try:
+                await self.run_once()
+            except Exception as e:  # Never let the background task die
+                logger.warning("prefetch round failed: %s", e)
+
+    def start(self):
+        """Start the background task (no-op when disabled or already running)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._counters)
+        stats["enabled"] = self.enabled
+        stats["running"] = self._task is not None
+        stats["tracked"] = len(self.cache.popularity)
+        stats["rate_limited_waits"] = self.bucket.waits
+        return stats
+
+
+prefetcher = Prefetcher(
+    current_weather_cache,
+    top_n=env_int("PREFETCH_TOP_N", 50),
+    lead=env_float("PREFETCH_LEAD", 120.0),
+    jitter=env_float("PREFETCH_JITTER", 0.5),
+    interval=env_float("PREFETCH_INTERVAL", 10.0),
+    rate=env_float("PREFETCH_RATE", 0.5),
+    batch_size=env_int("PREFETCH_BATCH", 10),
+    min_score=env_float("PREFETCH_MIN_SCORE", 2.0),
+    enabled=env_bool("PREFETCH", True),
+)
@@ -0,0 +1,101 @@
+"""
+Process-wide, per-host token-bucket rate limiting for outgoing requests.
+
+The shared HTTP clients consult the limiter before every request, so a
+caller only waits when the host's budget is actually exhausted.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from tools.core.config import env_float, env_int
+
+# host -> (requests per second, burst size)
+HOST_RATES: Dict[str, Tuple[float, int]] = {
+    # Nominatim's usage policy: an absolute maximum of one request per second
+    "nominatim.openstreetmap.org": (
+        env_float("NOMINATIM_RATE", 1.0),
+        env_int("NOMINATIM_BURST", 1),
+    ),
+}
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of polling.
+
+    Each acquire() takes a token immediately; if that drives the balance
+    negative the caller sleeps until its token would have been refilled.
+    Waiters are therefore served in arrival order without a lock held
+    across the sleep.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self):
+        """
+        Wait until a token is available and consume it. A caller cancelled
+        while waiting keeps its slot: handing it back would let the next
+        caller share a later waiter's slot and exceed the rate.
+        """
+        delay = self._reserve()
+        if delay <= 0:
+            return
+        self.waits += 1
+        self.waited_seconds += delay
+        await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """Keeps one TokenBucket per configured host; other hosts are unlimited"""
+
+    def __init__(self, host_rates: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def configure(self, host: str, rate: float, burst: int = 1):
+        """Set or replace the budget for a host"""
+        self.host_rates[host] = (rate, burst)
+        self._buckets.pop(host, None)
+
+    def bucket(self, host: str) -> Optional[TokenBucket]:
+        bucket = self._buckets.get(host)
+        if bucket is None and host in self.host_rates:
+            rate, burst = self.host_rates[host]
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+    async def acquire(self, host: str):
+        """Wait for the host's budget; returns immediately for unlimited hosts"""
+        bucket = self.bucket(host)
+        if bucket is not None:
+            await bucket.acquire()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-host wait counters"""
+        return {
+            host: {"waits": bucket.waits, "waited_seconds": round(bucket.waited_seconds, 3)}
+            for host, bucket in self._buckets.items()
+        }
+
+
+rate_limiter = RateLimiter()
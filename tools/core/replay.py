@@ -0,0 +1,195 @@
+"""
+Record and replay the tools' upstream HTTP traffic.
+
+With WEATHER_AGENT_HTTP_RECORD=<file> every request the shared clients
+send is passed through and the exchange is stored in a SQLite "tape"; with
+WEATHER_AGENT_HTTP_REPLAY=<file> requests are answered from the tape and
+nothing touches the network (rate limits are skipped too). Exchanges are
+matched on the normalized method, URL and query parameters; several
+recordings of the same request (e.g. random facts) are replayed in turn.
+Replay waits for the recorded latency by default;
+WEATHER_AGENT_HTTP_REPLAY_LATENCY=zero (or a factor such as 0.5) changes that.
+
+A request missing from the tape fails with httpx.ConnectError, as it would
+without a network.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from tools.core.config import env_str
+
+# Headers describing the wire encoding of the original body, not the stored one
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+# Recordings kept per request key; later ones are passed through unrecorded
+MAX_RECORDINGS_PER_KEY = 16
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_request(method: str, url: httpx.URL) -> str:
+    """Canonical form: upper-case method, lower-case host, no default port, sorted query parameters"""
+    port = url.port if url.port not in (None, _DEFAULT_PORTS.get(url.scheme)) else None
+    host = url.host.lower() + (f":{port}" if port else "")
+    query = urlencode(sorted(parse_qsl(url.query.decode(), keep_blank_values=True)))
+    return f"{method.upper()} {url.scheme}://{host}{url.path}" + (f"?{query}" if query else "")
+
+
+def request_key(method: str, url: httpx.URL) -> str:
+    return hashlib.sha256(normalize_request(method, url).encode()).hexdigest()
+
+
+def parse_latency(value: str) -> float:
+    """"original" -> 1.0, "zero" -> 0.0, otherwise a scale factor"""
+    value = value.strip().lower()
+    if value == "original":
+        return 1.0
+    if value == "zero":
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        print(f"Warning: Invalid replay latency {value!r}; using the recorded latency")
+        return 1.0
+
+
+class HttpTape:
+    """Request/response pairs in one SQLite file, indexed by request key"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS exchanges ("
+            "id INTEGER PRIMARY KEY, key TEXT NOT NULL, request TEXT NOT NULL, "
+            "status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, "
+            "elapsed REAL NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS exchanges_key ON exchanges (key)")
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._ids: Dict[str, List[int]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._counters = {"recorded": 0, "replayed": 0, "missing": 0}
+
+    def record(self, method: str, url: httpx.URL, status: int, headers: List[Tuple[str, str]],
+               body: bytes, elapsed: float) -> bool:
+        key = request_key(method, url)
+        with self._lock:
+            count = self._db.execute("SELECT COUNT(*) FROM exchanges WHERE key = ?", (key,)).fetchone()[0]
+            if count >= MAX_RECORDINGS_PER_KEY:
+                return False
+            kept = [(name, value) for name, value in headers if name.lower() not in _DROPPED_HEADERS]
+            self._db.execute(
+                "INSERT INTO exchanges (key, request, status, headers, body, elapsed, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, normalize_request(method, url), status, json.dumps(kept), zlib.compress(body),
+                 elapsed, time.time()),
+            )
+            self._db.commit()
+            self._ids.pop(key, None)
+            self._counters["recorded"] += 1
+            return True
+
+    def lookup(self, method: str, url: httpx.URL) -> Optional[Tuple[int, List[Tuple[str, str]], bytes, float]]:
+        """The next recording of this request (cycling), or None"""
+        key = request_key(method, url)
+        with self._lock:
+            ids = self._ids.get(key)
+            if ids is None:
+                ids = self._ids[key] = [row[0] for row in self._db.execute(
+                    "SELECT id FROM exchanges WHERE key = ? ORDER BY id", (key,))]
+            if not ids:
+                self._counters["missing"] += 1
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            status, headers, body, elapsed = self._db.execute(
+                "SELECT status, headers, body, elapsed FROM exchanges WHERE id = ?", (ids[cursor % len(ids)],)
+            ).fetchone()
+            self._counters["replayed"] += 1
+        return status, [tuple(pair) for pair in json.loads(headers)], zlib.decompress(body), elapsed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["exchanges"] = self._db.execute("SELECT COUNT(*) FROM exchanges").fetchone()[0]
+            return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to the real transport and stores each exchange on the tape"""
+
+    def __init__(self, tape: HttpTape, transport: httpx.AsyncBaseTransport):
+        self.tape = tape
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        response = await self.transport.handle_async_request(request)
+        try:
+            # The body is decoded here, so the stored copy needs no content-encoding
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - started
+        self.tape.record(request.method, request.url, response.status_code,
+                         response.headers.multi_items(), body, elapsed)
+        headers = [(name, value) for name, value in response.headers.multi_items()
+                   if name.lower() not in _DROPPED_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request,
+                              extensions={"http_version": response.extensions.get("http_version", b"HTTP/1.1")})
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answers requests from the tape; latency scales the recorded response times"""
+
+    def __init__(self, tape: HttpTape, latency: float = 1.0):
+        self.tape = tape
+        self.latency = latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        recording = self.tape.lookup(request.method, request.url)
+        if recording is None:
+            raise httpx.ConnectError(f"No recorded response for {request.method} {request.url}", request=request)
+        status, headers, body, elapsed = recording
+        if self.latency and elapsed:
+            await asyncio.sleep(elapsed * self.latency)
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+
+def tape_from_env() -> Tuple[Optional[str], Optional[HttpTape]]:
+    """("record" or "replay", tape) from WEATHER_AGENT_HTTP_RECORD/HTTP_REPLAY, or (None, None)"""
+    replay = env_str("HTTP_REPLAY", "")
+    record = env_str("HTTP_RECORD", "")
+    if replay and record:
+        print("Warning: Both HTTP_RECORD and HTTP_REPLAY are set; replaying")
+    path, mode = (replay, "replay") if replay else (record, "record") if record else ("", None)
+    if mode is None:
+        return None, None
+    if mode == "replay" and not Path(path).exists():
+        print(f"Warning: HTTP replay file {path} does not exist; every upstream request will fail")
+    try:
+        return mode, HttpTape(Path(path))
+    except sqlite3.Error as e:
+        print(f"Warning: Could not open HTTP tape {path}: {e}")
+        return None, None
@@ -0,0 +1,317 @@
+"""
+Structured tool results.
+
+Tools return small slotted dataclasses instead of formatted prose. The
+model is sent to_json(): minimal JSON with short keys, no decoration and
+nothing it already sent as arguments (the city asked for, the
+expression), since every token of it is prefilled on the next turn. People see render(),
+the text the tools used to return (str() gives the same), at the console
+and on the router's fast path. Errors stay plain "Error: ..." strings.
+
+Tabular results (forecasts, multi-city weather, website sweeps) use a
+"columns" header plus one array per row rather than repeating keys.
+"""
+
+import json
+import math
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional, Tuple
+
+
+def _number(value: float, digits: int = 1) -> Any:
+    """Rounded, and an int when it is whole (12.0 -> 12); None for NaN and infinities, which JSON cannot carry"""
+    value = float(value)
+    if not math.isfinite(value):
+        return None
+    value = round(value, digits)
+    return int(value) if value.is_integer() else value
+
+
+class ToolResult:
+    """Base class: to_data() is what the model gets (as JSON), render() what people read"""
+    __slots__ = ()
+
+    def to_data(self) -> Any:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        raise NotImplementedError
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_data(), ensure_ascii=False, separators=(",", ":"))
+
+    def annotate(self, note: str) -> "ToolResult":
+        """The same result with a note attached, e.g. that it was served from cache"""
+        return AnnotatedResult(self, note)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def __reduce__(self):
+        # Frozen and slotted, so the default pickling (setattr per slot) fails;
+        # results of tools running in a process pool travel back this way
+        return type(self), tuple(getattr(self, field.name) for field in fields(self))
+
+
+@dataclass(frozen=True)
+class AnnotatedResult(ToolResult):
+    __slots__ = ("result", "note")
+    result: ToolResult
+    note: str
+
+    def to_data(self):
+        data = self.result.to_data()
+        return {**data, "note": self.note} if isinstance(data, dict) else {"result": data, "note": self.note}
+
+    def render(self):
+        return f"{self.result.render()} ({self.note})"
+
+
+@dataclass(frozen=True)
+class Banner(ToolResult):
+    """Static information: a compact summary for the model, a prebuilt banner for people"""
+    __slots__ = ("data", "text")
+    data: Dict[str, Any]
+    text: str
+
+    def to_data(self):
+        return self.data
+
+    def render(self):
+        return self.text
+
+
+@dataclass(frozen=True)
+class WeatherResult(ToolResult):
+    __slots__ = ("city", "place", "temperature", "unit", "conditions", "wind_kmh")
+    city: str
+    place: str
+    temperature: float
+    unit: str  # "C" or "F"
+    conditions: str
+    wind_kmh: float
+
+    def row(self) -> list:
+        return [self.city, self.place, _number(self.temperature), self.conditions, _number(self.wind_kmh)]
+
+    def to_data(self):
+        return {"place": self.place, f"temp_{self.unit.lower()}": _number(self.temperature),
+                "conditions": self.conditions, "wind_kmh": _number(self.wind_kmh)}
+
+    def render(self):
+        return (f"The weather in {self.city} ({self.place}) is {self.temperature}°{self.unit}, "
+                f"{self.conditions}. Wind speed: {self.wind_kmh} km/h.")
+
+
+@dataclass(frozen=True)
+class ItemError(ToolResult):
+    """One failed item of a batch (a city, a timezone, a website)"""
+    __slots__ = ("item", "error")
+    item: str
+    error: str
+
+    def to_data(self):
+        return {"item": self.item, "error": self.error}
+
+    def render(self):
+        return f"{self.item}: {self.error}"
+
+
+@dataclass(frozen=True)
+class WeatherManyResult(ToolResult):
+    __slots__ = ("unit", "items")
+    unit: str
+    items: Tuple[ToolResult, ...]  # WeatherResult or ItemError, in input order
+
+    def to_data(self):
+        rows = [item.row() if isinstance(item, WeatherResult) else [item.item, None, None, item.error, None]
+                for item in self.items]
+        return {"columns": ["city", "place", f"temp_{self.unit.lower()}", "conditions", "wind_kmh"], "rows": rows}
+
+    def render(self):
+        return "\n".join(item.render() for item in self.items)
+
+
+@dataclass(frozen=True)
+class ForecastResult(ToolResult):
+    """Daily forecast rows: (date, low, high, mean, rain_mm, rain_from_hour, rain_pct, conditions)"""
+    __slots__ = ("city", "place", "unit", "days")
+    city: str
+    place: str
+    unit: str
+    days: Tuple[Tuple[Any, ...], ...]
+
+    def to_data(self):
+        rows = [[day.isoformat(), _number(low, 0), _number(high, 0), _number(mean, 0),
+                 _number(rain, 1) if rain_from is not None else 0, rain_from,
+                 _number(pct, 0) if pct is not None else None, conditions]
+                for day, low, high, mean, rain, rain_from, pct, conditions in self.days]
+        return {"place": self.place, "unit": self.unit,
+                "columns": ["date", "low", "high", "avg", "rain_mm", "rain_from_h", "rain_pct", "conditions"],
+                "rows": rows}
+
+    def render(self):
+        unit = f"°{self.unit}"
+        lines = [f"Forecast for {self.city} ({self.place}), {len(self.days)} days, {unit}:"]
+        for day, low, high, mean, rain, rain_from, pct, conditions in self.days:
+            line = f"{day:%a %d %b}: {low:.0f}-{high:.0f} (avg {mean:.0f})"
+            if rain_from is not None:
+                line += f", rain {rain:.1f} mm from {rain_from:02d}:00"
+            if pct is not None:
+                line += f" ({pct:.0f}%)"
+            if conditions:
+                line += f", {conditions}"
+            lines.append(line)
+        if self.days:
+            warmest = max(self.days, key=lambda row: row[2])
+            rainy = sum(1 for row in self.days if row[5] is not None)
+            lines.append(f"Warmest {warmest[0]:%a} {warmest[2]:.0f}{unit}; "
+                         f"rain on {rainy} of {len(self.days)} days, "
+                         f"{sum(row[4] for row in self.days):.1f} mm total")
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class TimeResult(ToolResult):
+    __slots__ = ("zone", "time")
+    zone: str
+    time: str
+
+    def to_data(self):
+        return {self.zone: self.time}
+
+    def render(self):
+        return f"Current time in {self.zone}: {self.time}"
+
+
+@dataclass(frozen=True)
+class TimesResult(ToolResult):
+    """Several zones at one instant; a time of None marks an unknown zone"""
+    __slots__ = ("times",)
+    times: Tuple[Tuple[str, Optional[str]], ...]
+
+    def to_data(self):
+        return {name: time if time is not None else "unknown timezone" for name, time in self.times}
+
+    def render(self):
+        return "\n".join(f"{name}: {time}" if time is not None else f"{name}: Error: Unknown timezone '{name}'"
+                         for name, time in self.times)
+
+
+@dataclass(frozen=True)
+class ConversionResult(ToolResult):
+    """Local times converted into target zones; None marks an unknown target"""
+    __slots__ = ("from_zone", "conversions")
+    from_zone: str
+    conversions: Tuple[Tuple[str, Tuple[Tuple[str, Optional[str]], ...]], ...]  # (time, ((zone, time), ...))
+
+    def to_data(self):
+        if len(self.conversions) == 1 and len(self.conversions[0][1]) == 1:
+            time, ((zone, converted),) = self.conversions[0]
+            return {f"{time} {self.from_zone}": converted or "unknown timezone"}
+        return {self.from_zone: {time: {zone: converted or "unknown timezone" for zone, converted in targets}
+                                 for time, targets in self.conversions}}
+
+    def render(self):
+        if len(self.conversions) == 1 and len(self.conversions[0][1]) == 1:
+            time, ((_, converted),) = self.conversions[0]
+            return f"Time conversion: {time} {self.from_zone} → {converted}"
+        return "\n".join(
+            f"{time} {self.from_zone} → " + "; ".join(
+                f"{zone} {converted}" if converted is not None else f"{zone} (unknown timezone)"
+                for zone, converted in targets)
+            for time, targets in self.conversions)
+
+
+@dataclass(frozen=True)
+class CalculationResult(ToolResult):
+    __slots__ = ("expression", "value")
+    expression: str
+    value: Any
+
+    def to_data(self):
+        return {"result": self.value}
+
+    def render(self):
+        return f"Calculation: {self.expression} = {self.value}"
+
+
+@dataclass(frozen=True)
+class FactResult(ToolResult):
+    __slots__ = ("text",)
+    text: str
+
+    def to_data(self):
+        return {"fact": self.text}
+
+    def render(self):
+        return f"🧠 Random Fact: {self.text}"
+
+
+@dataclass(frozen=True)
+class WebsiteResult(ToolResult):
+    __slots__ = ("url", "status_code", "content_type", "server")
+    url: str
+    status_code: int
+    content_type: str
+    server: str
+
+    def to_data(self):
+        return {"url": self.url, "reachable": True, "status": self.status_code,
+                "content_type": self.content_type, "server": self.server}
+
+    def render(self):
+        return (f"✅ Website is accessible\n🌐 URL: {self.url}\n📊 Status Code: {self.status_code}\n"
+                f"📄 Content Type: {self.content_type}\n🖥️ Server: {self.server}")
+
+
+@dataclass(frozen=True)
+class WebsitesResult(ToolResult):
+    """Website checks in completion order: (url, status code or None, method, error, {phase: ms})"""
+    __slots__ = ("checks",)
+    checks: Tuple[Tuple[str, Optional[int], str, Optional[str], Dict[str, float]], ...]
+
+    def to_data(self):
+        return {"reachable": sum(1 for check in self.checks if check[3] is None), "total": len(self.checks),
+                "columns": ["url", "status", "error", "total_ms"],
+                "rows": [[url, status, error,
+                          _number(timings["total"], 0) if timings.get("total") is not None else None]
+                         for url, status, _, error, timings in self.checks]}
+
+    def render(self):
+        lines = []
+        for url, status, method, error, timings in self.checks:
+            phases = ", ".join(f"{phase} {ms:g} ms" for phase, ms in timings.items())
+            phases = f" ({phases})" if phases else ""
+            lines.append(f"❌ {url} - {error}{phases}" if error else f"✅ {url} - {status} via {method}{phases}")
+        reachable = sum(1 for check in self.checks if check[3] is None)
+        return f"🌐 {reachable}/{len(lines)} websites accessible\n" + "\n".join(lines)
+
+
+def serialize(value: Any, compact: bool = True) -> str:
+    """What the model is sent for a tool's return value"""
+    if isinstance(value, ToolResult):
+        return value.to_json() if compact else value.render()
+    return str(value)
+
+
+class Renderings:
+    """
+    Human renderings of recent results, keyed by the JSON the model was
+    sent, so the console can show text for a result it only sees as JSON.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+
+    def remember(self, payload: str, result: ToolResult):
+        self._texts[payload] = result.render()
+        self._texts.move_to_end(payload)
+        while len(self._texts) > self.size:
+            self._texts.popitem(last=False)
+
+    def lookup(self, payload: str) -> Optional[str]:
+        return self._texts.get(payload)
+
@@ -0,0 +1,244 @@
+"""
+Resource-bounded arithmetic evaluator used by the calculate tool.
+
+Expressions are parsed with the ast module and compiled once into a small
+postfix program (cached per normalized expression). Running the program
+enforces limits on exponent size, integer bit length, operation count and
+wall time, so input like 9**9**9 is rejected instead of pinning a CPU core
+inside the event loop.
+
+The same program runs over NumPy arrays in evaluate_batch(), evaluating one
+expression for many variable bindings at once.
+"""
+
+import ast
+import io
+import operator
+import time
+import tokenize
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+Number = Union[int, float]
+
+
+class EvaluationError(ValueError):
+    """The expression is invalid or exceeds an evaluation limit"""
+
+
+@dataclass(frozen=True)
+class ExpressionLimits:
+    max_length: int = 256
+    max_operations: int = 200
+    max_exponent: int = 10_000
+    max_int_bits: int = 10_000
+    max_seconds: float = 0.05
+
+
+DEFAULT_LIMITS = ExpressionLimits()
+
+_BINARY_OPS: Dict[type, Tuple[str, Callable[[Any, Any], Any]]] = {
+    ast.Add: ("+", operator.add),
+    ast.Sub: ("-", operator.sub),
+    ast.Mult: ("*", operator.mul),
+    ast.Div: ("/", operator.truediv),
+    ast.FloorDiv: ("//", operator.floordiv),
+    ast.Mod: ("%", operator.mod),
+    ast.Pow: ("**", operator.pow),
+}
+
+_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+# Postfix instructions
+_CONST, _VAR, _UNARY, _BINARY = range(4)
+
+
+# Dropped from the cache key; NEWLINE is kept so a line break still ends the expression
+_LAYOUT_TOKENS = {tokenize.NL, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER}
+
+
+def normalize_expression(expression: str) -> str:
+    """
+    Cache key form: the expression's tokens joined by single spaces, so
+    "2*3" and "2 * 3" share a plan while token boundaries survive ("2 * * 3"
+    stays invalid rather than becoming 2**3, "2 3" rather than 23).
+    """
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(expression.strip()).readline)
+        return " ".join(token.string for token in tokens if token.type not in _LAYOUT_TOKENS).strip()
+    except (tokenize.TokenError, SyntaxError):
+        raise EvaluationError("Invalid expression")
+
+
+class CompiledExpression:
+    """A validated expression as a postfix program over a value stack"""
+
+    __slots__ = ("source", "program", "variables")
+
+    def __init__(self, source: str, program: Tuple[tuple, ...], variables: Tuple[str, ...]):
+        self.source = source
+        self.program = program
+        self.variables = variables
+
+    def evaluate(self, variables: Optional[Mapping[str, Number]] = None,
+                 limits: ExpressionLimits = DEFAULT_LIMITS) -> Number:
+        """Run the program on Python numbers, enforcing every limit"""
+        values = self._bind(variables)
+        deadline = time.perf_counter() + limits.max_seconds
+        stack = []
+        for op, arg in self.program:
+            if op == _CONST:
+                stack.append(arg)
+            elif op == _VAR:
+                stack.append(values[arg])
+            elif op == _UNARY:
+                stack.append(arg(stack.pop()))
+            else:
+                right = stack.pop()
+                left = stack.pop()
+                symbol, func = arg
+                _check_operands(symbol, left, right, limits)
+                try:
+                    stack.append(func(left, right))
+                except OverflowError:
+                    raise EvaluationError("Result is too large")
+                if time.perf_counter() > deadline:
+                    raise EvaluationError(f"Evaluation took longer than {limits.max_seconds:g} s")
+        return stack[0]
+
+    def evaluate_batch(self, bindings: Mapping[str, Sequence[Number]],
+                       limits: ExpressionLimits = DEFAULT_LIMITS):
+        """
+        Run the program once over NumPy arrays of variable values.
+
+        Every binding must have the same length (scalars broadcast). Returns a
+        float64 array; division by zero yields inf/nan instead of raising.
+        """
+        import numpy as np
+
+        values = {name: np.asarray(value, dtype=np.float64) for name, value in self._bind(bindings).items()}
+        stack = []
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            for op, arg in self.program:
+                if op == _CONST:
+                    stack.append(np.float64(arg))
+                elif op == _VAR:
+                    stack.append(values[arg])
+                elif op == _UNARY:
+                    stack.append(arg(stack.pop()))
+                else:
+                    right = stack.pop()
+                    left = stack.pop()
+                    symbol, func = arg
+                    if symbol == "**" and np.any(np.abs(right) > limits.max_exponent):
+                        raise EvaluationError(f"Exponent too large (limit {limits.max_exponent})")
+                    stack.append(func(left, right))
+        shape = np.broadcast_shapes(*(value.shape for value in values.values()))
+        return np.broadcast_to(stack[0], shape).astype(np.float64)
+
+    def _bind(self, variables: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        variables = variables or {}
+        missing = [name for name in self.variables if name not in variables]
+        if missing:
+            raise EvaluationError(f"Missing value for {', '.join(missing)}")
+        return {name: variables[name] for name in self.variables}
+
+
+def _check_operands(symbol: str, left: Number, right: Number, limits: ExpressionLimits):
+    """Reject integer operations whose result would exceed the size limits"""
+    if not (isinstance(left, int) and isinstance(right, int)):
+        return
+    if symbol == "**":
+        if right > limits.max_exponent:
+            raise EvaluationError(f"Exponent too large (limit {limits.max_exponent})")
+        if right > 0 and abs(left) > 1 and right * abs(left).bit_length() > limits.max_int_bits:
+            raise EvaluationError(f"Result would exceed {limits.max_int_bits} bits")
+    elif symbol == "*":
+        if abs(left).bit_length() + abs(right).bit_length() > limits.max_int_bits:
+            raise EvaluationError(f"Result would exceed {limits.max_int_bits} bits")
+
+
+class _Compiler(ast.NodeVisitor):
+    def __init__(self, limits: ExpressionLimits):
+        self.limits = limits
+        self.program = []
+        self.variables = []
+        self.operations = 0
+
+    def compile(self, node: ast.AST):
+        self.visit(node)
+        return tuple(self.program), tuple(self.variables)
+
+    def _count(self):
+        self.operations += 1
+        if self.operations > self.limits.max_operations:
+            raise EvaluationError(f"Expression has more than {self.limits.max_operations} operations")
+
+    def visit_Expression(self, node: ast.Expression):
+        self.visit(node.body)
+
+    def visit_Constant(self, node: ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise EvaluationError(f"Unsupported constant {value!r}")
+        if isinstance(value, int) and value.bit_length() > self.limits.max_int_bits:
+            raise EvaluationError(f"Number exceeds {self.limits.max_int_bits} bits")
+        self.program.append((_CONST, value))
+
+    def visit_Name(self, node: ast.Name):
+        if node.id not in self.variables:
+            self.variables.append(node.id)
+        self.program.append((_VAR, node.id))
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        func = _UNARY_OPS.get(type(node.op))
+        if func is None:
+            raise EvaluationError(f"Unsupported operator {type(node.op).__name__}")
+        self._count()
+        self.visit(node.operand)
+        self.program.append((_UNARY, func))
+
+    def visit_BinOp(self, node: ast.BinOp):
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise EvaluationError(f"Unsupported operator {type(node.op).__name__}")
+        self._count()
+        self.visit(node.left)
+        self.visit(node.right)
+        self.program.append((_BINARY, op))
+
+    def generic_visit(self, node: ast.AST):
+        raise EvaluationError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=512)
+def _compile_normalized(normalized: str, limits: ExpressionLimits) -> CompiledExpression:
+    try:
+        tree = ast.parse(normalized, mode="eval")
+    except SyntaxError:
+        raise EvaluationError("Invalid expression")
+    program, variables = _Compiler(limits).compile(tree)
+    return CompiledExpression(normalized, program, variables)
+
+
+def compile_expression(expression: str, limits: ExpressionLimits = DEFAULT_LIMITS) -> CompiledExpression:
+    """Validate and compile an expression, reusing the cached plan when possible"""
+    if len(expression) > limits.max_length:
+        raise EvaluationError(f"Expression longer than {limits.max_length} characters")
+    return _compile_normalized(normalize_expression(expression), limits)
+
+
+def evaluate(expression: str, variables: Optional[Mapping[str, Number]] = None,
+             limits: ExpressionLimits = DEFAULT_LIMITS) -> Number:
+    """Compile (cached) and evaluate an expression"""
+    return compile_expression(expression, limits).evaluate(variables, limits)
+
+
+def evaluate_batch(expression: str, bindings: Mapping[str, Sequence[Number]],
+                   limits: ExpressionLimits = DEFAULT_LIMITS):
+    """Evaluate one expression over many variable bindings with NumPy"""
+    return compile_expression(expression, limits).evaluate_batch(bindings, limits)
@@ -0,0 +1,221 @@
+"""
+Timezone name resolution shared by the time tools.
+
+The index is built once at import time and maps IANA names, common
+abbreviations, country names and city names to IANA zones through a
+case-insensitive dictionary, so every lookup is a single dict hit.
+Constructed tzinfo objects are cached as well.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pytz
+
+ABBREVIATIONS = {
+    'UTC': 'UTC',
+    'GMT': 'GMT',
+    'EST': 'US/Eastern',
+    'EDT': 'US/Eastern',
+    'CST': 'US/Central',
+    'CDT': 'US/Central',
+    'MST': 'US/Mountain',
+    'MDT': 'US/Mountain',
+    'PST': 'US/Pacific',
+    'PDT': 'US/Pacific',
+    'BST': 'Europe/London',
+    'CET': 'Europe/Paris',
+    'CEST': 'Europe/Paris',
+    'EET': 'Europe/Athens',
+    'MSK': 'Europe/Moscow',
+    'IST': 'Asia/Kolkata',
+    'PKT': 'Asia/Karachi',
+    'BDT': 'Asia/Dhaka',
+    'SGT': 'Asia/Singapore',
+    'HKT': 'Asia/Hong_Kong',
+    'JST': 'Asia/Tokyo',
+    'KST': 'Asia/Seoul',
+    'AEST': 'Australia/Sydney',
+    'AEDT': 'Australia/Sydney',
+    'NZST': 'Pacific/Auckland',
+    'EASTERN': 'US/Eastern',
+    'CENTRAL': 'US/Central',
+    'MOUNTAIN': 'US/Mountain',
+    'PACIFIC': 'US/Pacific',
+}
+
+# Major cities that are not themselves IANA zone names
+CITY_ZONES = {
+    'delhi': 'Asia/Kolkata',
+    'new delhi': 'Asia/Kolkata',
+    'mumbai': 'Asia/Kolkata',
+    'bangalore': 'Asia/Kolkata',
+    'bengaluru': 'Asia/Kolkata',
+    'chennai': 'Asia/Kolkata',
+    'beijing': 'Asia/Shanghai',
+    'shenzhen': 'Asia/Shanghai',
+    'chittagong': 'Asia/Dhaka',
+    'osaka': 'Asia/Tokyo',
+    'washington': 'America/New_York',
+    'washington dc': 'America/New_York',
+    'boston': 'America/New_York',
+    'miami': 'America/New_York',
+    'atlanta': 'America/New_York',
+    'san francisco': 'America/Los_Angeles',
+    'seattle': 'America/Los_Angeles',
+    'las vegas': 'America/Los_Angeles',
+    'dallas': 'America/Chicago',
+    'houston': 'America/Chicago',
+    'austin': 'America/Chicago',
+    'munich': 'Europe/Berlin',
+    'frankfurt': 'Europe/Berlin',
+    'barcelona': 'Europe/Madrid',
+    'milan': 'Europe/Rome',
+    'geneva': 'Europe/Zurich',
+    'st petersburg': 'Europe/Moscow',
+    'abu dhabi': 'Asia/Dubai',
+    'melbourne': 'Australia/Melbourne',
+    'sao paulo': 'America/Sao_Paulo',
+    'rio de janeiro': 'America/Sao_Paulo',
+}
+
+# Countries spanning several zones: the zone of the capital or the most populous
+# region (pytz lists an edge zone first, e.g. Lord Howe Island for Australia).
+# Multi-zone countries missing here are left out of the index as ambiguous.
+COUNTRY_ZONES = {
+    'AR': 'America/Argentina/Buenos_Aires',
+    'AU': 'Australia/Sydney',
+    'BR': 'America/Sao_Paulo',
+    'CA': 'America/Toronto',
+    'CD': 'Africa/Kinshasa',
+    'CL': 'America/Santiago',
+    'CN': 'Asia/Shanghai',
+    'CY': 'Asia/Nicosia',
+    'DE': 'Europe/Berlin',
+    'EC': 'America/Guayaquil',
+    'ES': 'Europe/Madrid',
+    'FM': 'Pacific/Pohnpei',
+    'GL': 'America/Nuuk',
+    'ID': 'Asia/Jakarta',
+    'KI': 'Pacific/Tarawa',
+    'KZ': 'Asia/Almaty',
+    'MH': 'Pacific/Majuro',
+    'MN': 'Asia/Ulaanbaatar',
+    'MX': 'America/Mexico_City',
+    'MY': 'Asia/Kuala_Lumpur',
+    'NZ': 'Pacific/Auckland',
+    'PF': 'Pacific/Tahiti',
+    'PG': 'Pacific/Port_Moresby',
+    'PT': 'Europe/Lisbon',
+    'RU': 'Europe/Moscow',
+    'UA': 'Europe/Kyiv',
+    'US': 'America/New_York',
+    'UZ': 'Asia/Tashkent',
+}
+
+_SEPARATORS = re.compile(r"[\s_]+")
+
+
+def normalize_zone_name(name: str) -> str:
+    """Index key: case-folded, underscores treated as spaces"""
+    return _SEPARATORS.sub(" ", name).strip().casefold()
+
+
+def _build_index() -> Dict[str, str]:
+    index: Dict[str, str] = {}
+
+    def add(key: str, zone: str):
+        # Earlier sources win, so more specific names take priority
+        index.setdefault(normalize_zone_name(key), zone)
+
+    for abbreviation, zone in ABBREVIATIONS.items():
+        add(abbreviation, zone)
+    for zone in pytz.all_timezones:
+        add(zone, zone)
+    for city, zone in CITY_ZONES.items():
+        add(city, zone)
+    for code, country in pytz.country_names.items():
+        zones = pytz.country_timezones.get(code) or []
+        zone = zones[0] if len(zones) == 1 else COUNTRY_ZONES.get(code)
+        if zone is not None:
+            add(country, zone)
+    for zone in pytz.common_timezones:
+        parts = zone.split("/")
+        if len(parts) > 1:
+            add(parts[-1], zone)
+    return index
+
+
+ZONE_INDEX = _build_index()
+
+
+@lru_cache(maxsize=None)
+def _zone(name: str) -> pytz.BaseTzInfo:
+    return pytz.timezone(name)
+
+
+def resolve_zone_name(name: str) -> str:
+    """
+    IANA zone name for a zone, abbreviation, country or city name.
+
+    Raises pytz.exceptions.UnknownTimeZoneError for unknown names.
+    """
+    zone = ZONE_INDEX.get(normalize_zone_name(name))
+    if zone is None:
+        raise pytz.exceptions.UnknownTimeZoneError(name)
+    return zone
+
+
+def resolve_zone(name: str) -> pytz.BaseTzInfo:
+    """Cached tzinfo for any name resolve_zone_name() understands"""
+    return _zone(resolve_zone_name(name))
+
+
+def parse_local_time(time_str: str, today: Optional[datetime] = None) -> datetime:
+    """Parse "YYYY-MM-DD HH:MM" or "HH:MM" (today's date) into a naive datetime"""
+    if len(time_str.split()) == 1:
+        today = today or datetime.now()
+        time_str = f"{today.strftime('%Y-%m-%d')} {time_str}"
+    return datetime.strptime(time_str, "%Y-%m-%d %H:%M")
+
+
+def current_times(names: Sequence[str], now: Optional[datetime] = None
+                  ) -> List[Tuple[str, Optional[datetime]]]:
+    """
+    The same instant expressed in every named zone.
+
+    Unknown names yield None instead of raising, so one typo does not sink
+    the whole batch.
+    """
+    now = now or datetime.now(pytz.utc)
+    results = []
+    for name in names:
+        try:
+            results.append((name, now.astimezone(resolve_zone(name))))
+        except pytz.exceptions.UnknownTimeZoneError:
+            results.append((name, None))
+    return results
+
+
+def convert_many(times: Sequence[datetime], from_zone: str, to_zones: Sequence[str]
+                 ) -> List[List[Optional[datetime]]]:
+    """
+    Convert naive local times in from_zone into each target zone.
+
+    Returns one row per input time with one column per target zone (None
+    for unknown target zones). An unknown source zone raises.
+    """
+    source = resolve_zone(from_zone)
+    targets = []
+    for name in to_zones:
+        try:
+            targets.append(resolve_zone(name))
+        except pytz.exceptions.UnknownTimeZoneError:
+            targets.append(None)
+    rows = []
+    for naive in times:
+        localized = source.localize(naive)
+        rows.append([localized.astimezone(zone) if zone is not None else None for zone in targets])
+    return rows
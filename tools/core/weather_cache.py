@@ -0,0 +1,212 @@
+"""
+Short-lived cache of current weather observations.
+
+Entries are keyed on lat/lon snapped to a grid, so nearby places share one
+upstream fetch. Values are stored exactly as Open-Meteo returns them
+(Celsius); unit conversion happens when the answer is formatted, so the
+unit choice never splits the cache.
+
+After the TTL an entry is stale: for a grace window it is still served
+immediately while a background task refreshes it (stale-while-revalidate).
+Past the grace window callers wait for a fresh fetch.
+
+Every lookup is counted in a decaying popularity tracker; the background
+prefetcher (tools/core/prefetch.py) uses it to refresh the hottest cells
+before they go stale, so popular places never wait on the network.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from tools.core.config import env_float, env_int
+from tools.core.http import untrack_upstream
+from tools.core.open_meteo import fetch_current_weather
+from tools.core.popularity import PopularityTracker
+
+CellKey = Tuple[int, int]
+Loader = Callable[[Sequence[Tuple[float, float]]], Awaitable[List[Dict[str, Any]]]]
+
+
+class _Entry:
+    __slots__ = ("point", "value", "fetched_at")
+
+    def __init__(self, point: Tuple[float, float], value: Dict[str, Any], fetched_at: float):
+        self.point = point
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class WeatherCache:
+    """
+    Grid-cell keyed TTL cache with stale-while-revalidate.
+
+    loader takes a list of (lat, lon) points and returns one observation per
+    point, so misses from a multi-city request are fetched in one batch.
+    """
+
+    def __init__(self, loader: Loader, ttl: float = 600.0, grace: float = 300.0,
+                 grid: float = 0.05, max_entries: int = 1024,
+                 popularity: Optional["PopularityTracker[CellKey, Tuple[float, float]]"] = None):
+        self.loader = loader
+        self.ttl = ttl
+        self.grace = grace
+        self.grid = grid
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CellKey, _Entry]" = OrderedDict()
+        self._refreshing: Set[CellKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.popularity = popularity
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0,
+                          "refreshes": 0, "refresh_errors": 0, "prefetches": 0, "prefetch_errors": 0}
+
+    def cell(self, lat: Union[str, float], lon: Union[str, float]) -> CellKey:
+        """Grid cell containing the point"""
+        return (round(float(lat) / self.grid), round(float(lon) / self.grid))
+
+    async def get(self, lat: Union[str, float], lon: Union[str, float]) -> Dict[str, Any]:
+        """Current observation for one point; loader errors propagate"""
+        result = (await self.get_many([(lat, lon)]))[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def get_many(self, points: Sequence[Tuple[Union[str, float], Union[str, float]]]
+                       ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Observations for several points, in input order.
+
+        All misses are loaded with one loader call; if that call fails the
+        exception is returned in place of each missing result.
+        """
+        now = time.monotonic()
+        results: List[Any] = [None] * len(points)
+        missing: Dict[CellKey, List[int]] = {}
+
+        for i, (lat, lon) in enumerate(points):
+            key = self.cell(lat, lon)
+            if self.popularity is not None:
+                self.popularity.record(key, (float(lat), float(lon)))
+            entry = self._entries.get(key)
+            age = now - entry.fetched_at if entry is not None else None
+            if age is not None and age < self.ttl:
+                self._counters["hits"] += 1
+                self._entries.move_to_end(key)
+                results[i] = entry.value
+            elif age is not None and age < self.ttl + self.grace:
+                self._counters["stale_hits"] += 1
+                self._entries.move_to_end(key)
+                results[i] = entry.value
+                self._schedule_refresh(key)
+            else:
+                if key not in missing:
+                    self._counters["misses"] += 1
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            keys = list(missing)
+            fetch_points = [(float(points[missing[key][0]][0]), float(points[missing[key][0]][1]))
+                            for key in keys]
+            try:
+                values = await self.loader(fetch_points)
+            except Exception as e:
+                for key in keys:
+                    for i in missing[key]:
+                        results[i] = e
+            else:
+                fetched_at = time.monotonic()
+                for key, point, value in zip(keys, fetch_points, values):
+                    self._store(key, _Entry(point, value, fetched_at))
+                    for i in missing[key]:
+                        results[i] = value
+
+        return results
+
+    def _store(self, key: CellKey, entry: _Entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _schedule_refresh(self, key: CellKey):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(self._refresh(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: CellKey):
+        untrack_upstream()
+        try:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            value = (await self.loader([entry.point]))[0]
+            self._store(key, _Entry(entry.point, value, time.monotonic()))
+            self._counters["refreshes"] += 1
+        except Exception:
+            # Keep serving the stale value; the next caller past the grace window will retry
+            self._counters["refresh_errors"] += 1
+        finally:
+            self._refreshing.discard(key)
+
+    def expires_in(self, key: CellKey) -> Optional[float]:
+        """Seconds until the cell's entry goes stale (negative once stale), None if not cached"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.fetched_at + self.ttl - time.monotonic()
+
+    def is_refreshing(self, key: CellKey) -> bool:
+        return key in self._refreshing
+
+    async def prefetch(self, cells: Sequence[Tuple[CellKey, Tuple[float, float]]]):
+        """
+        Load the given (cell, point) pairs with one loader call and store
+        them, without counting lookups. Loader errors propagate; cells
+        already being refreshed are skipped.
+        """
+        cells = [(key, point) for key, point in cells if key not in self._refreshing]
+        if not cells:
+            return
+        self._refreshing.update(key for key, _ in cells)
+        try:
+            values = await self.loader([point for _, point in cells])
+        except Exception:
+            self._counters["prefetch_errors"] += 1
+            raise
+        else:
+            fetched_at = time.monotonic()
+            for (key, point), value in zip(cells, values):
+                self._store(key, _Entry(point, value, fetched_at))
+            self._counters["prefetches"] += len(cells)
+        finally:
+            self._refreshing.difference_update(key for key, _ in cells)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/stale/miss counters plus the current number of cells"""
+        stats: Dict[str, Any] = dict(self._counters)
+        stats["size"] = len(self._entries)
+        stats["tracked"] = len(self.popularity) if self.popularity is not None else 0
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["hits"] + stats["stale_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+current_weather_cache = WeatherCache(
+    fetch_current_weather,
+    ttl=env_float("WEATHER_CACHE_TTL", 600.0),
+    grace=env_float("WEATHER_CACHE_GRACE", 300.0),
+    grid=env_float("WEATHER_CACHE_GRID", 0.05),
+    max_entries=env_int("WEATHER_CACHE_SIZE", 1024),
+    popularity=PopularityTracker(
+        half_life=env_float("PREFETCH_HALF_LIFE", 3600.0),
+        max_keys=env_int("PREFETCH_TRACKED", 4096),
+    ),
+)
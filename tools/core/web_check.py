@@ -0,0 +1,165 @@
+"""
+Website reachability probes, singly or as a bounded-concurrency sweep.
+
+A probe sends HEAD and falls back to a streamed GET (body not downloaded)
+when the server rejects HEAD. httpx's trace hooks give per-phase timings:
+TCP connect (including DNS resolution), TLS handshake and time to first
+byte. Connect and TLS are absent when a pooled connection was reused.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from tools.core.http import get_client
+
+# Status codes meaning "this server does not do HEAD", not "this site is down"
+HEAD_REJECTED = {405, 501}
+
+# httpcore trace event -> timing phase
+_TRACE_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "tls",
+}
+
+
+@dataclass
+class SiteCheck:
+    url: str
+    status_code: Optional[int] = None
+    method: str = "HEAD"
+    content_type: str = "Unknown"
+    server: str = "Unknown"
+    error: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def normalize_url(url: str) -> str:
+    """Add https:// when the scheme is missing"""
+    url = url.strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        url = f"https://{url}"
+    return url
+
+
+def url_key(url: str) -> str:
+    """Coalescing key: the normalized URL with only its scheme and host lower-cased (paths are case-sensitive)"""
+    url = normalize_url(url)
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    userinfo, at, hostport = parts.netloc.rpartition("@")
+    return urlunsplit(parts._replace(scheme=parts.scheme.lower(), netloc=userinfo + at + hostport.lower()))
+
+
+class _PhaseTimer:
+    """Collects httpcore trace events into millisecond durations"""
+
+    def __init__(self):
+        self.started: Dict[str, float] = {}
+        self.timings: Dict[str, float] = {}
+
+    async def __call__(self, event_name: str, info: dict):
+        now = time.perf_counter()
+        name, _, stage = event_name.rpartition(".")
+        if name.endswith("send_request_headers") and stage == "started":
+            self.started["first_byte"] = now
+        elif name.endswith("receive_response_headers") and stage == "complete":
+            self._finish("first_byte", now)
+        elif name in _TRACE_PHASES:
+            phase = _TRACE_PHASES[name]
+            if stage == "started":
+                self.started[phase] = now
+            elif stage == "complete":
+                self._finish(phase, now)
+
+    def _finish(self, phase: str, now: float):
+        start = self.started.pop(phase, None)
+        if start is not None:
+            self.timings[phase] = round((now - start) * 1000, 1)
+
+
+async def probe(url: str, timeout: float = 10.0) -> SiteCheck:
+    """Check one URL; never raises for network errors"""
+    url = normalize_url(url)
+    result = SiteCheck(url=url)
+    timer = _PhaseTimer()
+    started = time.perf_counter()
+    try:
+        client = get_client(url)
+        response = await client.head(url, timeout=timeout, extensions={"trace": timer})
+        if response.status_code in HEAD_REJECTED:
+            result.method = "GET"
+            async with client.stream("GET", url, timeout=timeout,
+                                     extensions={"trace": timer}) as response:
+                pass
+        result.status_code = response.status_code
+        result.content_type = response.headers.get('content-type', 'Unknown')
+        result.server = response.headers.get('server', 'Unknown')
+    except httpx.ConnectTimeout:
+        result.error = "Connection timeout"
+    except httpx.TimeoutException:
+        result.error = "Timeout"
+    except httpx.HTTPError as e:
+        result.error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+    except (httpx.InvalidURL, ValueError) as e:
+        result.error = f"Invalid URL: {e}"
+    result.timings.update(timer.timings)
+    result.timings["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def iter_website_checks(urls: Iterable[str], concurrency: int = 10, per_host: int = 2,
+                              timeout: float = 10.0, deadline: Optional[float] = None) -> AsyncIterator[SiteCheck]:
+    """
+    Probe many URLs and yield each result as soon as it completes.
+
+    At most `concurrency` probes run at once and at most `per_host` of them
+    against the same host, so one slow host cannot hold every slot.
+    When `deadline` seconds pass, probes still queued or running are
+    cancelled and yielded as "Sweep deadline exceeded" errors, so finished
+    results are never lost to a slow tail. Pending probes are also
+    cancelled if the consumer stops iterating early.
+    """
+    overall = asyncio.Semaphore(max(1, concurrency))
+    hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def bounded(url: str) -> SiteCheck:
+        try:
+            host = urlsplit(url).hostname or url
+        except ValueError:
+            # probe() reports the malformed URL as this entry's error
+            host = url
+        host_limit = hosts.setdefault(host, asyncio.Semaphore(max(1, per_host)))
+        async with host_limit, overall:
+            return await probe(url, timeout)
+
+    loop = asyncio.get_running_loop()
+    ends_at = None if deadline is None else loop.time() + deadline
+    targets = [normalize_url(url) for url in urls]
+    tasks = [asyncio.ensure_future(bounded(url)) for url in targets]
+    pending = set(tasks)
+    try:
+        while pending:
+            wait = None if ends_at is None else max(0.0, ends_at - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                yield task.result()
+        for url, task in zip(targets, tasks):
+            if task in pending:
+                task.cancel()
+                yield SiteCheck(url=url, error="Sweep deadline exceeded")
+    finally:
+        for task in tasks:
+            task.cancel()
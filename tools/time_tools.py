@@ -1,51 +1,63 @@
-import asyncio
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import List, Union
 import pytz
 from tools.tool_manager import tool
+from tools.core.results import ConversionResult, TimeResult, TimesResult
+from tools.core.timezones import (
+    convert_many, current_times, parse_local_time, resolve_zone, resolve_zone_name,
+)
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S %Z"
 
 @tool(category="time", description="Get current time in a specific timezone")
-async def get_current_time(timezone_name: str = "UTC") -> str:
+async def get_current_time(timezone_name: str = "UTC") -> Union[TimeResult, str]:
     """
     Get the current time in a specified timezone.
     
     Args:
-        timezone_name: The timezone name (e.g., 'UTC', 'US/Eastern', 'Asia/Tokyo', 'Europe/London')
+        timezone_name: The timezone name (e.g., 'UTC', 'US/Eastern', 'Asia/Tokyo', 'Europe/London'),
+            an abbreviation such as 'EST', or a country or city name such as 'Bangladesh' or 'Dhaka'
     
     Returns:
-        A formatted string with the current time in the specified timezone
+        The current time in the specified timezone
     """
     try:
-        # Handle common timezone abbreviations
-        timezone_mapping = {
-            'EST': 'US/Eastern',
-            'PST': 'US/Pacific',
-            'GMT': 'GMT',
-            'JST': 'Asia/Tokyo',
-            'CET': 'Europe/Paris',
-            'IST': 'Asia/Kolkata',
-            'CST': 'US/Central',
-            'MST': 'US/Mountain'
-        }
-        
-        tz_name = timezone_mapping.get(timezone_name.upper(), timezone_name)
-        
-        tz = pytz.timezone(tz_name)
+        tz = resolve_zone(timezone_name)
         
         # Get current time in the specified timezone
         current_time = datetime.now(tz)
         
         # Format the time
-        formatted_time = current_time.strftime("%Y-%m-%d %H:%M:%S %Z")
+        formatted_time = current_time.strftime(TIME_FORMAT)
         
-        return f"Current time in {timezone_name}: {formatted_time}"
+        return TimeResult(timezone_name, formatted_time)
         
     except pytz.exceptions.UnknownTimeZoneError:
         return f"Error: Unknown timezone '{timezone_name}'. Please use a valid timezone like 'UTC', 'US/Eastern', 'Asia/Tokyo', etc."
     except Exception as e:
         return f"Error getting time: {str(e)}"
 
+@tool(category="time", description="Get the current time in several timezones at once")
+async def get_current_times(timezone_names: List[str]) -> Union[TimesResult, str]:
+    """
+    Get the current time in many timezones with a single call.
+    
+    Args:
+        timezone_names: Timezone, abbreviation, country or city names, e.g. ['Tokyo', 'EST', 'Bangladesh']
+    
+    Returns:
+        One line per timezone, all for the same instant
+    """
+    if not timezone_names:
+        return "Error: No timezones given"
+    
+    return TimesResult(tuple(
+        (name, current_time.strftime(TIME_FORMAT) if current_time is not None else None)
+        for name, current_time in current_times(timezone_names)
+    ))
+
 @tool(category="time", description="Convert time between different timezones")
-async def convert_timezone(time_str: str, from_tz: str, to_tz: str) -> str:
+async def convert_timezone(time_str: str, from_tz: str, to_tz: str) -> Union[ConversionResult, str]:
     """
     Convert time from one timezone to another.
     
@@ -58,40 +70,51 @@ async def convert_timezone(time_str: str, from_tz: str, to_tz: str) -> str:
         Converted time with timezone information
     """
     try:
-        timezone_mapping = {
-            'EST': 'US/Eastern',
-            'PST': 'US/Pacific',
-            'GMT': 'GMT',
-            'JST': 'Asia/Tokyo',
-            'CET': 'Europe/Paris',
-            'IST': 'Asia/Kolkata',
-            'CST': 'US/Central',
-            'MST': 'US/Mountain',
-            'UTC': 'UTC',
-            'dhaka': 'Asia/Dhaka',
-            'bangladesh': 'Asia/Dhaka',
-        }
-        
-        from_tz = timezone_mapping.get(from_tz.upper(), from_tz)
-        to_tz = timezone_mapping.get(to_tz.upper(), to_tz)
+        from_tz = resolve_zone_name(from_tz)
+        to_tz = resolve_zone_name(to_tz)
         
-        if len(time_str.split()) == 1: 
-            today = datetime.now().strftime("%Y-%m-%d")
-            time_str = f"{today} {time_str}"
+        dt = parse_local_time(time_str)
+        time_str = dt.strftime("%Y-%m-%d %H:%M")
         
-        from_timezone = pytz.timezone(from_tz)
-        to_timezone = pytz.timezone(to_tz)
+        dt_localized = resolve_zone(from_tz).localize(dt)
         
-        dt = datetime.strptime(time_str, "%Y-%m-%d %H:%M")
+        dt_converted = dt_localized.astimezone(resolve_zone(to_tz))
         
-
-        dt_localized = from_timezone.localize(dt)
+        result = dt_converted.strftime(TIME_FORMAT)
         
-        dt_converted = dt_localized.astimezone(to_timezone)
+        return ConversionResult(from_tz, ((time_str, ((to_tz, result),)),))
         
-        result = dt_converted.strftime("%Y-%m-%d %H:%M:%S %Z")
+    except Exception as e:
+        return f"Error converting time: {str(e)}. Please use format 'YYYY-MM-DD HH:MM' or 'HH:MM'"
+
+@tool(category="time", description="Convert one or more times into several timezones at once")
+async def convert_timezone_many(time_strs: List[str], from_tz: str, to_tzs: List[str]) -> Union[ConversionResult, str]:
+    """
+    Convert several times from one timezone into several target timezones.
+    
+    Args:
+        time_strs: Times in format "YYYY-MM-DD HH:MM" or "HH:MM"
+        from_tz: Source timezone
+        to_tzs: Target timezones
+    
+    Returns:
+        One line per input time listing it in every target timezone
+    """
+    if not time_strs:
+        return "Error: No times given"
+    
+    try:
+        times = [parse_local_time(time_str) for time_str in time_strs]
+        rows = convert_many(times, from_tz, to_tzs)
+        from_name = resolve_zone_name(from_tz)
         
-        return f"Time conversion: {time_str} {from_tz} → {result}"
+        return ConversionResult(from_name, tuple(
+            (dt.strftime('%Y-%m-%d %H:%M'), tuple(
+                (name, value.strftime(TIME_FORMAT) if value is not None else None)
+                for name, value in zip(to_tzs, row)
+            ))
+            for dt, row in zip(times, rows)
+        ))
         
     except Exception as e:
         return f"Error converting time: {str(e)}. Please use format 'YYYY-MM-DD HH:MM' or 'HH:MM'"
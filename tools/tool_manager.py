@@ -1,52 +1,242 @@
+import asyncio
+import functools
 import importlib
 import importlib.util
 import inspect
-from typing import List, Callable, Dict, Any
+import json
+import re
+from typing import List, Callable, Dict, Any, Hashable, Optional
 import os
 from pathlib import Path
 
+from tools.core.executors import INLINE, PROCESS, ExecutorPools, executor_pools, offload
+from tools.core.manifest import default_manifest_path, load_manifest, parameters_schema
+from tools.core.metrics import MetricsRegistry, default_metrics_path
+from tools.core.policy import ExecutionPolicy, apply_policy
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_argument(value: Any) -> Hashable:
+    """
+    Hashable, case- and whitespace-insensitive form of a tool argument,
+    used to decide whether two calls are identical.
+    """
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip().casefold()
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_argument(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), normalize_argument(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight task.
+
+    The first caller starts the task; later callers with the same key await
+    the same task until it finishes. Each caller waits through
+    asyncio.shield, so cancelling one waiter leaves the shared task running
+    for the others. The task is only cancelled once every waiter is gone.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0 and not task.done():
+                    task.cancel()
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Retrieve the exception so an abandoned task does not log "never retrieved"
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+def coalesce_calls(func: Callable, normalize: Callable[[Any], Hashable] = normalize_argument) -> Callable:
+    """
+    Wrap an async tool so concurrent calls with identical normalized
+    arguments share one execution. normalize maps each argument to its
+    key part (normalize_argument by default). The wrapper keeps the tool's
+    signature and exposes its SingleFlight as wrapper.single_flight.
+    """
+    signature = inspect.signature(func)
+    flight = SingleFlight()
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple((name, normalize(value)) for name, value in bound.arguments.items())
+        return await flight.run(key, lambda: func(*args, **kwargs))
+
+    wrapper.single_flight = flight
+    return wrapper
+
+class LazyTool:
+    """
+    Stand-in registered from the manifest for a tool whose module has not
+    been imported yet. The first call imports the module (whose @tool
+    decorator then registers the real function) and delegates to it.
+    """
+
+    def __init__(self, manager: "ToolManager", name: str, module_name: str, path: Path,
+                 import_name: Optional[str], category: str, description: str):
+        self.manager = manager
+        self.__name__ = name
+        self.module_name = module_name
+        self.path = path
+        self.import_name = import_name
+        self.category = category
+        self.description = description
+
+    def load(self) -> Callable:
+        """Import the tool's module and return the real function"""
+        if self.import_name is not None:
+            module = importlib.import_module(self.import_name)
+        else:
+            spec = importlib.util.spec_from_file_location(self.module_name, self.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        func = getattr(module, self.__name__)
+        if self.manager.tools.get(self.__name__) is self:
+            # Undecorated coroutine: register it the way eager discovery would
+            return self.manager.register_tool(self.__name__, func, self.description, self.category)
+        return self.manager.tools[self.__name__]
+
+    async def __call__(self, *args, **kwargs):
+        return await self.load()(*args, **kwargs)
+
+    def __repr__(self):
+        return f"<LazyTool {self.module_name}.{self.__name__}>"
+
+
+def signature_schema(signature: inspect.Signature) -> Dict[str, Any]:
+    """JSON schema for a function signature, matching the manifest's schemas"""
+    parameters = []
+    for param in signature.parameters.values():
+        entry: Dict[str, Any] = {"name": param.name}
+        if param.annotation is not inspect.Parameter.empty:
+            entry["annotation"] = inspect.formatannotation(param.annotation)
+        if param.default is not inspect.Parameter.empty:
+            entry["default"] = param.default
+        parameters.append(entry)
+    return parameters_schema(parameters)
+
+
 class ToolManager:
     """
     A dynamic tool manager that can discover, register, and manage tools for the agent.
     This allows for easy extension of agent capabilities by adding new tool modules.
     """
     
-    def __init__(self):
+    def __init__(self, executors: ExecutorPools = executor_pools):
         self.tools: Dict[str, Callable] = {}
         self.tool_metadata: Dict[str, Dict[str, Any]] = {}
+        self.metrics = MetricsRegistry()
+        self.executors = executors
+        
+    def register_tool(self, name: str, func: Callable, description: str = "", category: str = "general") -> Callable:
+        """
+        Register a tool function with metadata.
         
-    def register_tool(self, name: str, func: Callable, description: str = "", category: str = "general"):
-        """Register a tool function with metadata"""
+        The function is wrapped so every call is recorded in self.metrics;
+        the instrumented wrapper (same signature) is returned.
+        """
+        signature = inspect.signature(func)
+        if not hasattr(func, "tool_metrics"):
+            func = self.metrics.instrument(name, category, func)
         self.tools[name] = func
         self.tool_metadata[name] = {
             "description": description,
             "category": category,
-            "signature": inspect.signature(func),
-            "docstring": func.__doc__
+            "signature": str(signature),
+            "docstring": func.__doc__,
+            "module": func.__module__,
+            "parameters": signature_schema(signature),
+            "executor": getattr(func, "executor", INLINE),
+            "loaded": True,
         }
+        return func
+    
+    def _is_registered(self, name: str, func: Callable) -> bool:
+        registered = self.tools.get(name)
+        return registered is func or getattr(registered, "__wrapped__", None) is func
+    
+    @staticmethod
+    def _tool_files(tools_path: Path) -> List[Path]:
+        return sorted(
+            py_file for py_file in tools_path.glob("*.py")
+            if not py_file.name.startswith("__") and py_file.name != "tool_manager.py"
+        )
         
-    def discover_tools(self, tools_dir: str = None):
+    def discover_tools(self, tools_dir: str = None, lazy: bool = False):
         """
         Automatically discover and register tools from the tools directory.
         Looks for functions that are decorated with @tool or have specific naming patterns.
+        
+        With lazy=True nothing is imported: tools are registered as LazyTool
+        stand-ins from a cached manifest and their module is imported on
+        first call.
         """
         if tools_dir is None:
             tools_dir = Path(__file__).parent
         
         tools_path = Path(tools_dir)
         
-        for py_file in tools_path.glob("*.py"):
-            if py_file.name.startswith("__") or py_file.name == "tool_manager.py":
-                continue
-                
+        in_package = tools_path.resolve() == Path(__file__).parent.resolve()
+        
+        if lazy:
+            self._discover_from_manifest(tools_path, in_package)
+            return
+        
+        for py_file in self._tool_files(tools_path):
             module_name = py_file.stem
             try:
-                spec = importlib.util.spec_from_file_location(module_name, py_file)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+                if in_package:
+                    # Import through the package so modules that are already
+                    # loaded are not executed a second time
+                    module = importlib.import_module(f"{__package__}.{module_name}")
+                else:
+                    spec = importlib.util.spec_from_file_location(module_name, py_file)
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(module)
                 
                 for name, obj in inspect.getmembers(module, inspect.iscoroutinefunction):
-                    if not name.startswith("_"):
+                    # Skip private helpers, coroutines imported from other
+                    # modules and tools the @tool decorator already registered
+                    if (not name.startswith("_") and obj.__module__ == module.__name__
+                            and not self._is_registered(name, obj)):
                         self.register_tool(
                             name=name,
                             func=obj,
@@ -56,6 +246,33 @@ class ToolManager:
                         
             except Exception as e:
                 print(f"Warning: Could not load tools from {py_file}: {e}")
+    
+    def _discover_from_manifest(self, tools_path: Path, in_package: bool):
+        try:
+            modules = load_manifest(self._tool_files(tools_path), default_manifest_path(tools_path))
+        except (OSError, SyntaxError) as e:
+            print(f"Warning: Could not build tool manifest for {tools_path}: {e}")
+            return
+        
+        for module_name, entry in modules.items():
+            import_name = f"{__package__}.{module_name}" if in_package else None
+            for meta in entry["tools"]:
+                name = meta["name"]
+                if name in self.tools:
+                    continue
+                self.tools[name] = LazyTool(self, name, module_name, Path(entry["path"]),
+                                            import_name, meta["category"], meta["description"])
+                self.tool_metadata[name] = {
+                    "description": meta["description"],
+                    "category": meta["category"],
+                    "signature": meta["signature"],
+                    "docstring": meta["docstring"],
+                    "module": import_name or module_name,
+                    "parameters": meta["parameters"],
+                    "executor": meta["executor"],
+                    "loaded": False,
+                }
+                self.metrics.for_tool(name, meta["category"])
                 
     def get_tools_list(self) -> List[Callable]:
         """Get list of all registered tool functions"""
@@ -76,26 +293,95 @@ class ToolManager:
             if self.tool_metadata[name]["category"] == category
         }
 
+    def get_coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """Single-flight counters for every tool registered with coalesce=True"""
+        return {
+            name: func.single_flight.stats() for name, func in self.tools.items()
+            if hasattr(func, "single_flight")
+        }
+
+    def get_breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state per tool with a breaker (shared breakers repeat)"""
+        return {
+            name: func.execution.breaker.stats() for name, func in self.tools.items()
+            if getattr(func, "execution", None) is not None and func.execution.breaker is not None
+        }
+
+    def get_policy_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Deadline, concurrency and fallback counters for tools with an execution policy"""
+        return {
+            name: func.execution.stats() for name, func in self.tools.items()
+            if getattr(func, "execution", None) is not None
+        }
+
+    def get_executor_stats(self) -> Dict[str, Any]:
+        """Calls submitted, running, cancelled and failed per shared executor pool"""
+        return self.executors.stats()
+
+    def start_executors(self):
+        """Spawn the process pool up front when a registered tool runs in it"""
+        if any(meta["executor"] == PROCESS for meta in self.tool_metadata.values()):
+            self.executors.start()
+
+    async def close_executors(self):
+        await self.executors.aclose()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-tool and per-category call counts, errors, timeouts, in-flight calls and latency"""
+        return self.metrics.snapshot()
+
+    def export_metrics(self, format: str = "json") -> str:
+        """Metrics as a JSON document or Prometheus text exposition format"""
+        if format == "prometheus":
+            return self.metrics.to_prometheus()
+        if format == "json":
+            return json.dumps(self.get_metrics(), indent=2)
+        raise ValueError(f"Unknown metrics format: {format}")
+
+    def save_metrics(self, path: Optional[Path] = None) -> Path:
+        """Write the JSON metrics snapshot (default: <cache dir>/tool_metrics.json)"""
+        path = Path(path) if path else default_metrics_path()
+        path.write_text(self.export_metrics("json"))
+        return path
+
 tool_manager = ToolManager()
 
-def tool(category: str = "general", description: str = ""):
+def tool(category: str = "general", description: str = "", coalesce: bool = False,
+         policy: Optional[ExecutionPolicy] = None, executor: str = INLINE,
+         coalesce_key: Callable[[Any], Hashable] = normalize_argument):
     """
     Decorator to mark functions as tools and automatically register them.
     
+    With coalesce=True, concurrent calls whose arguments are identical after
+    normalization (case, surrounding whitespace) share a single execution.
+    coalesce_key replaces that normalization where case matters, e.g. URL paths.
+    
+    An ExecutionPolicy adds a deadline, a concurrency limit and a circuit
+    breaker with cached or fallback answers. Coalesced callers share one
+    execution under the policy.
+    
+    executor="thread" or "process" runs a synchronous tool in the shared
+    thread or process pool instead of on the event loop (see
+    tools/core/executors.py); the policy's deadline covers time queued there.
+    
     Usage:
     @tool(category="weather", description="Get current weather information")
     async def get_weather(city: str) -> str:
         # implementation
     """
     def decorator(func):
+        func = offload(func, executor, tool_manager.executors)
+        if policy is not None:
+            func = apply_policy(func, policy)
+        if coalesce:
+            func = coalesce_calls(func, coalesce_key)
         func.category = category
         func.description = description
         # Auto-register when the module is imported
-        tool_manager.register_tool(
+        return tool_manager.register_tool(
             name=func.__name__,
             func=func,
             description=description,
             category=category
         )
-        return func
     return decorator
@@ -1,10 +1,16 @@
-import asyncio
-import httpx
-import json
-from tools.tool_manager import tool
+import functools
+import random
+from typing import List, Union
+from tools.tool_manager import tool, tool_manager
+from tools.core.config import env_str
+from tools.core.facts import fact_pool, fetch_fact
+from tools.core.policy import ExecutionPolicy
+from tools.core.results import Banner, CalculationResult, FactResult, WebsiteResult, WebsitesResult
+from tools.core.safe_eval import evaluate
+from tools.core.web_check import iter_website_checks, probe, url_key
 
 @tool(category="utility", description="Calculate basic mathematical expressions")
-async def calculate(expression: str) -> str:
+async def calculate(expression: str) -> Union[CalculationResult, str]:
     """
     Calculate basic mathematical expressions safely.
     
@@ -20,47 +26,53 @@ async def calculate(expression: str) -> str:
         if not all(c in allowed_chars for c in expression):
             return "Error: Only basic mathematical operations are allowed (+, -, *, /, %, parentheses)"
         
-        # Evaluate the expression safely
-        result = eval(expression)
-        return f"Calculation: {expression} = {result}"
+        # Evaluate through the bounded AST evaluator (compiled plans are cached)
+        result = evaluate(expression)
+        return CalculationResult(expression, result)
         
     except ZeroDivisionError:
         return "Error: Division by zero"
     except Exception as e:
         return f"Error in calculation: {str(e)}"
 
-@tool(category="utility", description="Get random facts or quotes")
-async def get_random_fact() -> str:
+# Served when the facts API is slow, failing or behind an open breaker
+FALLBACK_FACTS = [
+    "Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old and still perfectly edible.",
+    "A group of flamingos is called a 'flamboyance'.",
+    "The shortest war in history lasted only 38-45 minutes between Britain and Zanzibar in 1896.",
+    "Octopuses have three hearts and blue blood.",
+    "A day on Venus is longer than its year."
+]
+
+def _fallback_fact() -> FactResult:
+    return FactResult(random.choice(FALLBACK_FACTS))
+
+FACTS_POLICY = ExecutionPolicy(timeout=3.0, failure_threshold=3, reset_timeout=60.0, fallback=_fallback_fact)
+
+WEBSITE_POLICY = ExecutionPolicy(timeout=15.0, max_concurrency=20)
+
+# check_websites reports unfinished probes as timed out at this point; the policy timeout is only a backstop
+SWEEP_DEADLINE = 50.0
+
+@tool(category="utility", description="Get random facts or quotes", policy=FACTS_POLICY)
+async def get_random_fact() -> FactResult:
     """
     Get a random interesting fact.
     
     Returns:
         A random fact
     """
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get("https://uselessfacts.jsph.pl/random.json?language=en")
-            response.raise_for_status()
-            
-            data = response.json()
-            fact = data.get('text', 'No fact available')
-            
-            return f"🧠 Random Fact: {fact}"
-            
-    except Exception as e:
-        # Fallback facts if API is unavailable
-        fallback_facts = [
-            "Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old and still perfectly edible.",
-            "A group of flamingos is called a 'flamboyance'.",
-            "The shortest war in history lasted only 38-45 minutes between Britain and Zanzibar in 1896.",
-            "Octopuses have three hearts and blue blood.",
-            "A day on Venus is longer than its year."
-        ]
-        import random
-        return f"🧠 Random Fact: {random.choice(fallback_facts)}"
-
-@tool(category="utility", description="Check if a website is accessible")
-async def check_website(url: str) -> str:
+    # Served from the prefetched pool; the network is only on its background refill path
+    if fact_pool.enabled:
+        fact = fact_pool.take()
+        return FactResult(fact) if fact is not None else _fallback_fact()
+    
+    # Failures and slow responses are answered from FALLBACK_FACTS by the policy
+    return FactResult(await fetch_fact())
+
+@tool(category="utility", description="Check if a website is accessible", coalesce=True, coalesce_key=url_key,
+      policy=WEBSITE_POLICY)
+async def check_website(url: str) -> Union[WebsiteResult, str]:
     """
     Check if a website is accessible and get basic information.
     
@@ -71,39 +83,53 @@ async def check_website(url: str) -> str:
         Website status and basic information
     """
     try:
-        # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = f"https://{url}"
+        result = await probe(url, timeout=10.0)
+        url = result.url
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.head(url)
-            
-            status = "✅ Website is accessible"
-            info = f"Status Code: {response.status_code}"
-            
-            # Get some headers
-            content_type = response.headers.get('content-type', 'Unknown')
-            server = response.headers.get('server', 'Unknown')
-            
-            return f"{status}\n🌐 URL: {url}\n📊 {info}\n📄 Content Type: {content_type}\n🖥️ Server: {server}"
+        if result.error == "Connection timeout":
+            return f"❌ Connection timeout for {url}"
+        if result.error:
+            return f"❌ Error checking {url}: {result.error}"
+        
+        return WebsiteResult(url, result.status_code, result.content_type, result.server)
             
-    except httpx.ConnectTimeout:
-        return f"❌ Connection timeout for {url}"
-    except httpx.HTTPStatusError as e:
-        return f"⚠️ HTTP Error {e.response.status_code} for {url}"
     except Exception as e:
         return f"❌ Error checking {url}: {str(e)}"
 
-@tool(category="utility", description="Get information about the agent creator")
-async def about_me() -> str:
+@tool(category="utility", description="Check many websites concurrently",
+      policy=ExecutionPolicy(timeout=SWEEP_DEADLINE + 10.0))
+async def check_websites(urls: List[str], concurrency: int = 10) -> Union[WebsitesResult, str]:
     """
-    Get information about the creator of this AI agent.
+    Check several websites at once, with bounded parallelism.
+    
+    Args:
+        urls: Website URLs to check
+        concurrency: Maximum number of checks running at the same time
     
     Returns:
-        Information about MD Shariful Islam, the agent creator
+        One line per URL, in the order the checks finished, with status and timings;
+        URLs still unchecked after SWEEP_DEADLINE seconds are listed last as timed out
     """
-    try:
-        creator_info = f"""👨‍💻 **About the Agent Creator**
+    if not urls:
+        return "❌ No URLs given"
+    
+    checks = []
+    async for result in iter_website_checks(urls, concurrency=max(1, min(concurrency, 50)),
+                                                deadline=SWEEP_DEADLINE):
+        checks.append((result.url, result.status_code, result.method, result.error, dict(result.timings)))
+    return WebsitesResult(tuple(checks))
+
+# Static answers: the banner is what people see, the compact data what the model is sent
+ABOUT_ME = Banner(
+    {
+        "name": "MD Shariful Islam",
+        "role": "Software Engineer",
+        "focus": ["AI/ML applications", "backend", "web development"],
+        "handle": "@developersharif",
+        "profiles": ["GitHub", "Facebook", "X", "LinkedIn"],
+        "project": "Multi-Purpose Weather & Utility Assistant",
+    },
+    """👨‍💻 **About the Agent Creator**
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 👋 **Personal Information:**
@@ -137,30 +163,17 @@ async def about_me() -> str:
 • Open to collaboration and networking
 • Passionate about AI/ML development
 • Available across all major platforms as @developersharif
-"""
-        
-        return creator_info
-        
-    except Exception as e:
-        return f"❌ Error getting creator information: {str(e)}"
+""",
+)
 
-@tool(category="utility", description="Get information about the AI agent and its capabilities")
-async def agent_about() -> str:
-    """
-    Get detailed information about the AI agent and its capabilities.
-    
-    Returns:
-        Comprehensive information about the agent
-    """
-    try:
-        agent_info = f"""🤖 **About Your AI Assistant**
+AGENT_BANNER = """🤖 **About Your AI Assistant**
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 🎯 **Identity & Purpose:**
 • Name: Multi-Purpose Weather & Utility Assistant
 • Version: 1.0 (Enhanced with Extensible Tools)
 • Primary Role: Weather information, time operations, and general utilities
-• Model: Qwen3:0.6b (via Ollama)
+• Model: {model}
 
 🛠️ **Available Capabilities:**
 • 🌤️ **Weather Services**: Real-time weather data for any global location
@@ -174,12 +187,11 @@ async def agent_about() -> str:
 • Framework: Microsoft AutoGen AgentChat
 • Tool System: Dynamic discovery with @tool decorators
 • API Integration: OpenStreetMap (geocoding), Open-Meteo (weather)
-• Language Model: Qwen3 0.6B parameters
 • Interface: Command-line interactive chat
 
 📊 **Current Session Stats:**
-• Tools Available: 8 functions across 3 categories
-• Categories: Weather, Time, Utility
+• Tools Available: {tool_count} functions across {category_count} categories
+• Categories: {categories}
 • Response Mode: Professional with emoji enhancement
 • Function Calling: Enabled for real-time data
 
@@ -198,8 +210,43 @@ async def agent_about() -> str:
 🚀 **Created for:** Sharif's Weather Agent Project
 📅 **Last Updated:** June 2025
 """
-        
-        return agent_info
+
+@functools.lru_cache(maxsize=1)
+def _agent_banner() -> Banner:
+    """Built on first use from the registry, once every tool module has registered"""
+    by_category = {}
+    for name, meta in tool_manager.list_tools().items():
+        by_category.setdefault(meta["category"], []).append(name)
+    model = env_str("MODEL", "qwen3:0.6b")
+    text = AGENT_BANNER.format(
+        model=model,
+        tool_count=sum(len(names) for names in by_category.values()),
+        category_count=len(by_category),
+        categories=", ".join(category.title() for category in by_category),
+    )
+    data = {"name": "Multi-Purpose Weather & Utility Assistant", "model": model, "tools": by_category}
+    return Banner(data, text)
+
+@tool(category="utility", description="Get information about the agent creator")
+async def about_me() -> Banner:
+    """
+    Get information about the creator of this AI agent.
+    
+    Returns:
+        Information about MD Shariful Islam, the agent creator
+    """
+    return ABOUT_ME
+
+@tool(category="utility", description="Get information about the AI agent and its capabilities")
+async def agent_about() -> Union[Banner, str]:
+    """
+    Get detailed information about the AI agent and its capabilities.
+    
+    Returns:
+        Comprehensive information about the agent
+    """
+    try:
+        return _agent_banner()
         
     except Exception as e:
         return f"❌ Error getting agent information: {str(e)}"
@@ -1,112 +1,134 @@
 import httpx
 import asyncio
-import time
+from typing import List, Union
 from tools.tool_manager import tool
+from tools.core.forecast import MAX_FORECAST_DAYS, forecast_cache, summarize_daily
+from tools.core.geocoding import geocode
+from tools.core.open_meteo import describe_weather
+from tools.core.policy import ExecutionPolicy
+from tools.core.results import ForecastResult, ItemError, WeatherManyResult, WeatherResult
+from tools.core.weather_cache import current_weather_cache
 
-@tool(category="weather", description="Get current weather information for any city worldwide")
-async def get_weather(city: str, format: str = "celsius") -> str:
-    nominatim_headers = {
-        'User-Agent': 'WeatherAgent/1.0 (weather-agent-project-python; contact@realbrain.cc)',
-        'Accept-Language': 'en,en-US;q=0.9',
-    }
-    
-    regular_headers = {
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36',
-    }
-    
-    timeout = httpx.Timeout(10.0, connect=5.0) 
-    
-    try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                location_response = await client.get(
-                    "https://nominatim.openstreetmap.org/search",
-                    params={"q": city, "format": "json"},
-                    headers=nominatim_headers 
-                )
-                location_response.raise_for_status() 
-                
-                location_data = location_response.json()
-                if not location_data:
-                    return f"Error: Could not find location '{city}'"
-                
-                lat = location_data[0]["lat"]
-                lon = location_data[0]["lon"]
-                location_name = location_data[0]["display_name"]
-              
-                await asyncio.sleep(1)
-                
-                weather_response = await client.get(
-                    "https://api.open-meteo.com/v1/forecast",
-                    params={
-                        "latitude": lat,
-                        "longitude": lon,
-                        "current_weather": "true"
-                    },
-                    headers=regular_headers
-                )
-                weather_response.raise_for_status() 
-                
-                weather_data = weather_response.json()
-                
-                temperature = weather_data["current_weather"]["temperature"]
-                windspeed = weather_data["current_weather"]["windspeed"]
-                weathercode = weather_data["current_weather"]["weathercode"]
-                
-                weather_descriptions = {
-                    0: "Clear sky",
-                    1: "Mainly clear",
-                    2: "Partly cloudy",
-                    3: "Overcast",
-                    45: "Fog",
-                    48: "Depositing rime fog",
-                    51: "Light drizzle",
-                    53: "Moderate drizzle",
-                    55: "Dense drizzle",
-                    56: "Light freezing drizzle",
-                    57: "Dense freezing drizzle",
-                    61: "Slight rain",
-                    63: "Moderate rain",
-                    65: "Heavy rain",
-                    71: "Slight snow fall",
-                    73: "Moderate snow fall",
-                    75: "Heavy snow fall",
-                    95: "Thunderstorm"
-                }
-                
-                weather_desc = weather_descriptions.get(weathercode, f"Unknown ({weathercode})")
-                
-            
-                if format.lower() == "fahrenheit":
-                    temperature = (temperature * 9/5) + 32
-                    temp_unit = "°F"
-                else:
-                    temp_unit = "°C"
-                    
-                return f"The weather in {city} ({location_name}) is {temperature}{temp_unit}, {weather_desc}. Wind speed: {windspeed} km/h."
-                
-            except httpx.HTTPStatusError as e:
-                return f"API Error: {e.response.status_code} - {e.response.text}"
-                
-    except httpx.ConnectTimeout:
+# The weather tools share the "weather" breaker: they depend on the same upstreams.
+# While it is open, the last good answer for the same arguments is served if it is
+# recent enough: an hour for current weather, six hours for forecasts.
+WEATHER_POLICY = ExecutionPolicy(timeout=20.0, max_concurrency=8, failure_threshold=5, reset_timeout=30.0,
+                                 breaker="weather", cache_results=True, cache_max_age=3600.0)
+WEATHER_MANY_POLICY = ExecutionPolicy(timeout=60.0, max_concurrency=4, failure_threshold=5, reset_timeout=30.0,
+                                      breaker="weather", cache_results=True, cache_max_age=3600.0)
+FORECAST_POLICY = ExecutionPolicy(timeout=20.0, max_concurrency=8, failure_threshold=5, reset_timeout=30.0,
+                                  breaker="weather", cache_results=True, cache_max_age=21600.0)
+
+def _weather_result(city: str, location_name: str, current: dict, format: str) -> WeatherResult:
+    temperature = current["temperature"]
+    fahrenheit = format.lower() == "fahrenheit"
+    if fahrenheit:
+        temperature = (temperature * 9/5) + 32
+    return WeatherResult(city, location_name, temperature, "F" if fahrenheit else "C",
+                         describe_weather(current["weathercode"]), current["windspeed"])
+
+def _forecast_result(city: str, location_name: str, summary, format: str) -> ForecastResult:
+    fahrenheit = format.lower() == "fahrenheit"
+    low, high, mean = summary.temperature_min, summary.temperature_max, summary.temperature_mean
+    if fahrenheit:
+        low, high, mean = (low * 9 / 5 + 32, high * 9 / 5 + 32, mean * 9 / 5 + 32)
+    # NaN (no data) and -1 (dry day, unknown code) become None/""; the arrays become one row per day
+    probability = [None if p != p else p for p in summary.precipitation_probability_max.tolist()]
+    rain_from = [hour if hour >= 0 else None for hour in summary.first_rain_hour.tolist()]
+    conditions = [describe_weather(code) if code >= 0 else "" for code in summary.weathercode.tolist()]
+    days = tuple(zip(summary.days.tolist(), low.tolist(), high.tolist(), mean.tolist(),
+                     summary.precipitation_total.tolist(), rain_from, probability, conditions))
+    return ForecastResult(city, location_name, "F" if fahrenheit else "C", days)
+
+def _describe_error(e: Exception) -> str:
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"API Error: {e.response.status_code} - {e.response.text}"
+    if isinstance(e, httpx.ConnectTimeout):
         return f"Error: Connection timeout while trying to get weather data. Please check your internet connection or try again later."
-    except httpx.ReadTimeout:
+    if isinstance(e, httpx.ReadTimeout):
         return f"Error: Read timeout while waiting for API response. Please try again later."
+    if isinstance(e, httpx.TransportError):
+        # Unreachable host, refused connection, DNS failure: counted by the weather breaker
+        return f"Network Error: {str(e) or type(e).__name__}"
+    return f"Error: {str(e)}"
+
+@tool(category="weather", description="Get current weather information for any city worldwide", coalesce=True,
+      policy=WEATHER_POLICY)
+async def get_weather(city: str, format: str = "celsius") -> Union[WeatherResult, str]:
+    try:
+        location = await geocode(city)
+        if location is None:
+            return f"Error: Could not find location '{city}'"
+        
+        current = await current_weather_cache.get(location["lat"], location["lon"])
+        return _weather_result(city, location["display_name"], current, format)
+        
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _describe_error(e)
 
-# # Create an async main function
-# async def main():
-#     city = input("Enter city name: ") or "London"
-#     unit = input("Enter unit (celsius/fahrenheit): ").lower() or "celsius"
-#     if unit not in ["celsius", "fahrenheit"]:
-#         unit = "celsius"
+@tool(category="weather", description="Get current weather for several cities at once", coalesce=True,
+      policy=WEATHER_MANY_POLICY)
+async def get_weather_many(cities: List[str], format: str = "celsius") -> Union[WeatherManyResult, str]:
+    """
+    Get the current weather for several cities with one forecast request.
     
-#     print(f"Getting weather for {city}...")
-#     result = await get_weather(city, unit)
-#     print(result)
+    Args:
+        cities: City names, e.g. ["Paris", "Berlin", "Rome"]
+        format: "celsius" or "fahrenheit"
+    
+    Returns:
+        One line per city, in the order given; failures are reported per city
+    """
+    if not cities:
+        return "Error: No cities given"
+    
+    # Geocoding runs concurrently; the rate limiter paces any Nominatim lookups
+    locations = await asyncio.gather(*(geocode(city) for city in cities), return_exceptions=True)
+    
+    items = [None] * len(cities)
+    found = []
+    for i, (city, location) in enumerate(zip(cities, locations)):
+        if isinstance(location, BaseException):
+            items[i] = ItemError(city, _describe_error(location))
+        elif location is None:
+            items[i] = ItemError(city, f"Error: Could not find location '{city}'")
+        else:
+            found.append((i, location))
+    
+    # Cached cells are served locally; all misses share one forecast request
+    currents = await current_weather_cache.get_many([(loc["lat"], loc["lon"]) for _, loc in found])
+    for (i, location), current in zip(found, currents):
+        if isinstance(current, Exception):
+            items[i] = ItemError(cities[i], _describe_error(current))
+        else:
+            items[i] = _weather_result(cities[i], location["display_name"], current, format)
+    
+    return WeatherManyResult("F" if format.lower() == "fahrenheit" else "C", tuple(items))
 
-# # Run the async function properly
-# if __name__ == "__main__":
-#     asyncio.run(main())
\ No newline at end of file
+@tool(category="weather", description="Get the daily forecast (temperatures, rain) for up to 16 days", coalesce=True,
+      policy=FORECAST_POLICY)
+async def get_forecast(city: str, days: int = 7, format: str = "celsius") -> Union[ForecastResult, str]:
+    """
+    Get a daily forecast built from hourly data: low/high/average
+    temperature, rain amount and the hour it starts, rain chance and
+    conditions per day.
+    
+    Args:
+        city: City name, e.g. "Dhaka, Bangladesh"
+        days: Days ahead to cover, 1-16 (today counts as the first)
+        format: "celsius" or "fahrenheit"
+    
+    Returns:
+        One line per day plus a summary line
+    """
+    try:
+        days = min(max(int(days), 1), MAX_FORECAST_DAYS)
+        location = await geocode(city)
+        if location is None:
+            return f"Error: Could not find location '{city}'"
+        
+        forecast = await forecast_cache.get(location["lat"], location["lon"], days)
+        return _forecast_result(city, location["display_name"], summarize_daily(forecast), format)
+        
+    except Exception as e:
+        return _describe_error(e)